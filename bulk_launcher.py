@@ -1,12 +1,12 @@
 import asyncio
 from time import sleep
 import subprocess
-import json
 import os
 import re
 import shutil
 from communex.compat.key import Ss58Address
 from loguru import logger
+from eden_subnet.base.keystore import key_store
 
 # Set the environment variable
 os.environ['COMX_YES_TO_ALL'] = 'true'
@@ -100,32 +100,11 @@ def serve_modules(module_path, source_module, port, NumModules, Netuid):
 
 
 def get_ss58_address(name):
-    # Construct the path to the JSON file
-    file_path = os.path.expanduser(f"~/.commune/key/{name}.json")
-
-    try:
-        # Open and read the JSON file
-        with open(file_path, 'r') as file:
-            data = json.load(file)
-
-        # Extract the 'data' field and parse it as JSON
-        data_json = json.loads(data['data'])
-
-        # Return the 'ss58_address' field
-        return data_json['ss58_address']
-
-    except FileNotFoundError:
-        print(f"No file found for {name}")
-        return None
-    except KeyError as e:
-        print(f"Key error: {e} - Check JSON structure")
-        return None
-    except json.JSONDecodeError:
-        print("Error decoding JSON")
-        return None
-    except Exception as e: 
-        logger.error(f"Error procesing thing:\n{e}")
-        return None
+    # Served from the shared key store, which only re-reads a key file when it changes
+    address = key_store.address(name)
+    if address is None:
+        print(f"No readable key file found for {name}")
+    return address
 
 def register(module_path, wan_ip, port, NumModules, Netuid):
 
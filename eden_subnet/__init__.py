@@ -1,12 +1,9 @@
 import re
-from re import Match
 from loguru import logger
 from communex.client import CommuneClient
+from eden_subnet.base.address import IP_REGEX, parse_address
 
 
-IP_REGEX: re.Pattern[str] = re.compile(
-    pattern=r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d+"
-)
 
 
 def extract_address(string: str) -> re.Match[str] | None:
@@ -47,19 +44,18 @@ def get_ip_port(modules_addresses: dict[int, str]) -> dict[int, list[str]]:
 
     Returns:
         dict[int, list[str]]: A dictionary mapping module IDs to a list of IP addresses and ports.
+        IPv6 and hostname addresses are included; addresses that cannot be parsed are left out.
 
     Raises:
         None
 
     Examples:
-        >>> modules_addresses = {1: "192.168.0.1:8080", 2: "10.0.0.1:9090"}
+        >>> modules_addresses = {1: "192.168.0.1:8080", 2: "[2001:db8::1]:9090"}
         >>> get_ip_port(modules_addresses)
-        {1: ["192.168.0.1", "8080"], 2: ["10.0.0.1", "9090"]}
+        {1: ["192.168.0.1", "8080"], 2: ["2001:db8::1", "9090"]}
     """
-    filtered_addr: dict[int, Match[str] | None] = {
-        id: extract_address(string=addr) for id, addr in modules_addresses.items()
-    }
+    endpoints = {id: parse_address(addr) for id, addr in modules_addresses.items()}
     ip_port: dict[int, list[str]] = {
-        id: x.group(0).split(":") for id, x in filtered_addr.items() if x is not None
+        id: [endpoint.host, str(endpoint.port)] for id, endpoint in endpoints.items() if endpoint is not None
     }
     return ip_port
@@ -0,0 +1,193 @@
+"""
+Parsing and resolution of module addresses.
+
+Addresses registered on chain are free-form strings. `parse_address` turns one into an `Endpoint` (an IPv4,
+IPv6 or hostname endpoint with a validated port), and caches the result, so each distinct address string is
+parsed once per process. `Resolver` looks up hostnames asynchronously and caches the answers for a TTL, so
+miners registered under a hostname do not cost a DNS round-trip every round.
+"""
+
+import asyncio
+import functools
+import ipaddress
+import re
+import socket
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+_OCTET = r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"
+_PORT = r"(?:6553[0-5]|655[0-2]\d|65[0-4]\d\d|6[0-4]\d{3}|[1-5]\d{4}|[1-9]\d{0,3})"
+
+IP_REGEX: re.Pattern[str] = re.compile(
+    pattern=rf"(?<![\d.]){_OCTET}(?:\.{_OCTET}){{3}}:{_PORT}(?!\d)"
+)
+HOSTNAME_REGEX: re.Pattern[str] = re.compile(
+    pattern=r"^(?=.{1,253}$)(?!-)[a-z0-9-]{1,63}(?<!-)(?:\.(?!-)[a-z0-9-]{1,63}(?<!-))*$"
+)
+
+
+class Endpoint(NamedTuple):
+    """A parsed module endpoint."""
+
+    host: str
+    port: int
+    kind: str
+
+    @property
+    def netloc(self) -> str:
+        """
+        The host and port in URL form, with IPv6 hosts in brackets.
+        """
+        return format_netloc(self.host, self.port)
+
+    def url(self, path: str = "", scheme: str = "http") -> str:
+        """
+        Builds a URL for this endpoint.
+
+        Args:
+            path (str): The path, starting with a slash.
+            scheme (str): The URL scheme. Defaults to "http".
+
+        Returns:
+            str: The URL.
+        """
+        return f"{scheme}://{self.netloc}{path}"
+
+
+def format_netloc(host: str, port: int) -> str:
+    """
+    Joins a host and port, bracketing IPv6 hosts.
+
+    Args:
+        host (str): The host name or IP address.
+        port (int): The port.
+
+    Returns:
+        str: The host and port in URL form.
+    """
+    return f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+
+
+def _parse_port(port: str) -> Optional[int]:
+    if not port.isdigit():
+        return None
+    value = int(port)
+    return value if 0 < value < 65536 else None
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_address(address: str) -> Optional[Endpoint]:
+    """
+    Parses a module address such as "1.2.3.4:8080", "[2001:db8::1]:8080" or "miner.example.com:8080".
+
+    A scheme and path around the address are ignored. If the string is not an address as a whole, the first
+    IPv4 address and port found inside it is used, as the regex-based parsing always did.
+
+    Args:
+        address (str): The address string.
+
+    Returns:
+        Endpoint, optional: The endpoint, or None if no usable address could be parsed.
+    """
+    text = address.strip()
+    if "://" in text:
+        text = text.split("://", 1)[1]
+    text = text.split("/", 1)[0]
+    if text.startswith("["):
+        host, _, port = text[1:].partition("]:")
+    else:
+        host, _, port = text.rpartition(":")
+    parsed_port = _parse_port(port)
+    if host and parsed_port is not None:
+        try:
+            ip = ipaddress.ip_address(host)
+        except ValueError:
+            ip = None
+        if ip is not None:
+            if not ip.is_unspecified and (ip.version == 4 or text.startswith("[")):
+                return Endpoint(str(ip), parsed_port, f"ipv{ip.version}")
+        elif HOSTNAME_REGEX.match(host.lower()) and not host.replace(".", "").isdigit():
+            return Endpoint(host.lower(), parsed_port, "hostname")
+    if match := IP_REGEX.search(address):
+        host, _, port = match.group(0).rpartition(":")
+        if host != "0.0.0.0":
+            return Endpoint(host, int(port), "ipv4")
+    return None
+
+
+class Resolver:
+    """
+    An asynchronous DNS resolver with a TTL cache.
+
+    Explanation:
+    IP literals are returned as they are. Hostnames are looked up with the event loop's getaddrinfo, and
+    concurrent lookups of the same name share one query. Answers are cached for `ttl` seconds and failures for
+    `negative_ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 30.0, timeout: float = 2.0) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            ttl (float): Seconds a successful lookup is cached.
+            negative_ttl (float): Seconds a failed lookup is cached.
+            timeout (float): Seconds allowed for one lookup.
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.cache: Dict[str, Tuple[List[str], float]] = {}
+        self._lookups: Dict[str, asyncio.Future] = {}
+
+    async def resolve(self, endpoint: Endpoint) -> Optional[str]:
+        """
+        Returns an IP address for an endpoint.
+
+        Args:
+            endpoint (Endpoint): The endpoint to resolve.
+
+        Returns:
+            str, optional: The first IP address of the endpoint, or None if the hostname does not resolve.
+        """
+        if endpoint.kind != "hostname":
+            return endpoint.host
+        addresses = await self.lookup(endpoint.host)
+        return addresses[0] if addresses else None
+
+    async def lookup(self, hostname: str) -> List[str]:
+        """
+        Returns the IP addresses of a hostname, from the cache while it is fresh.
+
+        Args:
+            hostname (str): The hostname to look up.
+
+        Returns:
+            List[str]: The IP addresses, empty if the lookup failed.
+        """
+        cached = self.cache.get(hostname)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        if hostname not in self._lookups:
+            self._lookups[hostname] = asyncio.ensure_future(self._lookup(hostname))
+        try:
+            return await asyncio.shield(self._lookups[hostname])
+        finally:
+            if self._lookups.get(hostname) is not None and self._lookups[hostname].done():
+                del self._lookups[hostname]
+
+    async def _lookup(self, hostname: str) -> List[str]:
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(hostname, None, type=socket.SOCK_STREAM), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.debug(f"\nCould not resolve {hostname}: {e}")
+            self.cache[hostname] = ([], time.monotonic() + self.negative_ttl)
+            return []
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self.cache[hostname] = (addresses, time.monotonic() + self.ttl)
+        return addresses
@@ -2,21 +2,19 @@ import re
 
 import requests
 from importlib import import_module
-from re import Match
 from pydantic import BaseModel
 from communex.compat.key import Ss58Address
 from typing import List, Optional, Tuple, Dict
 from loguru import logger
 from communex.client import CommuneClient
-from communex._common import get_node_url
 from eden_subnet.base.data_models import (
     ModuleSettings,
     Module,
     SUBNET_NETUID,
 )
-
-IP_REGEX = re.compile(pattern=r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d+")
-c_client: CommuneClient = CommuneClient(url=get_node_url(use_testnet=False))
+from eden_subnet.base.address import IP_REGEX, parse_address
+from eden_subnet.base.chain import get_chain_client
+from eden_subnet.base.metagraph_index import MetagraphIndex
 
 
 class Message(BaseModel):
@@ -149,15 +147,13 @@ class BaseModule(Module):
 
         Returns:
             Dict[int, List[str]]: A dictionary mapping module IDs to a list of IP addresses and ports.
+            IPv6 and hostname addresses are included; addresses that cannot be parsed are left out.
         """
-        filtered_addr: dict[int, Match[str] | None] = {
-            id: BaseValidator.extract_address(string=addr)
-            for id, addr in modules_addresses.items()
-        }
+        endpoints = {id: parse_address(addr) for id, addr in modules_addresses.items()}
         ip_port: dict[int, list[str]] = {
-            id: x.group(0).split(":")
-            for id, x in filtered_addr.items()
-            if x is not None
+            id: [endpoint.host, str(endpoint.port)]
+            for id, endpoint in endpoints.items()
+            if endpoint is not None
         }
         return ip_port
 
@@ -259,10 +255,11 @@ class BaseValidator(BaseModule):
             ValueError: If an error occurs during the validation request.
         """
         results_dict = {}
+        # One key query per call, not one per miner.
+        keys = get_chain_client().query_map_key(netuid=SUBNET_NETUID)
         for miner_dict in miner_list:
             uid: str = miner_dict["netuid"]  # type: ignore
-            keys = c_client.query_map_key(netuid=10)
-            miner_ss58_address = keys["netuid"]
+            miner_ss58_address = keys.get(uid)
             module_host, module_port = miner_dict["address"]
             logger.debug(
                 f"\nUid: {uid}\nAddress: {miner_ss58_address}\nModule host:{module_host}\nModule port: {module_port}"
@@ -282,39 +279,22 @@ class BaseValidator(BaseModule):
 
         Returns:
             dict[int, tuple[str, int]] | None: A dictionary with netuids as keys and tuple of address and port as values, or None if an error occurs.
+            The master (UID 0), the validator itself and modules without a usable address are left out.
 
         Raises:
             RuntimeError: If an error occurs during the retrieval process.
         """
         try:
-            module_addresses = c_client.query_map_address(netuid=SUBNET_NETUID)
-            module_keys = c_client.query_map_key(netuid=SUBNET_NETUID)
-            if module_addresses:
-                module_addresses = dict(module_addresses.items())
-            if module_keys:
-                modules_keys = dict(module_keys.items())
+            index = MetagraphIndex.from_chain(get_chain_client(), SUBNET_NETUID)
+            own_key = self.settings.get_ss58_address(key_name=self.key_name)
             module_dict = {}
-            modules_filtered_address = BaseValidator.get_ip_port(
-                modules_addresses=module_addresses
-            )
-            for module_id, ss58_address in modules_keys.items():
-                module_info = {}
-                if module_id == 0:  # skip master
-                    continue
-                if ss58_address == self.settings.get_ss58_address(
-                    key_name=self.key_name
-                ):  # skip yourself
-                    continue
-                if ss58_addr := modules_filtered_address.get(module_id):
-                    module_info["netuid"] = module_id
-                    module_info["address"] = ss58_addr
-                module_host_address = module_addresses[module_id]
-                if module_host_address := modules_filtered_address.get(module_id):
-                    if ":" in module_host_address:
-                        host, port = module_host_address[module_id].split(":")
-                        module_info["host"] = host
-                        module_info["port"] = port
-                module_dict[module_id] = module_info
+            for module_id, endpoint in index.queryable(exclude_keys=[own_key]).items():
+                module_dict[module_id] = {
+                    "netuid": module_id,
+                    "address": [endpoint.host, str(endpoint.port)],
+                    "host": endpoint.host,
+                    "port": endpoint.port,
+                }
             return module_dict
         except RuntimeError as e:
             logger.error(e)
@@ -339,7 +319,7 @@ class BaseValidator(BaseModule):
             RuntimeError: If the ss58_address of the miner is not registered in the subnet.
         """
         netuid = module_info["netuid"]
-        weights_dict = c_client.query_map_weights(netuid=netuid)
+        weights_dict = get_chain_client().query_map_weights(netuid=netuid)
         ss58_key = module_info["ss58_address"]
         if ss58_key not in weights_dict:
             raise RuntimeError(f"validator key {ss58_key} is not registered in subnet")
@@ -0,0 +1,356 @@
+"""
+Pluggable chain backends.
+
+Modules get their chain client from `get_chain_client` instead of building a `CommuneClient` at import time, so
+the node connection is only opened when it is first needed, and a different backend can be installed first.
+The backend is chosen by a spec string, from `set_chain_client`, the `--chain` option or the `EDEN_CHAIN`
+environment variable:
+
+- `node` (the default) or `node:<url>`: a `CommuneClient` connected to the mainnet node, or to that URL.
+- `fake`, `fake:<uids>` or `fake:<recording.json>`: an in-process `FakeChain` serving a synthetic subnet of
+  that many UIDs, or one recorded from a live node with `FakeChain.record(...).save(path)`.
+
+`FakeChain` answers the queries the validator makes, sleeps `latency` seconds per call to stand in for the node
+round trip, and records every vote, so whole validation rounds can be profiled and tested offline.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from communex.client import CommuneClient
+from communex._common import get_node_url
+from loguru import logger
+
+from eden_subnet.base.data_models import SUBNET_NETUID
+
+
+class FakeReceipt(NamedTuple):
+    """The receipt of a vote accepted by a `FakeChain`."""
+
+    is_success: bool
+    block_number: int
+    error_message: Optional[str] = None
+
+
+class FakeVote(NamedTuple):
+    """A vote submitted to a `FakeChain`."""
+
+    key: str
+    netuid: int
+    uids: List[int]
+    weights: List[int]
+    block_number: int
+
+
+class _FakeSubstrate:
+    def __init__(self, chain: "FakeChain") -> None:
+        self.chain = chain
+
+    def get_block_header(self) -> Dict[str, Any]:
+        return {"header": {"number": self.chain.block_number, "hash": self.chain.block_hash}}
+
+
+def _synthetic_key(seed: int, uid: int) -> str:
+    return "5" + hashlib.sha256(f"{seed}:{uid}".encode()).hexdigest()[:47]
+
+
+class FakeChain:
+    """
+    An in-process stand-in for `CommuneClient`.
+
+    Explanation:
+    Holds one subnet's keys, addresses, weights and stake in memory and serves them through the same methods
+    and return shapes as the real client, including the batched `query_batch_map` and `get_conn` used by the
+    metagraph refresher. `advance` moves the chain head so refreshes see new blocks; with a `block_time` the
+    head also moves on its own, one block every `block_time` seconds.
+    """
+
+    def __init__(
+        self,
+        keys: Dict[int, str],
+        addresses: Dict[int, str],
+        weights: Optional[Dict[int, List[Tuple[int, int]]]] = None,
+        staketo: Optional[Dict[str, List[Tuple[str, int]]]] = None,
+        netuid: int = SUBNET_NETUID,
+        latency: float = 0.0,
+        block_number: int = 1,
+        tempo: int = 100,
+        tx_rate_limit: int = 1,
+        block_time: Optional[float] = None,
+    ) -> None:
+        """
+        Initializes the fake chain.
+
+        Args:
+            keys (Dict[int, str]): The key of each UID.
+            addresses (Dict[int, str]): The address of each UID.
+            weights (dict, optional): The (uid, weight) pairs set by each UID.
+            staketo (dict, optional): The (key, amount) pairs staked by each key.
+            netuid (int): The subnet served. Defaults to SUBNET_NETUID.
+            latency (float): The seconds every call sleeps before answering.
+            block_number (int): The block the chain starts at.
+            tempo (int): The blocks between two epochs of the subnet.
+            tx_rate_limit (int): The blocks a key must wait between two transactions.
+            block_time (float, optional): The seconds per block when the head should advance on its own.
+        """
+        self.keys = dict(keys)
+        self.addresses = dict(addresses)
+        self.weights = dict(weights or {})
+        self.staketo = dict(staketo or {})
+        self.netuid = netuid
+        self.latency = latency
+        self.tempo = tempo
+        self.tx_rate_limit = tx_rate_limit
+        self.block_time = block_time
+        self.block_number = block_number
+        self.votes: List[FakeVote] = []
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def synthetic(
+        cls,
+        size: int = 256,
+        seed: int = 0,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        port_span: int = 1,
+    ) -> "FakeChain":
+        """
+        Builds a subnet of `size` UIDs with deterministic keys, random stake and random validator weights.
+
+        Args:
+            size (int): The number of UIDs, including the master at UID 0.
+            seed (int): Seeds the keys, stake and weights.
+            latency (float): The seconds every call sleeps before answering.
+            host (str): The host every miner address points at.
+            port (int): The first miner port.
+            port_span (int): The number of consecutive ports the miners are spread over.
+
+        Returns:
+            FakeChain: The fake chain.
+        """
+        rng = random.Random(seed)
+        keys = {uid: _synthetic_key(seed, uid) for uid in range(size)}
+        addresses = {uid: f"{host}:{port + uid % max(port_span, 1)}" for uid in range(1, size)}
+        staketo = {key: [(key, rng.randrange(1, 10**12))] for key in keys.values()}
+        weights = {1: [(uid, rng.randrange(1, 65535)) for uid in range(2, size)]} if size > 2 else {}
+        return cls(keys, addresses, weights, staketo, latency=latency)
+
+    @classmethod
+    def record(cls, client: CommuneClient, netuid: int = SUBNET_NETUID) -> "FakeChain":
+        """
+        Copies a subnet from a live node.
+
+        Args:
+            client (CommuneClient): The live chain client.
+            netuid (int): The subnet to copy. Defaults to SUBNET_NETUID.
+
+        Returns:
+            FakeChain: A fake chain serving the copied subnet.
+        """
+        return cls(
+            keys=client.query_map_key(netuid=netuid),
+            addresses=client.query_map_address(netuid=netuid),
+            weights=client.query_map_weights(netuid=netuid),
+            staketo=client.query_map_staketo(),
+            netuid=netuid,
+        )
+
+    def save(self, path: str | Path) -> None:
+        """
+        Writes the subnet to a JSON recording that `load` reads back.
+
+        Args:
+            path (str | Path): The recording path.
+        """
+        Path(path).write_text(json.dumps({
+            "netuid": self.netuid,
+            "keys": self.keys,
+            "addresses": self.addresses,
+            "weights": self.weights,
+            "staketo": self.staketo,
+        }))
+
+    @classmethod
+    def load(cls, path: str | Path, latency: float = 0.0) -> "FakeChain":
+        """
+        Reads a subnet recorded with `save`.
+
+        Args:
+            path (str | Path): The recording path.
+            latency (float): The seconds every call sleeps before answering.
+
+        Returns:
+            FakeChain: The fake chain.
+        """
+        data = json.loads(Path(path).read_text())
+        return cls(
+            keys={int(uid): key for uid, key in data["keys"].items()},
+            addresses={int(uid): address for uid, address in data["addresses"].items()},
+            weights={int(uid): [tuple(pair) for pair in pairs] for uid, pairs in data["weights"].items()},
+            staketo={key: [tuple(pair) for pair in pairs] for key, pairs in data["staketo"].items()},
+            netuid=data["netuid"],
+            latency=latency,
+        )
+
+    @property
+    def block_number(self) -> int:
+        if self.block_time:
+            return self._block_number + int((time.monotonic() - self._started) / self.block_time)
+        return self._block_number
+
+    @block_number.setter
+    def block_number(self, value: int) -> None:
+        self._block_number = value
+        self._started = time.monotonic()
+
+    @property
+    def block_hash(self) -> str:
+        return f"0x{self.block_number:064x}"
+
+    def advance(self, blocks: int = 1) -> None:
+        """
+        Moves the chain head forward.
+
+        Args:
+            blocks (int): The number of blocks to produce.
+        """
+        self._block_number += blocks
+
+    def _answer(self, name: str, netuid: Optional[int] = None) -> None:
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if netuid is not None and netuid != self.netuid:
+            raise ValueError(f"FakeChain serves netuid {self.netuid}, not {netuid}")
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def query_map_key(self, netuid: int = 0, extract_value: bool = False) -> Dict[int, str]:
+        self._answer("query_map_key", netuid)
+        return dict(self.keys)
+
+    def query_map_address(self, netuid: int = 0, extract_value: bool = False) -> Dict[int, str]:
+        self._answer("query_map_address", netuid)
+        return dict(self.addresses)
+
+    def query_map_weights(self, netuid: int = 0, extract_value: bool = False) -> Dict[int, List[Tuple[int, int]]]:
+        self._answer("query_map_weights", netuid)
+        return {uid: list(pairs) for uid, pairs in self.weights.items()}
+
+    def query_map_staketo(self, extract_value: bool = False) -> Dict[str, List[Tuple[str, int]]]:
+        self._answer("query_map_staketo")
+        return {key: list(pairs) for key, pairs in self.staketo.items()}
+
+    def query_map_subnet_names(self, extract_value: bool = False) -> Dict[int, str]:
+        self._answer("query_map_subnet_names")
+        return {self.netuid: "Eden"}
+
+    def get_tempo(self, netuid: int = 0) -> int:
+        self._answer("get_tempo", netuid)
+        return self.tempo
+
+    def get_tx_rate_limit(self) -> int:
+        self._answer("get_tx_rate_limit")
+        return self.tx_rate_limit
+
+    def query_batch_map(self, functions: Dict[str, List[Tuple[str, List[Any]]]], block_hash: Optional[str] = None) -> Dict[str, Any]:
+        self._answer("query_batch_map")
+        tables = {
+            "Keys": lambda: dict(self.keys),
+            "Address": lambda: dict(self.addresses),
+            "Weights": lambda: {uid: list(pairs) for uid, pairs in self.weights.items()},
+            "StakeTo": lambda: {
+                (staker, key): amount for staker, pairs in self.staketo.items() for key, amount in pairs
+            },
+        }
+        return {
+            name: tables[name]()
+            for queries in functions.values()
+            for name, _ in queries
+            if name in tables
+        }
+
+    @contextlib.contextmanager
+    def get_conn(self, timeout: Optional[float] = None, init: bool = False) -> Iterator[_FakeSubstrate]:
+        self._answer("get_conn")
+        yield _FakeSubstrate(self)
+
+    def vote(self, key: Any, uids: List[int], weights: List[int], netuid: int = 0) -> FakeReceipt:
+        self._answer("vote", netuid)
+        if len(uids) != len(weights):
+            return FakeReceipt(False, self.block_number, "uids and weights differ in length")
+        self.votes.append(FakeVote(
+            getattr(key, "ss58_address", str(key)), netuid, list(uids), list(weights), self.block_number
+        ))
+        return FakeReceipt(True, self.block_number)
+
+
+_client: CommuneClient | FakeChain | None = None
+_client_lock = threading.Lock()
+
+
+def make_chain_client(spec: str = "node", num_connections: int = 1, latency: float = 0.0) -> CommuneClient | FakeChain:
+    """
+    Builds a chain client from a backend spec.
+
+    Args:
+        spec (str): "node", "node:<url>", "fake", "fake:<uids>" or "fake:<recording.json>".
+        num_connections (int): The node connections pooled by a real client.
+        latency (float): The seconds every call to a fake chain sleeps before answering.
+
+    Returns:
+        CommuneClient | FakeChain: The chain client.
+
+    Raises:
+        ValueError: If the spec names no known backend.
+    """
+    backend, _, argument = spec.partition(":")
+    if backend == "node":
+        return CommuneClient(argument or get_node_url(use_testnet=False), num_connections=num_connections)
+    if backend == "fake":
+        if not argument:
+            return FakeChain.synthetic(latency=latency)
+        if argument.isdigit():
+            return FakeChain.synthetic(size=int(argument), latency=latency)
+        return FakeChain.load(argument, latency=latency)
+    raise ValueError(f"Unknown chain backend {spec!r}")
+
+
+def set_chain_client(client: CommuneClient | FakeChain | None) -> None:
+    """
+    Installs the chain client returned by `get_chain_client`. None makes the next call build one again.
+
+    Args:
+        client (CommuneClient | FakeChain | None): The client to use.
+    """
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def get_chain_client(num_connections: int = 1) -> CommuneClient | FakeChain:
+    """
+    Returns the shared chain client, building it from the `EDEN_CHAIN` spec on first use.
+
+    Args:
+        num_connections (int): The node connections pooled if a real client is built by this call.
+
+    Returns:
+        CommuneClient | FakeChain: The chain client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            spec = os.getenv("EDEN_CHAIN", "node")
+            _client = make_chain_client(spec, num_connections, float(os.getenv("EDEN_CHAIN_LATENCY", 0)))
+            logger.info(f"\nUsing chain backend {spec}")
+        return _client
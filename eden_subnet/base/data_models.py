@@ -1,12 +1,12 @@
-import re
 import types
 from pydantic import BaseModel
 from typing import List
-from communex.compat.key import Ss58Address, local_key_addresses
+from communex.compat.key import Ss58Address
+from eden_subnet.base.address import IP_REGEX
+from eden_subnet.base.keystore import key_store
 
 SUBNET_NETUID = 10
 
-IP_REGEX = re.compile(pattern=r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d+")
 
 
 class Module(BaseModel):
@@ -35,7 +35,8 @@ class ModuleSettings(BaseModel):
 
     def get_ss58_address(self, key_name: str) -> Ss58Address:
         """
-        Retrieves the SS58 address associated with the given key name.
+        Retrieves the SS58 address associated with the given key name. The key file is parsed once and cached
+        until it changes on disk.
 
         Parameters:
             key_name (str): The name of the key.
@@ -46,14 +47,12 @@ class ModuleSettings(BaseModel):
         Raises:
             ValueError: If the key_name parameter is not provided.
         """
-        local_keys = local_key_addresses()
         if not key_name:
             raise ValueError("No key_name provided")
-        try:
-            local_keys[key_name]
-        except KeyError as e:
-            raise ValueError(f"Key {key_name} not found in local keys") from e
-        return local_keys[key_name]
+        address = key_store.address(key_name)
+        if address is None:
+            raise ValueError(f"Key {key_name} not found in local keys")
+        return address
 
 
 class AccessControl(BaseModel):
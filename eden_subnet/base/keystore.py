@@ -0,0 +1,156 @@
+"""
+A cached view of the local commune key directory.
+
+communex's `local_key_addresses` reads every file in `~/.commune/key` and re-derives each keypair from its
+mnemonic on every call. `KeyStore` parses a key file once and keeps its address and private key until the
+file's modification time or size changes, so repeated lookups cost a `stat` instead of a parse. Listing all
+keys costs one directory scan. Encrypted keys cannot be read without a password and are left out.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from communex.compat.key import Keypair, Ss58Address, check_ss58_address
+from loguru import logger
+
+
+class KeyEntry(NamedTuple):
+    """The public parts of a local key, with the private key needed to sign."""
+
+    name: str
+    ss58_address: Ss58Address
+    private_key: str
+
+
+class KeyStore:
+    """
+    Local keys by name, re-read only when their file changes.
+
+    Explanation:
+    Each cached entry remembers the `(mtime_ns, size)` of the file it was parsed from. A lookup stats the file
+    and re-parses it only if that stamp changed; a deleted file drops its entry. Keypairs are built once per
+    parsed entry. The store is safe to share between threads.
+    """
+
+    def __init__(self, key_dir: str | Path | None = None) -> None:
+        """
+        Initializes an empty store.
+
+        Args:
+            key_dir (str | Path, optional): The key directory. Defaults to `~/.commune/key`.
+        """
+        self.key_dir = Path(key_dir) if key_dir is not None else Path.home() / ".commune" / "key"
+        self._entries: Dict[str, Tuple[Tuple[int, int], Optional[KeyEntry]]] = {}
+        self._keypairs: Dict[str, Tuple[KeyEntry, Keypair]] = {}
+        self._lock = threading.Lock()
+
+    def _parse(self, name: str, path: Path) -> Optional[KeyEntry]:
+        try:
+            body = json.loads(path.read_text(encoding="utf-8"))
+            if body.get("encrypted"):
+                logger.debug(f"\nSkipping encrypted key {name}")
+                return None
+            data = body["data"]
+            data = json.loads(data) if isinstance(data, str) else data
+            return KeyEntry(name, check_ss58_address(data["ss58_address"]), data["private_key"])
+        except (OSError, ValueError, KeyError, TypeError, AssertionError) as e:
+            logger.debug(f"\nUnreadable key file {path}: {e}")
+            return None
+
+    def _lookup(self, name: str, stat: Optional[os.stat_result]) -> Optional[KeyEntry]:
+        if stat is None:
+            with self._lock:
+                self._entries.pop(name, None)
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._entries.get(name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        entry = self._parse(name, self.key_dir / f"{name}.json")
+        with self._lock:
+            self._entries[name] = (stamp, entry)
+        return entry
+
+    def get(self, name: str) -> Optional[KeyEntry]:
+        """
+        Returns a key by name.
+
+        Args:
+            name (str): The key name, without the .json suffix.
+
+        Returns:
+            KeyEntry, optional: The key, or None if it does not exist, is encrypted or cannot be read.
+        """
+        try:
+            stat = (self.key_dir / f"{name}.json").stat()
+        except OSError:
+            stat = None
+        return self._lookup(name, stat)
+
+    def address(self, name: str) -> Optional[Ss58Address]:
+        """
+        Returns the SS58 address of a key, or None if it cannot be read.
+        """
+        entry = self.get(name)
+        return entry.ss58_address if entry is not None else None
+
+    def keypair(self, name: str) -> Keypair:
+        """
+        Returns a signing keypair for a key, built once per version of its file.
+
+        Args:
+            name (str): The key name, without the .json suffix.
+
+        Returns:
+            Keypair: The keypair.
+
+        Raises:
+            ValueError: If the key does not exist, is encrypted or cannot be read.
+        """
+        entry = self.get(name)
+        if entry is None:
+            raise ValueError(f"Key {name} not found in {self.key_dir}")
+        with self._lock:
+            cached = self._keypairs.get(name)
+        if cached is not None and cached[0] is entry:
+            return cached[1]
+        keypair = Keypair(private_key=entry.private_key, ss58_address=entry.ss58_address)
+        with self._lock:
+            self._keypairs[name] = (entry, keypair)
+        return keypair
+
+    def addresses(self) -> Dict[str, Ss58Address]:
+        """
+        Returns the SS58 address of every readable key, like communex's `local_key_addresses`.
+
+        Returns:
+            Dict[str, Ss58Address]: The address per key name.
+        """
+        stats = {}
+        try:
+            with os.scandir(self.key_dir) as entries:
+                for dir_entry in entries:
+                    if dir_entry.name.endswith(".json") and not dir_entry.name.startswith("."):
+                        try:
+                            stats[dir_entry.name[: -len(".json")]] = dir_entry.stat()
+                        except OSError:
+                            continue
+        except OSError as e:
+            logger.debug(f"\nCannot list keys in {self.key_dir}: {e}")
+        with self._lock:
+            for name in set(self._entries) - set(stats):
+                del self._entries[name]
+        addresses = {}
+        for name, stat in stats.items():
+            entry = self._lookup(name, stat)
+            if entry is not None:
+                addresses[name] = entry.ss58_address
+        return addresses
+
+
+# The key store shared by module settings, the validator and the launcher.
+key_store = KeyStore()
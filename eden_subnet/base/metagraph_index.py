@@ -0,0 +1,109 @@
+"""
+Constant-time lookups over a subnet's keys and addresses.
+
+`MetagraphIndex` is built once from the UID to key and UID to address maps of one snapshot, parsing every
+address once, and answers uid→key, key→uid, uid→endpoint and endpoint→uids lookups from dictionaries. Code that
+needs any of these per miner builds one index per round instead of scanning the maps or querying the chain
+once per miner.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from communex.client import CommuneClient
+
+from eden_subnet.base.address import Endpoint, parse_address
+
+
+class MetagraphIndex:
+    """
+    Indexes of one snapshot of a subnet's keys and addresses.
+
+    Explanation:
+    Endpoints are keyed by their normalised `host:port` form, so two UIDs advertising the same machine with
+    differently written addresses land under the same endpoint. Addresses that cannot be parsed have no
+    endpoint. If a key were registered under several UIDs, `uid_of` returns the lowest.
+    """
+
+    def __init__(self, keys: Mapping[int, str], addresses: Mapping[int, str]) -> None:
+        """
+        Builds the indexes.
+
+        Args:
+            keys (Mapping[int, str]): The key of each UID.
+            addresses (Mapping[int, str]): The address of each UID.
+        """
+        self.keys: Dict[int, str] = dict(keys)
+        self.uids: Dict[str, int] = {}
+        for uid in sorted(self.keys):
+            self.uids.setdefault(self.keys[uid], uid)
+        self.endpoints: Dict[int, Endpoint] = {}
+        self.endpoint_uids: Dict[str, List[int]] = {}
+        for uid, address in addresses.items():
+            endpoint = parse_address(address)
+            if endpoint is None:
+                continue
+            self.endpoints[uid] = endpoint
+            self.endpoint_uids.setdefault(endpoint.netloc, []).append(uid)
+
+    @classmethod
+    def from_chain(cls, client: CommuneClient, netuid: int) -> "MetagraphIndex":
+        """
+        Builds an index from one key query and one address query.
+
+        Args:
+            client (CommuneClient): The chain client.
+            netuid (int): The subnet to index.
+
+        Returns:
+            MetagraphIndex: The index.
+        """
+        return cls(client.query_map_key(netuid=netuid), client.query_map_address(netuid=netuid))
+
+    def key_of(self, uid: int) -> Optional[str]:
+        """
+        Returns the key registered under a UID, or None.
+        """
+        return self.keys.get(uid)
+
+    def uid_of(self, ss58_address: str) -> Optional[int]:
+        """
+        Returns the UID a key is registered under, or None.
+        """
+        return self.uids.get(ss58_address)
+
+    def endpoint_of(self, uid: int) -> Optional[Endpoint]:
+        """
+        Returns the parsed address of a UID, or None if it has none or it cannot be parsed.
+        """
+        return self.endpoints.get(uid)
+
+    def uids_at(self, address: str) -> List[int]:
+        """
+        Returns the UIDs serving from an address, in any of its written forms.
+
+        Args:
+            address (str): The address.
+
+        Returns:
+            List[int]: The UIDs, empty if none or if the address cannot be parsed.
+        """
+        endpoint = parse_address(address)
+        return list(self.endpoint_uids.get(endpoint.netloc, ())) if endpoint is not None else []
+
+    def queryable(self, exclude_keys: Iterable[str] = (), skip_master: bool = True) -> Dict[int, Endpoint]:
+        """
+        Returns the endpoint of every UID that can be queried.
+
+        Args:
+            exclude_keys (Iterable[str]): Keys to leave out, such as the caller's own.
+            skip_master (bool): Whether to leave out UID 0.
+
+        Returns:
+            Dict[int, Endpoint]: The endpoint per UID, for UIDs with a key and a usable address.
+        """
+        excluded = set(exclude_keys)
+        return {
+            uid: endpoint
+            for uid, endpoint in self.endpoints.items()
+            if not (skip_master and uid == 0) and uid in self.keys and self.keys[uid] not in excluded
+        }
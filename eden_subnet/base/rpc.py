@@ -0,0 +1,325 @@
+"""
+A long-lived, length-prefixed binary RPC channel between validators and miners.
+
+Every frame is a fixed header (kind, request id, payload length) followed by the payload. Requests are
+multiplexed over one connection by request id, so a validator keeps a single TCP or Unix domain socket open
+per miner instead of paying for an HTTP request per call. Miners advertise the channel with the
+`X-Eden-RPC` header on their `/generate` responses.
+"""
+
+import asyncio
+import itertools
+import os
+import struct
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+RPC_HEADER = "X-Eden-RPC"
+FRAME_HEADER = struct.Struct("!BII")
+REQUEST = 1
+RESPONSE = 2
+ERROR = 3
+MAX_FRAME_BYTES = 8 * 1024 * 1024
+
+
+class RpcError(Exception):
+    """Raised when the remote side answers a request with an error frame."""
+
+
+async def read_frame(reader: asyncio.StreamReader, max_bytes: int = MAX_FRAME_BYTES) -> Tuple[int, int, bytes]:
+    """
+    Reads one frame from a stream.
+
+    Args:
+        reader (asyncio.StreamReader): The stream to read from.
+        max_bytes (int): The largest payload accepted.
+
+    Returns:
+        Tuple[int, int, bytes]: The frame kind, request id and payload.
+
+    Raises:
+        ValueError: If the announced payload is larger than max_bytes.
+        asyncio.IncompleteReadError: If the stream ends mid-frame.
+    """
+    kind, request_id, length = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if length > max_bytes:
+        raise ValueError(f"frame of {length} bytes exceeds the {max_bytes} byte limit")
+    return kind, request_id, await reader.readexactly(length)
+
+
+def write_frame(writer: asyncio.StreamWriter, kind: int, request_id: int, payload: bytes) -> None:
+    """
+    Queues one frame on a stream.
+
+    Args:
+        writer (asyncio.StreamWriter): The stream to write to.
+        kind (int): REQUEST, RESPONSE or ERROR.
+        request_id (int): The id that pairs a response with its request.
+        payload (bytes): The frame payload.
+    """
+    writer.writelines([FRAME_HEADER.pack(kind, request_id, len(payload)), payload])
+
+
+def parse_advertisement(value: Optional[str]) -> Dict[str, str]:
+    """
+    Parses an `X-Eden-RPC` header such as "tcp:10101, unix:/tmp/eden-miner.sock".
+
+    Args:
+        value (str, optional): The header value.
+
+    Returns:
+        Dict[str, str]: The advertised transports, mapping "tcp" to a port and "unix" to a socket path.
+    """
+    transports = {}
+    for item in (value or "").split(","):
+        scheme, _, target = item.strip().partition(":")
+        if scheme in ("tcp", "unix") and target:
+            transports[scheme] = target
+    return transports
+
+
+def socket_path_allowed(path: str, directory: Optional[str]) -> bool:
+    """
+    Checks that an advertised Unix socket path lies inside a trusted directory.
+
+    Socket paths come from miners, so without this check any miner registered with a local address could
+    point the validator at an arbitrary local socket. Both paths are resolved first, so `..` segments and
+    symlinks cannot escape the directory.
+
+    Args:
+        path (str): The advertised socket path.
+        directory (str, optional): The directory miner sockets must live in. None allows no path.
+
+    Returns:
+        bool: Whether the validator may connect to the path.
+    """
+    if not directory or not os.path.isabs(path):
+        return False
+    directory = os.path.realpath(directory)
+    path = os.path.realpath(path)
+    return path != directory and os.path.commonpath([directory, path]) == directory
+
+
+class RpcServer:
+    """
+    Serves RPC requests over TCP and/or a Unix domain socket.
+
+    Explanation:
+    Each request is run through the handler in a worker thread, so slow handlers do not hold up other
+    requests multiplexed on the same connection.
+    """
+
+    def __init__(self, handler: Callable[[bytes], bytes], max_frame_bytes: int = MAX_FRAME_BYTES) -> None:
+        """
+        Initializes the server.
+
+        Args:
+            handler (Callable[[bytes], bytes]): Turns a request payload into a response payload.
+            max_frame_bytes (int): The largest request payload accepted.
+        """
+        self.handler = handler
+        self.max_frame_bytes = max_frame_bytes
+        self.servers: List[asyncio.AbstractServer] = []
+        self.connections: Set[asyncio.StreamWriter] = set()
+        self.port: Optional[int] = None
+        self.path: Optional[str] = None
+
+    async def start(self, host: Optional[str] = None, port: Optional[int] = None, path: Optional[str] = None) -> None:
+        """
+        Starts listening on a TCP port, a Unix socket path, or both.
+
+        Args:
+            host (str, optional): The TCP host to bind.
+            port (int, optional): The TCP port to bind, 0 picks a free port.
+            path (str, optional): The Unix domain socket path to bind.
+        """
+        if port is not None:
+            server = await asyncio.start_server(self._handle_connection, host=host, port=port)
+            self.port = server.sockets[0].getsockname()[1]
+            self.servers.append(server)
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle_connection, path=path)
+            self.path = path
+            self.servers.append(server)
+
+    def advertisement(self) -> str:
+        """
+        Returns the `X-Eden-RPC` header value describing the started transports.
+        """
+        transports = []
+        if self.port is not None:
+            transports.append(f"tcp:{self.port}")
+        if self.path is not None:
+            transports.append(f"unix:{self.path}")
+        return ", ".join(transports)
+
+    async def close(self) -> None:
+        """
+        Stops listening and closes open connections.
+        """
+        for server in self.servers:
+            server.close()
+        for writer in list(self.connections):
+            writer.close()
+        for server in self.servers:
+            await server.wait_closed()
+        self.servers = []
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks = set()
+        self.connections.add(writer)
+        try:
+            while True:
+                kind, request_id, payload = await read_frame(reader, self.max_frame_bytes)
+                if kind != REQUEST:
+                    continue
+                task = asyncio.create_task(self._handle_request(writer, request_id, payload))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            logger.debug(f"\nRPC connection closed: {e}")
+        except asyncio.CancelledError:
+            # The server is shutting down, a connection handler has nothing left to report.
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.connections.discard(writer)
+            writer.close()
+
+    async def _handle_request(self, writer: asyncio.StreamWriter, request_id: int, payload: bytes) -> None:
+        try:
+            result = await asyncio.to_thread(self.handler, payload)
+            write_frame(writer, RESPONSE, request_id, result)
+        except Exception as e:
+            write_frame(writer, ERROR, request_id, str(e).encode())
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+class RpcClient:
+    """
+    A multiplexing client for one RPC connection.
+
+    Explanation:
+    Calls are tagged with increasing request ids and may be in flight concurrently; a background task reads
+    responses and resolves the matching call. If the connection drops, every pending call fails with
+    ConnectionError and the client reports itself closed.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        max_frame_bytes: int = MAX_FRAME_BYTES,
+    ) -> None:
+        """
+        Wraps an open connection. Use `RpcClient.connect` to open one.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's read side.
+            writer (asyncio.StreamWriter): The connection's write side.
+            max_frame_bytes (int): The largest response payload accepted.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.max_frame_bytes = max_frame_bytes
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._closed = False
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(
+        cls,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        path: Optional[str] = None,
+        timeout: float = 5.0,
+        max_frame_bytes: int = MAX_FRAME_BYTES,
+    ) -> "RpcClient":
+        """
+        Opens a connection over a Unix domain socket if a path is given, TCP otherwise.
+
+        Args:
+            host (str, optional): The TCP host.
+            port (int, optional): The TCP port.
+            path (str, optional): The Unix domain socket path.
+            timeout (float): Seconds allowed for the connection to open.
+            max_frame_bytes (int): The largest response payload accepted.
+
+        Returns:
+            RpcClient: The connected client.
+        """
+        if path is not None:
+            opening = asyncio.open_unix_connection(path=path)
+        else:
+            opening = asyncio.open_connection(host=host, port=port)
+        reader, writer = await asyncio.wait_for(opening, timeout=timeout)
+        return cls(reader, writer, max_frame_bytes=max_frame_bytes)
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the connection has been closed or lost.
+        """
+        return self._closed
+
+    async def call(self, payload: bytes) -> bytes:
+        """
+        Sends a request and waits for its response.
+
+        Args:
+            payload (bytes): The request payload.
+
+        Returns:
+            bytes: The response payload.
+
+        Raises:
+            RpcError: If the remote side answered with an error frame.
+            ConnectionError: If the connection is closed or lost before the response arrives.
+        """
+        if self._closed:
+            raise ConnectionError("RPC connection is closed")
+        request_id = next(self._ids) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            write_frame(self.writer, REQUEST, request_id, payload)
+            await self.writer.drain()
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self) -> None:
+        """
+        Closes the connection and fails any pending calls.
+        """
+        self._read_task.cancel()
+        await asyncio.gather(self._read_task, return_exceptions=True)
+        self._shutdown(ConnectionError("RPC connection is closed"))
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                kind, request_id, payload = await read_frame(self.reader, self.max_frame_bytes)
+                future = self._pending.get(request_id)
+                if future is None or future.done():
+                    continue
+                if kind == RESPONSE:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RpcError(payload.decode(errors="replace")))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            self._shutdown(ConnectionError(f"RPC connection lost: {e}"))
+
+    def _shutdown(self, error: Exception) -> None:
+        self._closed = True
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+        self.writer.close()
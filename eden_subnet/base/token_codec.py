@@ -0,0 +1,278 @@
+"""
+Compact binary encoding of token arrays exchanged between validators and miners.
+
+Tokens travel as little-endian uint32 arrays, optionally zstd-compressed, or as a digest: the token count and
+a BLAKE2b hash of the uint32 array. The format is negotiated with the HTTP Accept header, and JSON stays the
+default for peers that do not ask for it. Whatever the format, decoded tokens end up in one contiguous int32
+array that has been checked for shape and vocabulary range.
+"""
+
+import hashlib
+import json
+import struct
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, raw uint32 arrays work without it
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard json module is the fallback
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+TOKENS_MEDIA_TYPE = "application/x-eden-tokens"
+TOKENS_ZSTD_MEDIA_TYPE = "application/x-eden-tokens+zstd"
+DIGEST_MEDIA_TYPE = "application/x-eden-digest"
+TOKEN_DTYPE = np.dtype("<u4")
+DIGEST_SIZE = 32
+_DIGEST_LENGTH = struct.Struct("<I")
+_INT32_LIMIT = int(np.iinfo(np.int32).max) + 1
+
+
+class TokenDigest(NamedTuple):
+    """The token count and BLAKE2b digest of a token array."""
+
+    length: int
+    digest: bytes
+
+
+def supported_media_types() -> List[str]:
+    """
+    Lists the token media types this process can produce and read, most preferred first.
+
+    Returns:
+        List[str]: The supported media types.
+    """
+    media_types = [TOKENS_MEDIA_TYPE, JSON_MEDIA_TYPE]
+    if zstandard is not None:
+        media_types.insert(0, TOKENS_ZSTD_MEDIA_TYPE)
+    return media_types
+
+
+def accept_header(digest: bool = False) -> str:
+    """
+    Builds the Accept header a validator sends to ask for binary tokens, falling back to JSON.
+
+    Args:
+        digest (bool): Ask for the token digest instead of the tokens. Defaults to False.
+
+    Returns:
+        str: The Accept header value.
+    """
+    media_types = supported_media_types()
+    if digest:
+        media_types.insert(0, DIGEST_MEDIA_TYPE)
+    return ", ".join(
+        f"{media_type};q={1 - index / 10:.1f}" for index, media_type in enumerate(media_types)
+    )
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+    Picks the response media type for a request's Accept header.
+
+    Binary formats are only chosen when the client names them explicitly, so wildcard or missing headers
+    from older validators keep getting JSON.
+
+    Args:
+        accept (str, optional): The Accept header of the request.
+
+    Returns:
+        str: The media type to answer with.
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    supported = [DIGEST_MEDIA_TYPE, *supported_media_types()]
+    best, best_q = JSON_MEDIA_TYPE, 0.0
+    for part in accept.split(","):
+        media_type, *params = (item.strip() for item in part.split(";"))
+        if media_type not in supported or media_type == JSON_MEDIA_TYPE:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = media_type, q
+    return best
+
+
+def encode_tokens(tokens: Sequence[int], media_type: str = TOKENS_MEDIA_TYPE) -> bytes:
+    """
+    Encodes tokens as a little-endian uint32 array, compressing it if the media type asks for zstd.
+
+    Args:
+        tokens (Sequence[int]): The token ids.
+        media_type (str): TOKENS_MEDIA_TYPE or TOKENS_ZSTD_MEDIA_TYPE.
+
+    Returns:
+        bytes: The encoded body.
+
+    Raises:
+        ValueError: If zstd is requested but the zstandard package is not installed.
+    """
+    body = np.asarray(tokens, dtype=TOKEN_DTYPE).tobytes()
+    if media_type == TOKENS_ZSTD_MEDIA_TYPE:
+        if zstandard is None:
+            raise ValueError("zstandard is not installed")
+        body = zstandard.ZstdCompressor(level=3).compress(body)
+    return body
+
+
+def decode_tokens(body: bytes, media_type: str = TOKENS_MEDIA_TYPE, max_bytes: Optional[int] = None) -> np.ndarray:
+    """
+    Decodes a binary token body into a NumPy array without copying the raw array.
+
+    Args:
+        body (bytes): The encoded body.
+        media_type (str): TOKENS_MEDIA_TYPE or TOKENS_ZSTD_MEDIA_TYPE.
+        max_bytes (int, optional): The largest decompressed size accepted for zstd bodies.
+
+    Returns:
+        np.ndarray: The token ids as a read-only uint32 array.
+
+    Raises:
+        ValueError: If the body is not a whole number of uint32 values, cannot be decompressed,
+            or decompresses to more than max_bytes.
+    """
+    if media_type == TOKENS_ZSTD_MEDIA_TYPE:
+        if zstandard is None:
+            raise ValueError("zstandard is not installed")
+        body = _decompress(body, max_bytes)
+    if len(body) % TOKEN_DTYPE.itemsize:
+        raise ValueError("token payload is not a whole number of uint32 values")
+    return np.frombuffer(body, dtype=TOKEN_DTYPE)
+
+
+def _decompress(body: bytes, max_bytes: Optional[int]) -> bytes:
+    """
+    Decompresses a zstd body in chunks, stopping as soon as it grows past max_bytes.
+
+    The frame's declared content size is not trusted, so a small body cannot force a large allocation.
+    """
+    reader = zstandard.ZstdDecompressor().stream_reader(body)
+    output = bytearray()
+    try:
+        while chunk := reader.read(64 * 1024):
+            output.extend(chunk)
+            if max_bytes is not None and len(output) > max_bytes:
+                raise ValueError("decompressed token payload is too large")
+    except zstandard.ZstdError as e:
+        raise ValueError(f"invalid zstd token payload: {e}") from e
+    return bytes(output)
+
+
+def validate_tokens(tokens: np.ndarray, vocab_size: Optional[int] = None) -> np.ndarray:
+    """
+    Checks that decoded tokens form a flat array of integer ids within the vocabulary, in one vectorized pass.
+
+    Args:
+        tokens (np.ndarray): The decoded tokens.
+        vocab_size (int, optional): The number of ids in the vocabulary. Defaults to the int32 range.
+
+    Returns:
+        np.ndarray: The tokens as a contiguous int32 array.
+
+    Raises:
+        ValueError: If the array is not one-dimensional, holds non-integers, or holds ids outside the vocabulary.
+    """
+    if tokens.ndim != 1:
+        raise ValueError(f"token payload has {tokens.ndim} dimensions, expected 1")
+    if tokens.size == 0:
+        return np.empty(0, dtype=np.int32)
+    if tokens.dtype.kind not in "iu":
+        raise ValueError(f"token payload holds {tokens.dtype} values, expected integers")
+    limit = vocab_size if vocab_size is not None else _INT32_LIMIT
+    if tokens.min() < 0 or tokens.max() >= limit:
+        raise ValueError(f"token payload holds ids outside the vocabulary of {limit}")
+    return np.ascontiguousarray(tokens, dtype=np.int32)
+
+
+def decode_json_tokens(body: bytes, vocab_size: Optional[int] = None) -> np.ndarray:
+    """
+    Decodes a JSON `/generate` body straight into a validated int32 array.
+
+    The tokens are read from choices[0].message.content, or from the top level if the body is a bare list.
+    orjson is used when it is installed.
+
+    Args:
+        body (bytes): The JSON body.
+        vocab_size (int, optional): The number of ids in the vocabulary.
+
+    Returns:
+        np.ndarray: The tokens as a contiguous int32 array.
+
+    Raises:
+        ValueError: If the body is not JSON, the content is not a flat list of integers, or an id is out of range.
+    """
+    try:
+        payload = orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"invalid JSON token payload: {e}") from e
+    try:
+        content = payload["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        content = payload
+    if not isinstance(content, list):
+        raise ValueError("token payload is not a list")
+    try:
+        tokens = np.asarray(content)
+    except (ValueError, OverflowError) as e:
+        raise ValueError(f"token payload is not a flat list: {e}") from e
+    return validate_tokens(tokens, vocab_size)
+
+
+def token_digest(tokens: Sequence[int]) -> TokenDigest:
+    """
+    Computes the digest of a token array: its length and the BLAKE2b hash of its uint32 encoding.
+
+    Args:
+        tokens (Sequence[int]): The token ids.
+
+    Returns:
+        TokenDigest: The length and digest.
+    """
+    array = np.asarray(tokens, dtype=TOKEN_DTYPE)
+    return TokenDigest(len(array), hashlib.blake2b(array.tobytes(), digest_size=DIGEST_SIZE).digest())
+
+
+def encode_digest(tokens: Sequence[int]) -> bytes:
+    """
+    Encodes the digest of a token array as a uint32 length followed by the hash.
+
+    Args:
+        tokens (Sequence[int]): The token ids.
+
+    Returns:
+        bytes: The encoded digest.
+    """
+    length, digest = token_digest(tokens)
+    return _DIGEST_LENGTH.pack(length) + digest
+
+
+def decode_digest(body: bytes) -> TokenDigest:
+    """
+    Decodes a body produced by `encode_digest`.
+
+    Args:
+        body (bytes): The encoded digest.
+
+    Returns:
+        TokenDigest: The length and digest.
+
+    Raises:
+        ValueError: If the body has the wrong size.
+    """
+    if len(body) != _DIGEST_LENGTH.size + DIGEST_SIZE:
+        raise ValueError("token digest has the wrong size")
+    (length,) = _DIGEST_LENGTH.unpack_from(body)
+    return TokenDigest(length, bytes(body[_DIGEST_LENGTH.size:]))
@@ -17,12 +17,17 @@ class MinerSettings(ModuleSettings):
     Settings for the Miner.
     """
 
+    rpc_port: Optional[int] = None
+    rpc_socket: Optional[str] = None
+
     def __init__(
         self,
         key_name: str,
         module_path: str,
         host: str,
         port: int,
+        rpc_port: Optional[int] = None,
+        rpc_socket: Optional[str] = None,
     ) -> None:
         """
         Initializes the MinerSettings class with default values for the key_name and module_path.
@@ -30,6 +35,8 @@ class MinerSettings(ModuleSettings):
         Parameters:
             key_name (str, optional): The name of the key. Defaults to "".
             module_path (str, optional): The path of the module. Defaults to "".
+            rpc_port (int, optional): TCP port for the binary RPC channel. Defaults to None (disabled).
+            rpc_socket (str, optional): Unix socket path for the binary RPC channel. Defaults to None (disabled).
 
         Returns:
             None
@@ -39,6 +46,8 @@ class MinerSettings(ModuleSettings):
             module_path=module_path,
             host=host,
             port=port,
+            rpc_port=rpc_port,
+            rpc_socket=rpc_socket,
         )
 
 
@@ -17,6 +17,8 @@ def parseargs():
     parser.add_argument("--host", type=str, default="0.0.0.0")
     parser.add_argument("--port", type=int, default=10001)
     parser.add_argument("--use_testnet", type=bool, default=False)
+    parser.add_argument("--rpc_port", type=int, default=None)
+    parser.add_argument("--rpc_socket", type=str, default=None)
     return parser.parse_args()
 
 
@@ -29,6 +31,8 @@ miner_settings = MinerSettings(
     module_path=args.key_name,
     host=args.host,
     port=args.port,
+    rpc_port=args.rpc_port,
+    rpc_socket=args.rpc_socket,
 )
 
 configuration = miner_settings
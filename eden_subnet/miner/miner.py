@@ -1,8 +1,10 @@
+import json
+import asyncio
 import uvicorn
 import tiktoken
 
 from loguru import logger
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import HTTPException
 from pydantic import BaseModel, Field
@@ -11,6 +13,14 @@ from communex.module.module import Module, endpoint
 from communex.client import Ss58Address
 from eden_subnet.miner.tiktokenizer import TikTokenizer
 from eden_subnet.miner.data_models import MinerSettings, EmbeddingRequest
+from eden_subnet.base.token_codec import (
+    DIGEST_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    encode_digest,
+    encode_tokens,
+    negotiate,
+)
+from eden_subnet.base.rpc import RPC_HEADER, RpcServer
 
 app = FastAPI()
 
@@ -106,7 +116,50 @@ class Miner(BaseModel, Module):
         Returns:
             None
         """
-        uvicorn.run(app, host=settings.host, port=settings.port)
+        if settings.rpc_port is None and settings.rpc_socket is None:
+            uvicorn.run(app, host=settings.host, port=settings.port)
+            return
+        asyncio.run(self.serve_with_rpc(settings))
+
+    async def serve_with_rpc(self, settings: MinerSettings):
+        """
+        Serves the HTTP app and the binary RPC channel on the same event loop.
+
+        The RPC transports are advertised to validators through the X-Eden-RPC header on /generate responses.
+
+        Args:
+            settings (MinerSettings): The settings object, with rpc_port and/or rpc_socket set.
+
+        Returns:
+            None
+        """
+        rpc_server = RpcServer(handler=self.handle_rpc)
+        await rpc_server.start(host=settings.host, port=settings.rpc_port, path=settings.rpc_socket)
+        app.state.rpc_advertisement = rpc_server.advertisement()
+        logger.info(f"RPC channel listening on {app.state.rpc_advertisement}")
+        try:
+            config = uvicorn.Config(app, host=settings.host, port=settings.port)
+            await uvicorn.Server(config).serve()
+        finally:
+            await rpc_server.close()
+
+    def handle_rpc(self, payload: bytes) -> bytes:
+        """
+        Answers one RPC request: a JSON generate request in, uint32 tokens out.
+
+        Args:
+            payload (bytes): The JSON-encoded request body, as sent to /generate. A "response_format"
+                of "digest" asks for the token count and digest instead of the tokens.
+
+        Returns:
+            bytes: The tokens as a little-endian uint32 array, or their encoded digest.
+        """
+        body = json.loads(payload)
+        result = self.generate(GenerateRequest(**body))
+        tokens = result["choices"][0]["message"]["content"]
+        if body.get("response_format") == "digest":
+            return encode_digest(tokens)
+        return encode_tokens(tokens)
 
     def __call__(self):
         """
@@ -128,7 +181,8 @@ class Miner(BaseModel, Module):
         Raises:
             HTTPException: If an HTTP exception occurs during the generation process.
         """
-        dict_request = request.messages[0].content
+        message = request.messages[0]
+        dict_request = message["content"] if isinstance(message, dict) else message.content
         return {
             "choices": [
                 {
@@ -141,15 +195,21 @@ class Miner(BaseModel, Module):
 
 
 @app.post("/generate")
-def generate(request: GenerateRequest):
+def generate(request: GenerateRequest, response: Response, accept: str | None = Header(default=None)):
     """
     A function that generates something based on the provided request.
 
+    Validators that list a binary token media type in their Accept header get the tokens as a
+    little-endian uint32 array (zstd-compressed if asked for), or only the token count and digest
+    if they ask for the digest media type; everyone else gets JSON.
+
     Args:
         request (GenerateRequest): The request object containing information for generation.
+        response (Response): The outgoing response, used to advertise the RPC channel.
+        accept (str | None): The Accept header of the request.
 
     Returns:
-        dict: A dictionary containing the generated choices.
+        dict | Response: A dictionary containing the generated choices, or the binary token payload.
 
     Raises:
         HTTPException: If an HTTP exception occurs during the generation process.
@@ -166,6 +226,22 @@ def generate(request: GenerateRequest):
         )
         result = miner.generate(request)
         logger.debug(f"result: {result}")
+        media_type = negotiate(accept)
+        headers = {}
+        if rpc_advertisement := getattr(app.state, "rpc_advertisement", None):
+            headers[RPC_HEADER] = rpc_advertisement
+            response.headers[RPC_HEADER] = rpc_advertisement
+        if result and media_type != JSON_MEDIA_TYPE:
+            tokens = result["choices"][0]["message"]["content"]
+            if media_type == DIGEST_MEDIA_TYPE:
+                content = encode_digest(tokens)
+            else:
+                content = encode_tokens(tokens, media_type)
+            return Response(
+                content=content,
+                media_type=media_type,
+                headers=headers,
+            )
         if result:
             return result
 
@@ -0,0 +1,164 @@
+"""
+Bookkeeping for miner capacity probes.
+
+A capacity probe sends a miner bursts of concurrent `/generate` requests of growing size, with prompts of
+different lengths, and measures the sustained tokens per second and the concurrency at which errors start.
+This module holds the per-UID results and the helpers that shape the bursts; the requests themselves are sent
+by the validator.
+"""
+
+import random
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+
+class CapacityRecord(NamedTuple):
+    """The outcome of one capacity probe of a miner."""
+
+    tokens_per_second: float
+    max_concurrency: int
+    error_onset: Optional[int]
+    probed_at: float
+
+
+class BurstResult(NamedTuple):
+    """The outcome of one burst of concurrent requests."""
+
+    concurrency: int
+    tokens: int
+    errors: int
+    elapsed: float
+
+
+def burst_levels(max_burst: int) -> List[int]:
+    """
+    Returns the burst sizes of a probe: powers of two up to and including max_burst.
+
+    Args:
+        max_burst (int): The largest burst.
+
+    Returns:
+        List[int]: The burst sizes, smallest first.
+    """
+    levels = []
+    level = 1
+    while level < max_burst:
+        levels.append(level)
+        level *= 2
+    levels.append(max(max_burst, 1))
+    return levels
+
+
+def prompt_variants(prompt: str, lengths: Sequence[int]) -> List[str]:
+    """
+    Builds prompts of the given lengths in characters by cutting or repeating a prompt.
+
+    Args:
+        prompt (str): The base prompt.
+        lengths (Sequence[int]): The wanted lengths.
+
+    Returns:
+        List[str]: One prompt per length.
+    """
+    prompt = prompt or "capacity probe"
+    return [(prompt * (length // len(prompt) + 1))[:length] for length in lengths]
+
+
+def summarize_bursts(bursts: Sequence[BurstResult], error_threshold: float, now: Optional[float] = None) -> CapacityRecord:
+    """
+    Turns the bursts of a probe into a capacity record.
+
+    The sustained rate is the best tokens per second among bursts whose error rate stayed at or below
+    error_threshold, and the error onset is the first burst size that went over it.
+
+    Args:
+        bursts (Sequence[BurstResult]): The bursts, in the order they were sent.
+        error_threshold (float): The largest error rate a burst may have and still count.
+        now (float, optional): The probe time. Defaults to `time.time()`.
+
+    Returns:
+        CapacityRecord: The probe outcome.
+    """
+    best_rate = 0.0
+    max_concurrency = 0
+    error_onset = None
+    for burst in bursts:
+        if burst.errors / burst.concurrency > error_threshold:
+            error_onset = burst.concurrency
+            break
+        max_concurrency = burst.concurrency
+        if burst.elapsed > 0:
+            best_rate = max(best_rate, burst.tokens / burst.elapsed)
+    return CapacityRecord(best_rate, max_concurrency, error_onset, time.time() if now is None else now)
+
+
+class CapacityStore:
+    """
+    The latest capacity record of every probed miner UID.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty store.
+        """
+        self.records: Dict[int, CapacityRecord] = {}
+
+    def record(self, uid: int, record: CapacityRecord) -> None:
+        """
+        Stores a probe outcome, replacing the previous one for that UID.
+
+        Args:
+            uid (int): The miner UID.
+            record (CapacityRecord): The probe outcome.
+        """
+        self.records[uid] = record
+
+    def select(self, candidates: Iterable[int], count: int) -> List[int]:
+        """
+        Picks the UIDs to probe next: never-probed UIDs first, in random order, then the least recently probed.
+
+        Args:
+            candidates (Iterable[int]): The UIDs that may be probed.
+            count (int): The most UIDs to return.
+
+        Returns:
+            List[int]: The UIDs to probe.
+        """
+        candidates = list(candidates)
+        random.shuffle(candidates)
+        candidates.sort(key=lambda uid: self.records[uid].probed_at if uid in self.records else -1.0)
+        return candidates[:count]
+
+    def scores(self, uids: Iterable[int]) -> Dict[int, float]:
+        """
+        Returns the sustained tokens per second of each UID, 0 for UIDs never probed.
+
+        Args:
+            uids (Iterable[int]): The UIDs to score.
+
+        Returns:
+            Dict[int, float]: The score per UID.
+        """
+        return {uid: self.records[uid].tokens_per_second if uid in self.records else 0.0 for uid in uids}
+
+    def forget(self, uids: Iterable[int]) -> None:
+        """
+        Drops the records of the given UIDs.
+
+        Args:
+            uids (Iterable[int]): The UIDs to forget.
+        """
+        for uid in uids:
+            self.records.pop(uid, None)
+
+    def prune(self, active: Iterable[int]) -> None:
+        """
+        Drops the records of UIDs that are no longer registered.
+
+        Args:
+            active (Iterable[int]): The UIDs currently on chain.
+        """
+        active_uids = set(active)
+        for uid in list(self.records):
+            if uid not in active_uids:
+                del self.records[uid]
@@ -0,0 +1,163 @@
+"""
+An async facade over the blocking chain client.
+
+`CommuneClient` calls block for as long as the node takes to answer. Running them on the event loop thread, or
+on the default executor shared with tokenization, stalls every in-flight miner request. `AsyncChain` runs them
+on its own small thread pool, so chain queries overlap each other and the miner fan-out. Each call gets a
+timeout and is retried with exponential back-off. Node connections are pooled by the client itself, so the
+client should be built with `num_connections` at least as large as the pool for queries not to queue behind
+each other.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple, TypeVar
+
+from communex.client import CommuneClient
+from loguru import logger
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+T = TypeVar("T")
+
+
+def _log_retry(state: RetryCallState) -> None:
+    exception = state.outcome.exception() if state.outcome is not None else None
+    logger.warning(
+        f"\nChain call {getattr(state.fn, '__name__', state.fn)} failed (attempt {state.attempt_number}): "
+        f"{exception!r}, retrying in {state.next_action.sleep if state.next_action else 0:.1f}s"
+    )
+
+
+class AsyncChain:
+    """
+    Runs chain client calls on a dedicated thread pool with timeouts and retries.
+
+    Explanation:
+    Every call is submitted to the pool and awaited with `timeout`. A call that raises or times out is tried
+    again up to `attempts` times in total, sleeping a random delay under an exponentially growing cap between
+    tries. A timed-out call cannot be interrupted and keeps its worker thread until the node answers, which is why
+    the pool is separate from the default executor. It may also still take effect after the timeout, so calls
+    that are not idempotent, like votes, or that mutate shared state must be run with `attempts=1`.
+    """
+
+    def __init__(
+        self,
+        client: CommuneClient,
+        max_workers: int = 4,
+        timeout: float = 30.0,
+        attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+    ) -> None:
+        """
+        Initializes the facade.
+
+        Args:
+            client (CommuneClient): The blocking chain client.
+            max_workers (int): The number of threads running chain calls.
+            timeout (float): The seconds one attempt may take.
+            attempts (int): The total number of tries per call.
+            backoff (float): The base delay in seconds, doubled after every failed try.
+            max_backoff (float): The longest delay in seconds between retries.
+        """
+        self.client = client
+        self.timeout = timeout
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chain")
+
+    async def call(self, fn: Callable[..., T], *args: Any, attempts: int | None = None, **kwargs: Any) -> T:
+        """
+        Runs a blocking function on the chain pool, retrying failures with back-off.
+
+        Args:
+            fn (Callable): The function to run.
+            *args: Its positional arguments.
+            attempts (int, optional): Overrides the total number of tries for this call.
+            **kwargs: Its keyword arguments.
+
+        Returns:
+            The function's result.
+
+        Raises:
+            Exception: The last error once every attempt has failed, `asyncio.TimeoutError` on a timeout.
+        """
+        loop = asyncio.get_running_loop()
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(attempts or self.attempts),
+            wait=wait_random_exponential(multiplier=self.backoff, max=self.max_backoff),
+            retry=retry_if_exception_type(Exception),
+            before_sleep=_log_retry,
+            reraise=True,
+        )
+        async for attempt in retrying:
+            with attempt:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs)),
+                    timeout=self.timeout,
+                )
+        raise AssertionError("unreachable")
+
+    async def query_map_address(self, netuid: int = 10) -> Dict[int, str]:
+        """Returns the address of every module in a subnet."""
+        return await self.call(self.client.query_map_address, netuid=netuid)
+
+    async def query_map_key(self, netuid: int = 10) -> Dict[int, str]:
+        """Returns the key of every module in a subnet."""
+        return await self.call(self.client.query_map_key, netuid=netuid)
+
+    async def query_map_weights(self, netuid: int = 10) -> Dict[int, List[Tuple[int, int]]]:
+        """Returns the weight vector of every module in a subnet."""
+        return await self.call(self.client.query_map_weights, netuid=netuid)
+
+    async def query_map_staketo(self) -> Dict[str, List[Tuple[str, int]]]:
+        """Returns the stake delegated by every key."""
+        return await self.call(self.client.query_map_staketo)
+
+    async def query_maps(self, netuid: int = 10) -> Dict[str, Any]:
+        """
+        Runs the key, address, weights and stake queries of a subnet concurrently.
+
+        Args:
+            netuid (int): The subnet to read. Defaults to 10.
+
+        Returns:
+            dict: The results under "keys", "addresses", "weights" and "staketo".
+        """
+        keys, addresses, weights, staketo = await asyncio.gather(
+            self.query_map_key(netuid),
+            self.query_map_address(netuid),
+            self.query_map_weights(netuid),
+            self.query_map_staketo(),
+        )
+        return {"keys": keys, "addresses": addresses, "weights": weights, "staketo": staketo}
+
+    async def vote(self, key: Any, uids: List[int], weights: List[int], netuid: int = 10) -> Any:
+        """
+        Submits a weight vector, once. A vote that timed out may still be included, and retrying it could submit
+        a second extrinsic that costs another fee and counts against the rate limit.
+
+        Args:
+            key (Keypair): The validator key.
+            uids (List[int]): The voted UIDs.
+            weights (List[int]): The weight of each UID.
+            netuid (int): The subnet to vote on. Defaults to 10.
+
+        Returns:
+            ExtrinsicReceipt: The receipt of the vote.
+        """
+        return await self.call(self.client.vote, key=key, uids=uids, weights=weights, netuid=netuid, attempts=1)
+
+    def close(self) -> None:
+        """
+        Shuts the pool down without waiting for calls still running on it.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
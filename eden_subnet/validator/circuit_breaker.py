@@ -0,0 +1,175 @@
+"""
+Per-miner circuit breakers, so dead or chronically failing addresses stop costing a full request every round.
+"""
+
+import time
+from enum import Enum
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class CircuitState(str, Enum):
+    """
+    The states of a circuit breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker for a single miner endpoint.
+
+    Explanation:
+    The breaker stays closed while requests succeed. After `failure_threshold` consecutive failures it opens
+    for a back-off period that doubles every time it trips again, up to `max_backoff`. Once the back-off has
+    elapsed it is half-open: the caller should send a cheap probe, and the next outcome either closes it or
+    opens it again with a longer back-off.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff: float = 120.0,
+        max_backoff: float = 3600.0,
+    ) -> None:
+        """
+        Initializes a closed breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the breaker.
+            base_backoff (float): Seconds the breaker stays open after the first trip.
+            max_backoff (float): Upper bound on the open period in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self._state = CircuitState.CLOSED
+
+    def state(self, now: Optional[float] = None) -> CircuitState:
+        """
+        Returns the current state, moving an open breaker to half-open once its back-off has elapsed.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to `time.monotonic()`.
+
+        Returns:
+            CircuitState: The current state.
+        """
+        now = time.monotonic() if now is None else now
+        if self._state is CircuitState.OPEN and now >= self.open_until:
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def record_success(self) -> None:
+        """
+        Closes the breaker and forgets previous failures.
+        """
+        self._state = CircuitState.CLOSED
+        self.failures = 0
+        self.trips = 0
+
+    def record_failure(self, now: Optional[float] = None) -> None:
+        """
+        Counts a failure and opens the breaker if the threshold is reached or a half-open probe failed.
+
+        Args:
+            now (float, optional): The current monotonic time. Defaults to `time.monotonic()`.
+        """
+        now = time.monotonic() if now is None else now
+        self.failures += 1
+        if self.state(now) is CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            backoff = min(self.max_backoff, self.base_backoff * 2**self.trips)
+            self.trips += 1
+            self.open_until = now + backoff
+            self._state = CircuitState.OPEN
+
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers keyed by miner UID and address.
+
+    Explanation:
+    Keying on the address as well as the UID means a miner that re-registers on a new address starts with a
+    fresh, closed breaker.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff: float = 120.0,
+        max_backoff: float = 3600.0,
+    ) -> None:
+        """
+        Initializes an empty registry.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open a breaker.
+            base_backoff (float): Seconds a breaker stays open after its first trip.
+            max_backoff (float): Upper bound on the open period in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.breakers: Dict[Tuple[int, str], CircuitBreaker] = {}
+
+    def get(self, uid: int, address: str) -> CircuitBreaker:
+        """
+        Returns the breaker for a UID and address, creating a closed one if needed.
+
+        Args:
+            uid (int): The miner UID.
+            address (str): The miner address.
+
+        Returns:
+            CircuitBreaker: The breaker for that endpoint.
+        """
+        key = (uid, address)
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(
+                failure_threshold=self.failure_threshold,
+                base_backoff=self.base_backoff,
+                max_backoff=self.max_backoff,
+            )
+        return self.breakers[key]
+
+    def prune(self, active: Iterable[Tuple[int, str]]) -> None:
+        """
+        Drops breakers for endpoints that are no longer registered.
+
+        Args:
+            active (Iterable[Tuple[int, str]]): The (uid, address) pairs currently on chain.
+        """
+        active_keys = set(active)
+        for key in list(self.breakers):
+            if key not in active_keys:
+                del self.breakers[key]
+
+    def forget(self, uids: Iterable[int]) -> None:
+        """
+        Drops every breaker of the given UIDs, so a UID taken over by a new module starts with a clean slate.
+
+        Args:
+            uids (Iterable[int]): The UIDs to forget.
+        """
+        forgotten = set(uids)
+        for key in list(self.breakers):
+            if key[0] in forgotten:
+                del self.breakers[key]
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Counts breakers by state.
+
+        Returns:
+            dict: The number of breakers in each state.
+        """
+        now = time.monotonic()
+        counts = {state.value: 0 for state in CircuitState}
+        for breaker in self.breakers.values():
+            counts[breaker.state(now).value] += 1
+        return counts
@@ -0,0 +1,160 @@
+"""
+Adaptive concurrency limiting for the validator's miner fan-out.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+
+class AdaptiveLimiter:
+    """
+    An AIMD (additive increase, multiplicative decrease) limit on in-flight requests.
+
+    Explanation:
+    The limit starts in slow start, growing by one for every fast, successful response, and switches to
+    additive increase (one per window of `limit` successes) after the first decrease. A failed request or a
+    response slower than the latency target cuts the limit by the backoff factor, at most once per latency
+    target, so one wave of timeouts only shrinks the limit once. The limit is kept between rounds so the
+    next round starts from what the network sustained last time.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 50,
+        min_limit: int = 8,
+        max_limit: int = 512,
+        latency_target: float = 5.0,
+        backoff: float = 0.7,
+    ) -> None:
+        """
+        Initializes the limiter.
+
+        Args:
+            initial_limit (int): The number of concurrent requests allowed before any feedback.
+            min_limit (int): The lowest the limit may shrink to.
+            max_limit (int): The highest the limit may grow to.
+            latency_target (float): Responses slower than this many seconds count as congestion.
+            backoff (float): The factor applied to the limit on congestion.
+        """
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.slow_start = True
+        self._last_decrease = float("-inf")
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.start_round()
+
+    @property
+    def current_limit(self) -> int:
+        """
+        Returns the limit as a whole number of requests.
+        """
+        return int(self.limit)
+
+    def start_round(self) -> None:
+        """
+        Resets the per-round counters reported by `round_summary`.
+        """
+        self._round_start_limit = self.current_limit
+        self._requests = 0
+        self._errors = 0
+        self._slow = 0
+        self._increases = 0
+        self._decreases = 0
+        self._latency_total = 0.0
+        self._peak_in_flight = 0
+
+    def round_summary(self) -> Dict[str, float]:
+        """
+        Summarises the limiter's decisions since the last `start_round`.
+
+        Returns:
+            dict: Start and end limit, peak in-flight count, request, error and slow counts,
+            number of increases and decreases, and the mean latency in seconds.
+        """
+        return {
+            "start_limit": self._round_start_limit,
+            "limit": self.current_limit,
+            "peak_in_flight": self._peak_in_flight,
+            "requests": self._requests,
+            "errors": self._errors,
+            "slow": self._slow,
+            "increases": self._increases,
+            "decreases": self._decreases,
+            "mean_latency": self._latency_total / self._requests if self._requests else 0.0,
+        }
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Waits for a free slot under the current limit and holds it for the duration of the block.
+        """
+        while self.in_flight >= self.current_limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+        self.in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._wake()
+
+    def record(self, latency: float, success: bool) -> None:
+        """
+        Feeds the outcome of one request back into the limit.
+
+        Args:
+            latency (float): The request duration in seconds.
+            success (bool): Whether the request produced a usable response.
+        """
+        self._requests += 1
+        self._latency_total += latency
+        if not success:
+            self._errors += 1
+        elif latency > self.latency_target:
+            self._slow += 1
+
+        if success and latency <= self.latency_target:
+            step = 1.0 if self.slow_start else 1.0 / self.limit
+            new_limit = min(float(self.max_limit), self.limit + step)
+            if new_limit > self.limit:
+                self.limit = new_limit
+                self._increases += 1
+        else:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = now
+                self._decreases += 1
+                self.slow_start = False
+        self._wake()
+
+    def _wake(self) -> None:
+        """
+        Releases as many waiters as there are free slots under the current limit.
+        """
+        free = self.current_limit - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
@@ -0,0 +1,219 @@
+"""
+Per-UID streaming latency and throughput quantiles.
+
+Every sample lands in a logarithmic bucket, as in an HDR histogram, so quantiles come back within a fixed
+relative error and memory grows with the spread of the values rather than the number of samples. Once a sketch
+holds more than `max_samples` samples its counts are halved, which keeps it bounded and biased towards recent
+rounds.
+"""
+
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """
+    A log-bucketed histogram answering quantile queries within `precision` relative error.
+    """
+
+    def __init__(self, precision: float = 0.02, min_value: float = 1e-6, max_samples: int = 10_000) -> None:
+        """
+        Initializes an empty sketch.
+
+        Args:
+            precision (float): The relative width of a bucket, and so the relative error of a quantile.
+            min_value (float): Values below this are counted in the lowest bucket.
+            max_samples (int): The sample count past which all counts are halved.
+        """
+        self.precision = precision
+        self.min_value = min_value
+        self.max_samples = max_samples
+        self.buckets: Dict[int, float] = {}
+        self.count = 0.0
+        self._log_base = math.log1p(precision)
+
+    def add(self, value: float) -> None:
+        """
+        Adds a sample.
+
+        Args:
+            value (float): The sample value.
+        """
+        index = int(math.log(max(value, self.min_value) / self.min_value) / self._log_base)
+        self.buckets[index] = self.buckets.get(index, 0.0) + 1.0
+        self.count += 1.0
+        if self.count > self.max_samples:
+            self._halve()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Adds the samples of a sketch built with the same precision and minimum value.
+
+        Args:
+            other (QuantileSketch): The sketch to merge in.
+        """
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0.0) + count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Returns the approximate q-quantile.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            float, optional: The value at that quantile, or None if the sketch is empty.
+        """
+        if self.count <= 0:
+            return None
+        rank = q * self.count
+        seen = 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                break
+        # The geometric midpoint of the bucket.
+        return self.min_value * math.exp((index + 0.5) * self._log_base)
+
+    def _halve(self) -> None:
+        self.buckets = {index: count / 2 for index, count in self.buckets.items() if count >= 1.0}
+        self.count = sum(self.buckets.values())
+
+
+class LatencyTracker:
+    """
+    Latency and throughput sketches for every miner UID, kept across rounds.
+    """
+
+    def __init__(self, precision: float = 0.02, max_samples: int = 10_000) -> None:
+        """
+        Initializes an empty tracker.
+
+        Args:
+            precision (float): The relative error of reported quantiles.
+            max_samples (int): The per-UID sample count past which older samples are aged out.
+        """
+        self.precision = precision
+        self.max_samples = max_samples
+        self.latency: Dict[int, QuantileSketch] = {}
+        self.throughput: Dict[int, QuantileSketch] = {}
+
+    def _new_sketch(self) -> QuantileSketch:
+        return QuantileSketch(precision=self.precision, max_samples=self.max_samples)
+
+    def record(self, uid: int, latency: float, size: Optional[int] = None) -> None:
+        """
+        Records one successful request.
+
+        Args:
+            uid (int): The miner UID.
+            latency (float): The request latency in seconds.
+            size (int, optional): The response size in bytes, used for the throughput sketch.
+        """
+        self.latency.setdefault(uid, self._new_sketch()).add(latency)
+        if size is not None and latency > 0:
+            self.throughput.setdefault(uid, self._new_sketch()).add(size / latency)
+
+    def quantiles(self, uid: int) -> Dict[str, Optional[float]]:
+        """
+        Returns the latency and bytes per second quantiles for a UID.
+
+        Args:
+            uid (int): The miner UID.
+
+        Returns:
+            dict: p50, p95 and p99 latency in seconds and p50 bytes per second, None where nothing was recorded.
+        """
+        latency = self.latency.get(uid)
+        throughput = self.throughput.get(uid)
+        result = {
+            f"latency_p{round(q * 100)}": latency.quantile(q) if latency else None for q in QUANTILES
+        }
+        result["bytes_per_second_p50"] = throughput.quantile(0.5) if throughput else None
+        return result
+
+    def speed_scores(self, uids: Iterable[int], q: float = 0.95) -> Dict[int, float]:
+        """
+        Scores UIDs by the inverse of their latency at quantile q, so faster miners score higher.
+
+        Args:
+            uids (Iterable[int]): The UIDs to score.
+            q (float): The latency quantile to score on.
+
+        Returns:
+            Dict[int, float]: The score per UID, 0 for UIDs without samples.
+        """
+        scores = {}
+        for uid in uids:
+            sketch = self.latency.get(uid)
+            value = sketch.quantile(q) if sketch else None
+            scores[uid] = 1.0 / value if value else 0.0
+        return scores
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """
+        Returns latency quantiles across every request recorded for the subnet.
+
+        Returns:
+            dict: p50, p95 and p99 latency in seconds, and the number of UIDs tracked.
+        """
+        merged = self._new_sketch()
+        for sketch in self.latency.values():
+            merged.merge(sketch)
+        result = {f"latency_p{round(q * 100)}": merged.quantile(q) for q in QUANTILES}
+        result["uids"] = len(self.latency)
+        return result
+
+    def export(self, uids: Iterable[int]) -> Dict[int, Tuple[Optional[QuantileSketch], Optional[QuantileSketch]]]:
+        """
+        Returns the sketches of some UIDs, for shipping from a worker process to the parent.
+
+        Args:
+            uids (Iterable[int]): The UIDs to export.
+
+        Returns:
+            dict: The latency and throughput sketch per UID.
+        """
+        return {uid: (self.latency.get(uid), self.throughput.get(uid)) for uid in uids}
+
+    def update(self, exported: Dict[int, Tuple[Optional[QuantileSketch], Optional[QuantileSketch]]]) -> None:
+        """
+        Replaces the sketches of the UIDs in an export.
+
+        Args:
+            exported (dict): The output of `export`.
+        """
+        for uid, (latency, throughput) in exported.items():
+            for sketches, sketch in ((self.latency, latency), (self.throughput, throughput)):
+                if sketch is None:
+                    sketches.pop(uid, None)
+                else:
+                    sketches[uid] = sketch
+
+    def forget(self, uids: Iterable[int]) -> None:
+        """
+        Drops the sketches of the given UIDs.
+
+        Args:
+            uids (Iterable[int]): The UIDs to forget.
+        """
+        for uid in uids:
+            self.latency.pop(uid, None)
+            self.throughput.pop(uid, None)
+
+    def prune(self, active: Iterable[int]) -> None:
+        """
+        Drops the sketches of UIDs that are no longer registered.
+
+        Args:
+            active (Iterable[int]): The UIDs currently on chain.
+        """
+        active_uids = set(active)
+        for sketches in (self.latency, self.throughput):
+            for uid in list(sketches):
+                if uid not in active_uids:
+                    del sketches[uid]
@@ -0,0 +1,398 @@
+"""
+A per-round snapshot of the subnet's on-chain state.
+
+The keys, addresses, weights and stake a round needs are read in a single batched storage query against one
+block hash, so every consumer in the round sees the same, consistent view and the node is asked once instead
+of once per table per consumer. `MetagraphRefresher` only re-reads the tables once a new block has arrived and
+a minimum interval has passed, and reports which UIDs changed so per-miner state can be invalidated selectively.
+Snapshots can be saved as a directory of column files and memory-mapped back at startup, so a restarted
+validator does not have to wait for the chain before its first round.
+"""
+
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from communex.client import CommuneClient, transform_stake_dmap
+from loguru import logger
+from pydantic import BaseModel, PrivateAttr
+from tenacity import Retrying, stop_after_attempt, wait_random_exponential
+
+from eden_subnet.base.metagraph_index import MetagraphIndex
+
+# Stake credited to every registered key, so miners without stake still score above zero.
+BASE_STAKE = 0.00001
+SNAPSHOT_VERSION = 1
+_CURRENT_FILE = "CURRENT"
+
+
+class Metagraph(BaseModel):
+    """
+    The keys, addresses, weights and stake of a subnet at one block.
+
+    Explanation:
+    `weights` holds the weight vector set by `weights_uid`, reduced to one weight per UID, and `stake` holds the
+    total stake delegated to each registered key. Snapshots are not modified once built, so the lookup index
+    over their keys and addresses is built on first use and kept. `model_copy` drops the index, so a copy with
+    updated keys or addresses builds its own.
+    """
+
+    netuid: int
+    block_number: Optional[int] = None
+    block_hash: Optional[str] = None
+    keys: Dict[int, str] = {}
+    addresses: Dict[int, str] = {}
+    weights: Dict[int, int] = {}
+    stake: Dict[int, float] = {}
+    _index: Optional[MetagraphIndex] = PrivateAttr(default=None)
+
+    @property
+    def index(self) -> MetagraphIndex:
+        """
+        The uid↔key and uid↔endpoint index of this snapshot.
+        """
+        if self._index is None:
+            self._index = MetagraphIndex(self.keys, self.addresses)
+        return self._index
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "Metagraph":
+        """
+        Returns a copy of the snapshot, without the index of the original.
+
+        Args:
+            update (dict, optional): Field values to change in the copy.
+            deep (bool): Whether to deep-copy the fields.
+
+        Returns:
+            Metagraph: The copy.
+        """
+        copy = super().model_copy(update=update, deep=deep)
+        copy._index = None
+        return copy
+
+    def uid_of(self, ss58_address: str) -> Optional[int]:
+        """
+        Returns the UID registered with a key.
+
+        Args:
+            ss58_address (str): The SS58 address of the key.
+
+        Returns:
+            int, optional: The UID, or None if the key is not registered.
+        """
+        return self.index.uid_of(ss58_address)
+
+
+def weights_of(weights_map: Optional[Dict[int, List[Tuple[int, int]]]], uid: int) -> Dict[int, int]:
+    """
+    Reduces the weight vector set by one UID to a mapping of UID to weight, keeping the first entry per UID.
+
+    Args:
+        weights_map (dict, optional): The Weights storage map, from voting UID to (uid, weight) pairs.
+        uid (int): The voting UID whose weights are used.
+
+    Returns:
+        Dict[int, int]: The weight per UID.
+    """
+    weight_dict = {}
+    for target, weight in (weights_map or {}).get(uid, []):
+        if target not in weight_dict:
+            weight_dict[target] = weight
+    return weight_dict
+
+
+def stake_of(keys: Dict[int, str], staketo_map: Dict[str, Iterable[Tuple[str, int]]]) -> Dict[int, float]:
+    """
+    Sums the stake delegated to each registered key.
+
+    Args:
+        keys (Dict[int, str]): The UID to key mapping.
+        staketo_map (dict): The StakeTo storage, from staker to (key, amount) pairs.
+
+    Returns:
+        Dict[int, float]: The stake per UID, for keys that appear in the StakeTo map.
+    """
+    staketo_dict = {}
+    for uid, key in keys.items():
+        if key not in staketo_map:
+            continue
+        staketo_dict[uid] = BASE_STAKE + sum(value for _, value in staketo_map[key])
+    return staketo_dict
+
+
+def current_block(client: CommuneClient) -> Tuple[int, str]:
+    """
+    Reads the number and hash of the chain head from its header, without downloading the block body.
+
+    Args:
+        client (CommuneClient): The chain client.
+
+    Returns:
+        Tuple[int, str]: The block number and block hash.
+    """
+    with client.get_conn(init=True) as substrate:
+        header = substrate.get_block_header()["header"]
+    return int(header["number"]), header["hash"]
+
+
+def fetch_metagraph(
+    client: CommuneClient,
+    netuid: int = 10,
+    weights_uid: int = 1,
+    block: Optional[Tuple[int, str]] = None,
+) -> Metagraph:
+    """
+    Reads a subnet's keys, addresses, weights and stake in one batched query at one block.
+
+    Args:
+        client (CommuneClient): The chain client.
+        netuid (int): The subnet to read. Defaults to 10.
+        weights_uid (int): The UID whose weight vector is read. Defaults to 1.
+        block (Tuple[int, str], optional): The block number and hash to read at. Defaults to the chain head.
+
+    Returns:
+        Metagraph: The snapshot.
+    """
+    logger.info("\nFetching metagraph")
+    block_number, block_hash = block if block is not None else current_block(client)
+    result: Dict[str, Dict[Any, Any]] = client.query_batch_map(
+        {
+            "SubspaceModule": [("Keys", [netuid]), ("Address", [netuid]), ("StakeTo", [])],
+            "SubnetEmissionModule": [("Weights", [netuid])],
+        },
+        block_hash,
+    )
+    keys = dict(result.get("Keys", {}))
+    return Metagraph(
+        netuid=netuid,
+        block_number=block_number,
+        block_hash=block_hash,
+        keys=keys,
+        addresses=dict(result.get("Address", {})),
+        weights=weights_of(result.get("Weights"), weights_uid),
+        stake=stake_of(keys, transform_stake_dmap(result.get("StakeTo", {}))),
+    )
+
+
+class MetagraphDiff(NamedTuple):
+    """The UIDs that changed between two metagraph snapshots."""
+
+    added: Set[int]
+    removed: Set[int]
+    address_changed: Set[int]
+    key_changed: Set[int]
+    stake_changed: Set[int]
+    stale_addresses: Set[str]
+
+    @classmethod
+    def empty(cls) -> "MetagraphDiff":
+        """
+        Returns a diff with no changes.
+        """
+        return cls(set(), set(), set(), set(), set(), set())
+
+    @property
+    def replaced(self) -> Set[int]:
+        """
+        The UIDs now served by a different module or machine, whose per-miner state no longer applies.
+        """
+        return self.removed | self.address_changed | self.key_changed
+
+    def __bool__(self) -> bool:
+        return any(self[:5])
+
+
+def diff_metagraphs(old: Optional[Metagraph], new: Metagraph) -> MetagraphDiff:
+    """
+    Compares two snapshots UID by UID.
+
+    Args:
+        old (Metagraph, optional): The previous snapshot. With None, every UID counts as added.
+        new (Metagraph): The new snapshot.
+
+    Returns:
+        MetagraphDiff: The changed UIDs, and the normalised addresses no UID uses any more.
+    """
+    if old is None:
+        return MetagraphDiff(set(new.keys), set(), set(), set(), set(), set())
+    old_uids, new_uids = set(old.keys), set(new.keys)
+    common = old_uids & new_uids
+    return MetagraphDiff(
+        added=new_uids - old_uids,
+        removed=old_uids - new_uids,
+        address_changed={uid for uid in common if old.addresses.get(uid) != new.addresses.get(uid)},
+        key_changed={uid for uid in common if old.keys[uid] != new.keys[uid]},
+        stake_changed={uid for uid in common if old.stake.get(uid) != new.stake.get(uid)},
+        stale_addresses=set(old.index.endpoint_uids) - set(new.index.endpoint_uids),
+    )
+
+
+class MetagraphRefresher:
+    """
+    Keeps a metagraph snapshot current without re-reading the chain more than needed.
+
+    Explanation:
+    A refresh first reads the chain head's header. The tables are only read again once `min_interval` seconds
+    have passed since the last read and the head has moved past the block of the current snapshot. The head and
+    the tables are each read up to `attempts` times with a random exponential back-off, so a transient node
+    error is retried without repeating the whole refresh. Refreshes are serialized by a lock, so a refresh that
+    outlived its caller's timeout cannot race the next one.
+    """
+
+    def __init__(
+        self,
+        client: CommuneClient,
+        netuid: int = 10,
+        weights_uid: int = 1,
+        min_interval: float = 60.0,
+        attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+    ) -> None:
+        """
+        Initializes a refresher with no snapshot.
+
+        Args:
+            client (CommuneClient): The chain client.
+            netuid (int): The subnet to read. Defaults to 10.
+            weights_uid (int): The UID whose weight vector is read. Defaults to 1.
+            min_interval (float): The fewest seconds between two reads of the tables.
+            attempts (int): The total number of tries per chain read.
+            backoff (float): The base delay in seconds between tries, doubled after every failed one.
+            max_backoff (float): The longest delay in seconds between tries.
+        """
+        self.client = client
+        self.netuid = netuid
+        self.weights_uid = weights_uid
+        self.min_interval = min_interval
+        self.metagraph: Optional[Metagraph] = None
+        self.last_refresh = -math.inf
+        self.lock = threading.RLock()
+        self.retrying = Retrying(
+            stop=stop_after_attempt(attempts),
+            wait=wait_random_exponential(multiplier=backoff, max=max_backoff),
+            before_sleep=lambda state: logger.warning(
+                f"\nMetagraph read failed (attempt {state.attempt_number}): {state.outcome.exception()!r}"
+            ),
+            reraise=True,
+        )
+
+    def refresh(self, force: bool = False, now: Optional[float] = None) -> Tuple[Metagraph, MetagraphDiff]:
+        """
+        Returns an up to date snapshot and what changed since the previous one.
+
+        Args:
+            force (bool): Read the tables even if the interval has not passed or no block has arrived.
+            now (float, optional): The current monotonic time. Defaults to `time.monotonic()`.
+
+        Returns:
+            Tuple[Metagraph, MetagraphDiff]: The snapshot, and an empty diff if it was not re-read.
+        """
+        with self.lock:
+            now = time.monotonic() if now is None else now
+            if self.metagraph is not None and not force and now - self.last_refresh < self.min_interval:
+                return self.metagraph, MetagraphDiff.empty()
+            block = self.retrying(current_block, self.client)
+            if self.metagraph is not None and not force and block[0] == self.metagraph.block_number:
+                return self.metagraph, MetagraphDiff.empty()
+            metagraph = self.retrying(fetch_metagraph, self.client, self.netuid, self.weights_uid, block=block)
+            diff = diff_metagraphs(self.metagraph, metagraph)
+            self.metagraph = metagraph
+            self.last_refresh = now
+            return metagraph, diff
+
+
+def save_metagraph(metagraph: Metagraph, directory: str | Path) -> Path:
+    """
+    Writes a snapshot to disk as one .npy file per column.
+
+    Each snapshot goes to its own subdirectory, and the `CURRENT` file that names the live one is replaced
+    atomically once every column is written, so a crash mid-write never leaves a torn snapshot behind.
+    Older snapshots are removed afterwards.
+
+    Args:
+        metagraph (Metagraph): The snapshot to write.
+        directory (str | Path): The snapshot directory.
+
+    Returns:
+        Path: The subdirectory holding the new snapshot.
+    """
+    directory = Path(directory)
+    name = f"{metagraph.block_number or 0}-{time.time_ns()}"
+    target = directory / name
+    target.mkdir(parents=True)
+    uids = sorted(set(metagraph.keys) | set(metagraph.addresses) | set(metagraph.stake))
+    weight_uids = sorted(metagraph.weights)
+    columns = {
+        "uids": np.array(uids, dtype=np.int64),
+        "keys": np.array([metagraph.keys.get(uid, "").encode() for uid in uids], dtype=bytes),
+        "addresses": np.array([metagraph.addresses.get(uid, "").encode() for uid in uids], dtype=bytes),
+        "stake": np.array([metagraph.stake.get(uid, np.nan) for uid in uids], dtype=np.float64),
+        "weight_uids": np.array(weight_uids, dtype=np.int64),
+        "weights": np.array([metagraph.weights[uid] for uid in weight_uids], dtype=np.int64),
+    }
+    for column, values in columns.items():
+        np.save(target / f"{column}.npy", values)
+    (target / "meta.json").write_text(json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "netuid": metagraph.netuid,
+        "block_number": metagraph.block_number,
+        "block_hash": metagraph.block_hash,
+    }))
+    pointer = directory / f"{_CURRENT_FILE}.tmp"
+    pointer.write_text(name)
+    os.replace(pointer, directory / _CURRENT_FILE)
+    for old in directory.iterdir():
+        if old.is_dir() and old.name != name:
+            shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def load_metagraph(directory: str | Path) -> Optional[Metagraph]:
+    """
+    Reads the snapshot written last by `save_metagraph`, memory-mapping its columns.
+
+    Args:
+        directory (str | Path): The snapshot directory.
+
+    Returns:
+        Metagraph, optional: The snapshot, or None if there is none or it cannot be read.
+    """
+    directory = Path(directory)
+    try:
+        target = directory / (directory / _CURRENT_FILE).read_text().strip()
+        meta = json.loads((target / "meta.json").read_text())
+        if meta.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"\nIgnoring metagraph snapshot with version {meta.get('version')}")
+            return None
+        netuid, block_number, block_hash = meta["netuid"], meta["block_number"], meta["block_hash"]
+        columns = {
+            column: np.load(target / f"{column}.npy", mmap_mode="r")
+            for column in ("uids", "keys", "addresses", "stake", "weight_uids", "weights")
+        }
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug(f"\nNo usable metagraph snapshot in {directory}: {e}")
+        return None
+    uids = columns["uids"].tolist()
+    if not len(uids) == len(columns["keys"]) == len(columns["addresses"]) == len(columns["stake"]):
+        logger.warning(f"\nIgnoring metagraph snapshot in {target} with mismatched columns")
+        return None
+    keys = {uid: key.decode() for uid, key in zip(uids, columns["keys"].tolist()) if key}
+    addresses = {uid: address.decode() for uid, address in zip(uids, columns["addresses"].tolist()) if address}
+    stake = {uid: value for uid, value in zip(uids, columns["stake"].tolist()) if not math.isnan(value)}
+    return Metagraph(
+        netuid=netuid,
+        block_number=block_number,
+        block_hash=block_hash,
+        keys=keys,
+        addresses=addresses,
+        weights=dict(zip(columns["weight_uids"].tolist(), columns["weights"].tolist())),
+        stake=stake,
+    )
@@ -0,0 +1,164 @@
+"""
+Plans validation rounds against block production instead of the wall clock.
+
+Weights only take effect when the subnet's epoch runs, every `tempo` blocks, and a key may only send a
+transaction every `tx_rate_limit` blocks. Voting more than once per epoch wastes a transaction, and a vote that
+lands just after an epoch waits a whole tempo to count. `VoteScheduler` picks the block to vote at, as late
+before an epoch as a safety margin allows and never inside the rate limit, and works back from it to when the
+round should start and how long its fan-out may run.
+
+The head block is estimated between reads from the last observed block and the nominal block time.
+An epoch runs at every block where `(block + netuid) % tempo == 0`.
+"""
+
+import math
+from typing import NamedTuple, Optional
+
+
+class RoundPlan(NamedTuple):
+    """When a round should start and finish, on the caller's clock, and the block it votes at."""
+
+    vote_block: int
+    start_at: float
+    deadline: float
+
+
+class VoteScheduler:
+    """
+    Chooses vote blocks and round budgets from the tempo, the rate limit and the chain head.
+
+    Explanation:
+    `observe` anchors the block clock and `set_params` stores the tempo and rate limit; both are cheap to call
+    every round. `plan` returns the next vote block and the window for the round that leads up to it: the
+    round ends `scoring_reserve` seconds before the vote block, lasts at most `max_budget` seconds, and if
+    fewer than `min_budget` seconds are left before the next useful vote block the round targets the epoch
+    after it instead. `record_vote` must be called after every vote that landed and `finish_round` after every
+    round, whether it voted or not, so the next round targets a later block.
+    """
+
+    def __init__(
+        self,
+        netuid: int = 10,
+        block_time: float = 8.0,
+        vote_margin: int = 2,
+        scoring_reserve: float = 10.0,
+        min_budget: float = 15.0,
+        max_budget: float = 300.0,
+        params_ttl: float = 600.0,
+    ) -> None:
+        """
+        Initializes a scheduler with no chain state.
+
+        Args:
+            netuid (int): The subnet voted on. Defaults to 10.
+            block_time (float): The nominal seconds per block.
+            vote_margin (int): The blocks between the vote and the epoch it is meant for.
+            scoring_reserve (float): The seconds kept between the end of the fan-out and the vote block.
+            min_budget (float): The shortest fan-out worth running.
+            max_budget (float): The longest fan-out to run.
+            params_ttl (float): The seconds after which the tempo and rate limit are read again.
+        """
+        self.netuid = netuid
+        self.block_time = block_time
+        self.vote_margin = vote_margin
+        self.scoring_reserve = scoring_reserve
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.params_ttl = params_ttl
+        self.tempo = 0
+        self.rate_limit = 0
+        self.params_at = -math.inf
+        self.block: Optional[int] = None
+        self.block_at = 0.0
+        self.last_vote_block: Optional[int] = None
+        self.last_round_block: Optional[int] = None
+
+    def needs_params(self, now: float) -> bool:
+        """
+        Returns whether the tempo and rate limit should be read from the chain again.
+        """
+        return now - self.params_at >= self.params_ttl
+
+    def set_params(self, tempo: int, rate_limit: int, now: float) -> None:
+        """
+        Stores the subnet's tempo and the transaction rate limit, both in blocks.
+        """
+        self.tempo = max(int(tempo), 0)
+        self.rate_limit = max(int(rate_limit), 0)
+        self.params_at = now
+
+    def observe(self, block_number: int, now: float) -> None:
+        """
+        Anchors the block clock at a freshly read head block.
+        """
+        self.block = block_number
+        self.block_at = now
+
+    def estimate_block(self, now: float) -> float:
+        """
+        Returns the fractional head block at `now`, extrapolated from the last observation.
+
+        Raises:
+            ValueError: If no block was observed yet.
+        """
+        if self.block is None:
+            raise ValueError("No block observed yet")
+        return self.block + (now - self.block_at) / self.block_time
+
+    def next_epoch_block(self, block: int) -> int:
+        """
+        Returns the first block after `block` at which the subnet's epoch runs.
+        """
+        if not self.tempo:
+            return block + 1
+        return block + 1 + (-(block + 1 + self.netuid)) % self.tempo
+
+    def target_vote_block(self, earliest: int) -> int:
+        """
+        Returns the block to vote at: `vote_margin` blocks before the first epoch this validator has not voted
+        for yet that can still be reached from `earliest`. Without a tempo, `earliest` itself.
+        """
+        if not self.tempo:
+            return earliest
+        epoch = self.next_epoch_block(earliest - 1 + self.vote_margin)
+        if self.last_vote_block is not None and self.next_epoch_block(self.last_vote_block) == epoch:
+            epoch = self.next_epoch_block(epoch)
+        return epoch - self.vote_margin
+
+    def plan(self, now: float) -> RoundPlan:
+        """
+        Plans the next round.
+
+        Args:
+            now (float): The current time, on the clock the block observations were made on.
+
+        Returns:
+            RoundPlan: The vote block, and when the round should start and its fan-out end.
+        """
+        current = self.estimate_block(now)
+        earliest = math.floor(current) + 1
+        if self.last_vote_block is not None:
+            earliest = max(earliest, self.last_vote_block + max(self.rate_limit, 1))
+        if self.last_round_block is not None:
+            earliest = max(earliest, self.last_round_block + 1)
+        target = self.target_vote_block(earliest)
+        while (budget := (target - current) * self.block_time - self.scoring_reserve) < self.min_budget:
+            target = self.target_vote_block(target + 1) if self.tempo else target + 1
+        deadline = now + budget
+        return RoundPlan(target, max(now, deadline - self.max_budget), deadline)
+
+    def record_vote(self, now: float) -> int:
+        """
+        Records that a vote landed at the estimated head block.
+
+        Returns:
+            int: The block the vote is recorded at.
+        """
+        self.last_vote_block = math.ceil(self.estimate_block(now))
+        return self.last_vote_block
+
+    def finish_round(self, vote_block: int) -> None:
+        """
+        Records that the round planned for `vote_block` ran, so no other round is planned for it.
+        """
+        self.last_round_block = vote_block
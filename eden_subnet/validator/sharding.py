@@ -0,0 +1,217 @@
+"""
+Multi-process sharded fan-out for large subnets.
+
+The UID set is split across worker processes by `uid % shards`, so every miner always lands on the same
+worker and that worker's connection pool, concurrency limiter, circuit breakers and latency sketches keep
+their state from round to round. Each worker runs its own event loop, fan-out and scoring, and only the
+per-UID scores, plus the latency sketches when the parent tracks them, are sent back to the parent.
+
+Workers are started with the `forkserver` method, or `spawn` where it is not available, never `fork`: the pool
+is built lazily from inside the running event loop, when the parent already has chain, executor and websocket
+threads, and forking a multi-threaded process can deadlock the child. Metagraph changes seen by the parent are
+forwarded with `invalidate`, so the workers drop the breakers, latency sketches and RPC channels of changed
+miners. Circuit breakers only trip inside the workers, so the parent's breakers, used to filter capacity probe
+candidates, stay closed in sharded mode.
+
+Workers never read the chain or vote: the parent syncs the metagraph and passes each shard its addresses. Their
+validators are built on an empty `FakeChain`, so a worker opens no node connections and does not depend on the
+chain client the parent installed. A worker whose validator cannot be built raises `WorkerStartError` for every
+call, which the parent re-raises instead of scoring the shard with the default score.
+"""
+
+import asyncio
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from eden_subnet.base.chain import FakeChain
+from eden_subnet.validator.latency import LatencyTracker
+
+_worker_validator: Any = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_error: Optional[str] = None
+
+
+class WorkerStartError(RuntimeError):
+    """Raised by a shard worker whose validator could not be built."""
+
+
+def shard_addresses(addresses: Dict[int, str], shards: int) -> List[Dict[int, str]]:
+    """
+    Splits a UID to address mapping into `shards` mappings by `uid % shards`.
+
+    Args:
+        addresses (Dict[int, str]): The UID to address mapping.
+        shards (int): The number of shards.
+
+    Returns:
+        List[Dict[int, str]]: One mapping per shard, some of which may be empty.
+    """
+    result: List[Dict[int, str]] = [{} for _ in range(shards)]
+    for uid, address in addresses.items():
+        result[uid % shards][uid] = address
+    return result
+
+
+def _init_worker(validator_cls, settings) -> None:
+    """
+    Builds the worker's validator and the event loop it keeps for its whole life. A failure is kept and raised
+    by every later call, since an exception here would only surface in the parent as a broken pool.
+    """
+    global _worker_validator, _worker_loop, _worker_error
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    try:
+        _worker_validator = validator_cls(settings=settings, chain_client=FakeChain(keys={}, addresses={}))
+    except Exception:
+        _worker_error = traceback.format_exc()
+
+
+def _validator() -> Any:
+    if _worker_error is not None:
+        raise WorkerStartError(f"Shard worker could not build its validator:\n{_worker_error}")
+    return _worker_validator
+
+
+def _invalidate_shard(diff) -> None:
+    """
+    Drops the worker's per-miner state of the UIDs in a metagraph diff.
+    """
+    _worker_loop.run_until_complete(_validator().invalidate_miners(diff))
+
+
+def _score_shard(selfuid, encoding, prompt_message, addresses, export_latency=False, round_timeout=None):
+    """
+    Runs the fan-out and scoring for one shard inside a worker process.
+
+    Returns the per-UID scores and, if export_latency is set, the shard's latency sketches.
+    """
+    validator = _validator()
+    scores = _worker_loop.run_until_complete(
+        validator.get_miner_responses(selfuid, encoding, prompt_message, addresses, round_timeout)
+    )
+    latency = validator.latency.export(addresses) if export_latency else None
+    return scores, latency
+
+
+class ShardedFanout:
+    """
+    Distributes miner requests and scoring over a fixed set of worker processes.
+
+    Explanation:
+    Each shard gets its own single-process executor so a shard is always served by the same worker. If a
+    worker dies, its shard is scored with the default score for that round and the worker is restarted. If a
+    worker could not build its validator, the round fails with `WorkerStartError` instead.
+    """
+
+    def __init__(
+        self,
+        validator_cls,
+        settings,
+        processes: int,
+        default_score: float,
+        latency: Optional[LatencyTracker] = None,
+    ) -> None:
+        """
+        Initializes the worker pool.
+
+        Args:
+            validator_cls: The Validator class to instantiate in each worker, called with `settings` and
+                `chain_client`.
+            settings: The ValidatorSettings passed to each worker's validator.
+            processes (int): The number of worker processes, one per shard.
+            default_score (float): The score given to miners of a shard whose worker failed.
+            latency (LatencyTracker, optional): A tracker to refresh with the workers' latency sketches.
+        """
+        self.validator_cls = validator_cls
+        self.settings = settings
+        self.processes = processes
+        self.default_score = default_score
+        self.latency = latency
+        methods = multiprocessing.get_all_start_methods()
+        self.mp_context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.executors = [self._new_executor() for _ in range(processes)]
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=self.mp_context,
+            initializer=_init_worker,
+            initargs=(self.validator_cls, self.settings),
+        )
+
+    async def get_miner_responses(
+        self, selfuid, encoding, prompt_message, addresses, round_timeout=None
+    ) -> Dict[int, float]:
+        """
+        Fans the round out over the worker processes and merges their scores.
+
+        Parameters:
+            selfuid: The unique identifier of the calling entity.
+            encoding: The token encoding of the prompt.
+            prompt_message: The message used for generating the response.
+            addresses: A dictionary containing UIDs and corresponding addresses.
+            round_timeout (float, optional): The seconds the workers' requests may take.
+
+        Returns:
+            A dictionary mapping UIDs to scores.
+
+        Raises:
+            WorkerStartError: If a worker could not build its validator.
+        """
+        loop = asyncio.get_running_loop()
+        shards = shard_addresses(addresses, self.processes)
+        futures = [
+            loop.run_in_executor(
+                self.executors[index],
+                _score_shard,
+                selfuid,
+                encoding,
+                prompt_message,
+                shard,
+                self.latency is not None,
+                round_timeout,
+            )
+            for index, shard in enumerate(shards)
+        ]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        scores: Dict[int, float] = {}
+        for index, (shard, result) in enumerate(zip(shards, results)):
+            if isinstance(result, WorkerStartError):
+                raise result
+            if isinstance(result, BaseException):
+                logger.error(f"\nShard {index} failed, restarting its worker: {result}")
+                self.executors[index].shutdown(wait=False, cancel_futures=True)
+                self.executors[index] = self._new_executor()
+                result = ({uid: self.default_score for uid in shard if uid != selfuid}, None)
+            shard_scores, shard_latency = result
+            scores.update(shard_scores)
+            if shard_latency is not None:
+                self.latency.update(shard_latency)
+        return scores
+
+    async def invalidate(self, diff) -> None:
+        """
+        Forwards a metagraph diff to every worker, so each drops the per-miner state of changed UIDs.
+
+        Parameters:
+            diff (MetagraphDiff): The changes between the previous and the current snapshot.
+        """
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, _invalidate_shard, diff) for executor in self.executors),
+            return_exceptions=True,
+        )
+        for index, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.warning(f"\nCould not invalidate miners in shard {index}: {result}")
+
+    def close(self) -> None:
+        """
+        Shuts the worker processes down.
+        """
+        for executor in self.executors:
+            executor.shutdown(wait=True, cancel_futures=True)
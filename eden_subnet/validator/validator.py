@@ -1,25 +1,61 @@
 import random
 import json
+import math
 import time
 import os
 
 import requests.sessions
 import requests
 import asyncio
-from requests.exceptions import ConnectionError
 import numpy as np
-from pathlib import Path
 from loguru import logger
 from dotenv import load_dotenv
 from scipy.spatial.distance import cosine
-from communex.compat.key import Keypair, classic_load_key
 from communex.client import CommuneClient
-from communex._common import get_node_url
 from pydantic import BaseModel
 from typing import List, Any
 import argparse
 
 from eden_subnet.miner.tiktokenizer import TikTokenizer
+from eden_subnet.base.token_codec import (
+    DIGEST_MEDIA_TYPE,
+    TOKENS_MEDIA_TYPE,
+    TOKENS_ZSTD_MEDIA_TYPE,
+    TokenDigest,
+    accept_header,
+    decode_digest,
+    decode_json_tokens,
+    decode_tokens,
+    token_digest,
+    validate_tokens,
+)
+from eden_subnet.base.address import Resolver, format_netloc, parse_address
+from eden_subnet.base.keystore import key_store
+from eden_subnet.base.rpc import RPC_HEADER, RpcClient, RpcError, parse_advertisement, socket_path_allowed
+from eden_subnet.validator.concurrency import AdaptiveLimiter
+from eden_subnet.validator.circuit_breaker import CircuitBreakerRegistry, CircuitState
+from eden_subnet.validator.latency import LatencyTracker
+from eden_subnet.validator.chain import AsyncChain
+from eden_subnet.validator.scheduler import RoundPlan, VoteScheduler
+from eden_subnet.validator.voting import VoteOutcome, VoteSubmitter
+from eden_subnet.base.chain import FakeChain, get_chain_client, make_chain_client, set_chain_client
+from eden_subnet.validator.metagraph import (
+    Metagraph,
+    MetagraphDiff,
+    MetagraphRefresher,
+    current_block,
+    load_metagraph,
+    save_metagraph,
+)
+from eden_subnet.validator.capacity import (
+    BurstResult,
+    CapacityRecord,
+    CapacityStore,
+    burst_levels,
+    prompt_variants,
+    summarize_bursts,
+)
+from eden_subnet.validator.sharding import ShardedFanout
 
 load_dotenv()
 
@@ -38,18 +74,26 @@ def parseargs():
     parser.add_argument("--url", type=str, default=None, help="Base URL for inference request.")
     parser.add_argument("--api_key", type=str, default=None, help="OpenAI or Agent Artificial API Key")
     parser.add_argument("--model", type=str, default=None, help="OpenAI or Agent Artificial Model")
-    return parser.parse_args()
+    parser.add_argument("--chain", type=str, default=None, help="Chain backend: node, node:<url>, fake, fake:<uids> or fake:<recording.json>")
+    parser.add_argument("--chain_latency", type=float, default=0.0, help="Seconds a fake chain sleeps per call")
+    args, _ = parser.parse_known_args()
+    return args
 
 
 ARGS = parseargs()
 
 
 tokenizer = TikTokenizer()
-comx = CommuneClient(get_node_url())
+VOCAB_SIZE = tokenizer.embedding_function.n_vocab
+# Node connections pooled by the chain client, one per chain worker thread.
+CHAIN_CONNECTIONS = 4
 
 
 logger.level("INFO")
 
+# Score given to miners that could not be reached or returned nothing usable.
+DEFAULT_SCORE = 1
+
 
 class Message(BaseModel):
     """
@@ -97,6 +141,62 @@ class ValidatorSettings(BaseModel):
     module_path: str
     host: str
     port: int
+    max_connections: int = 256
+    max_connections_per_host: int = 4
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    concurrency_initial: int = 50
+    concurrency_min: int = 8
+    concurrency_max: int = 512
+    latency_target: float = 5.0
+    probe_timeout: float = 2.0
+    prescan_enabled: bool = True
+    prescan_timeout: float = 1.0
+    prescan_concurrency: int = 1000
+    breaker_failure_threshold: int = 3
+    breaker_base_backoff: float = 120.0
+    breaker_max_backoff: float = 3600.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    round_timeout: float = 90.0
+    max_response_bytes: int = 2 * 1024 * 1024
+    max_token_ratio: float = 2.0
+    min_token_cap: int = 64
+    rpc_enabled: bool = True
+    rpc_local_hosts: List[str] = ["127.0.0.1", "localhost", "::1"]
+    rpc_socket_dir: str | None = None
+    fanout_processes: int = 1
+    round_interval: float = 60.0
+    scoring_queue_size: int = 64
+    digest_verification: bool = False
+    spot_check_fraction: float = 0.1
+    latency_weight: float = 0.0
+    latency_quantile: float = 0.95
+    capacity_probe_enabled: bool = False
+    capacity_probe_interval: int = 10
+    capacity_sample_size: int = 8
+    capacity_max_burst: int = 16
+    capacity_prompt_lengths: List[int] = [64, 512, 2048]
+    capacity_error_threshold: float = 0.1
+    capacity_probe_timeout: float = 120.0
+    capacity_weight: float = 0.0
+    metagraph_refresh_interval: float = 60.0
+    metagraph_cache_dir: str | None = "data/metagraph"
+    chain_workers: int = CHAIN_CONNECTIONS
+    chain_timeout: float = 30.0
+    chain_attempts: int = 3
+    chain_backoff: float = 0.5
+    tempo_scheduling: bool = True
+    block_time: float = 8.0
+    vote_margin_blocks: int = 2
+    scoring_reserve: float = 10.0
+    min_round_budget: float = 15.0
+    max_round_budget: float = 300.0
+    chain_params_ttl: float = 600.0
+    vote_min_change: float = 0.01
+    vote_max_age: float = 3600.0
+    vote_confirm_timeout: float = 60.0
+    vote_log_path: str | None = "data/votes.jsonl"
 
 
 class GenerateRequest(BaseModel):
@@ -104,6 +204,24 @@ class GenerateRequest(BaseModel):
     model: str
 
 
+class RoundInputs(BaseModel):
+    """
+    A class representing the inputs of one validation round.
+
+    Explanation:
+    This class holds the chain snapshot (own UID, addresses, weights, keys and stake) with the block it was read at, and the reference prompt with its encoding, prepared ahead of the miner fan-out.
+    """
+
+    selfuid: int
+    address_dict: dict
+    weights_dict: dict
+    keys_dict: dict
+    staketo_dict: dict
+    prompt_message: Message
+    encoding: list
+    block_number: int | None = None
+
+
 TOPICS = [
     "The pursuit of knowledge",
     "The impact of technology on society",
@@ -210,7 +328,6 @@ TOPICS = [
 
 import aiohttp
 import asyncio
-from asyncio import Semaphore
 
 class Validator:
     key_name: str
@@ -219,6 +336,24 @@ class Validator:
     port: int
     settings: ValidatorSettings
     keypair: Any
+    session: aiohttp.ClientSession | None
+    limiter: AdaptiveLimiter
+    breakers: CircuitBreakerRegistry
+    latency: LatencyTracker
+    resolver: Resolver
+    capacity: CapacityStore
+    capacity_task: asyncio.Task | None
+    rounds: int
+    rpc_advertisements: dict[str, dict[str, str]]
+    rpc_clients: dict[str, RpcClient]
+    sharded_fanout: ShardedFanout | None
+    metagraph: Metagraph | None
+    refresher: MetagraphRefresher
+    reconcile_task: asyncio.Task | None
+    chain_client: CommuneClient | FakeChain
+    chain: AsyncChain
+    scheduler: VoteScheduler
+    votes: VoteSubmitter
     """
     Represents a validator with key name, module path, host, port, and settings.
 
@@ -237,19 +372,43 @@ class Validator:
         settings (ValidatorSettings): ValidatorSettings object containing settings.
 
     Methods:
+        sync_metagraph: Brings the metagraph snapshot up to date when a new block has arrived.
+        load_cached_metagraph: Loads the metagraph snapshot saved on disk by a previous run.
+        reconcile_metagraph: Re-reads the chain after a warm start and invalidates changed miners.
+        invalidate_miners: Drops the per-miner state of UIDs that changed on chain.
+        current_metagraph: Returns the current metagraph snapshot.
         get_uid: Retrieves the UID based on key mapping.
         load_local_key: Loads the local key from a JSON file.
         make_request: Makes an asynchronous request with messages and input URL.
+        get_session: Returns the shared, pooled HTTP session used for miner requests.
+        close_session: Closes the shared HTTP session.
+        probe_address: Checks whether a miner address accepts TCP connections.
+        prescan_addresses: Probes many miner addresses concurrently and returns the reachable UIDs.
+        get_rpc_client: Returns the round's cached RPC connection to a miner that advertised one.
+        connect_rpc: Opens a new RPC connection to a miner that advertised one.
+        forget_rpc_channel: Drops a miner's RPC advertisement and connection after its channel failed.
+        make_request_rpc: Makes a request over a miner's RPC channel.
+        fan_out: Gets miner scores in this process or across worker processes.
+        latency_report: Returns the p50, p95 and p99 latency and throughput of every tracked miner.
+        probe_miner_capacity: Sends one miner bursts of concurrent requests and measures its throughput.
+        probe_capacity: Probes the capacity of a sample of miners.
+        schedule_capacity_probe: Starts a background capacity probe every `capacity_probe_interval` rounds.
         get_sample_result: Gets a sample result by making a request.
         cosine_similarity: Calculates the cosine similarity between two embeddings.
         validate_input: Evaluates the sample similarity using cosine similarity.
         : Gets similarities from multiple addresses.
+        prepare_round: Gathers the chain snapshot and reference sample for a round in worker threads.
+        round_snapshot: Returns the chain-derived round inputs for a metagraph snapshot.
+        refresh_round: Brings prefetched round inputs up to the current metagraph when the round starts.
+        plan_round: Plans the next round from the chain head, the subnet tempo and the vote rate limit.
+        run_round: Runs the miner fan-out and scoring for prepared round inputs and submits the vote.
+        submit_vote: Submits a weight vector in the background unless it barely changed since the last vote.
         validate_loop: Validates the loop by scoring modules and voting.
-        get_querymap_addresses: Parses addresses from the network.
-        get_querymaps_weights: Parses existing weights from the network.
+        get_querymap_addresses: Returns the addresses from the current metagraph.
+        get_querymaps_weights: Returns the existing weights from the current metagraph.
         get_querymap_stake: Parses stake information from the network.
         set_default_weights: Checks for unranked weights and assigns default weight.
-        get_querymap_keys: Parses keys from the network.
+        get_querymap_keys: Returns the keys from the current metagraph.
         scale_numbers: Scales a list of numbers.
         list_to_dict: Converts a list to a dictionary.
         scale_dict_values: Scales dictionary values.
@@ -259,6 +418,7 @@ class Validator:
     def __init__(
         self,
         settings: ValidatorSettings,
+        chain_client: CommuneClient | FakeChain | None = None,
     ) -> None:
         """
         Initializes a Validator object with key name, module path, host, port, and settings.
@@ -269,6 +429,7 @@ class Validator:
             host: The host address.
             port: The port number.
             settings: ValidatorSettings object containing settings.
+            chain_client: The chain backend. Defaults to the shared client from `get_chain_client`.
         """
         self.key_name = settings.key_name
         self.module_path = settings.module_path
@@ -276,13 +437,150 @@ class Validator:
         self.port = settings.port
         self.settings = settings
         self.keypair = self.load_local_key()
+        self.session = None
+        self.limiter = AdaptiveLimiter(
+            initial_limit=settings.concurrency_initial,
+            min_limit=settings.concurrency_min,
+            max_limit=settings.concurrency_max,
+            latency_target=settings.latency_target,
+        )
+        self.breakers = CircuitBreakerRegistry(
+            failure_threshold=settings.breaker_failure_threshold,
+            base_backoff=settings.breaker_base_backoff,
+            max_backoff=settings.breaker_max_backoff,
+        )
+        self.latency = LatencyTracker()
+        self.resolver = Resolver(ttl=settings.dns_cache_ttl, timeout=settings.probe_timeout)
+        self.capacity = CapacityStore()
+        self.capacity_task = None
+        self.rounds = 0
+        self.rpc_advertisements = {}
+        self.rpc_clients = {}
+        self.sharded_fanout = None
+        self.metagraph = None
+        self.chain_client = chain_client or get_chain_client(CHAIN_CONNECTIONS)
+        self.refresher = MetagraphRefresher(
+            self.chain_client,
+            netuid=10,
+            min_interval=settings.metagraph_refresh_interval,
+            attempts=settings.chain_attempts,
+            backoff=settings.chain_backoff,
+        )
+        self.reconcile_task = None
+        self.chain = AsyncChain(
+            self.chain_client,
+            max_workers=settings.chain_workers,
+            timeout=settings.chain_timeout,
+            attempts=settings.chain_attempts,
+            backoff=settings.chain_backoff,
+        )
+        self.scheduler = VoteScheduler(
+            netuid=10,
+            block_time=settings.block_time,
+            vote_margin=settings.vote_margin_blocks,
+            scoring_reserve=settings.scoring_reserve,
+            min_budget=settings.min_round_budget,
+            max_budget=settings.max_round_budget,
+            params_ttl=settings.chain_params_ttl,
+        )
+        self.votes = VoteSubmitter(
+            lambda uids, weights: self.chain.vote(key=self.keypair, uids=uids, weights=weights, netuid=10),
+            min_change=settings.vote_min_change,
+            max_age=settings.vote_max_age,
+            log_path=settings.vote_log_path,
+        )
 
-    def get_uid(self):
+    def sync_metagraph(self, force: bool = False) -> tuple[Metagraph, MetagraphDiff]:
+        """
+        Brings the metagraph snapshot up to date and makes it the current one.
+
+        The tables are only read again, in one batched query, once a new block has arrived and
+        `metagraph_refresh_interval` seconds have passed since the last read. The refresher retries the chain
+        reads itself and serializes syncs, so callers run this once rather than retrying it as a whole.
+
+        Parameters:
+            force (bool): Read the tables regardless of the block and interval. Default is False.
+
+        Returns:
+            tuple[Metagraph, MetagraphDiff]: The snapshot and the UIDs that changed since the previous one.
+        """
+        with self.refresher.lock:
+            previous = self.metagraph
+            self.metagraph, diff = self.refresher.refresh(force=force)
+            if self.settings.metagraph_cache_dir and self.metagraph is not previous:
+                try:
+                    save_metagraph(self.metagraph, self.settings.metagraph_cache_dir)
+                except OSError as e:
+                    logger.warning(f"\nCould not save the metagraph snapshot: {e}")
+            return self.metagraph, diff
+
+    def load_cached_metagraph(self) -> Metagraph | None:
+        """
+        Loads the metagraph snapshot saved on disk by a previous run and makes it the current one, so the first
+        round can start without waiting for the chain. The next refresh re-reads the chain regardless of the
+        refresh interval.
+
+        Returns:
+            Metagraph | None: The loaded snapshot, or None if caching is disabled or no snapshot was found.
+        """
+        if not self.settings.metagraph_cache_dir:
+            return None
+        metagraph = load_metagraph(self.settings.metagraph_cache_dir)
+        if metagraph is not None:
+            logger.info(f"\nLoaded metagraph snapshot of block {metagraph.block_number} with {len(metagraph.keys)} modules")
+            self.metagraph = self.refresher.metagraph = metagraph
+        return metagraph
+
+    async def reconcile_metagraph(self) -> None:
+        """
+        Re-reads the chain after a warm start from disk and invalidates the miners that changed since the
+        snapshot was saved.
+        """
+        _, diff = await self.chain.call(self.sync_metagraph, True, attempts=1)
+        await self.invalidate_miners(diff)
+
+    async def invalidate_miners(self, diff: MetagraphDiff) -> None:
+        """
+        Drops the per-miner state of UIDs that were deregistered, moved to a new address or taken over by a new
+        key: their circuit breakers, latency sketches and capacity records, and the RPC channels of addresses
+        no UID uses any more. In sharded mode the workers' state is invalidated too. Stake changes need no
+        invalidation and are only reported.
+
+        Parameters:
+            diff (MetagraphDiff): The changes between the previous and the current snapshot.
+        """
+        if not diff:
+            return
+        replaced = diff.replaced
+        if self.sharded_fanout is not None:
+            await self.sharded_fanout.invalidate(diff)
+        self.breakers.forget(replaced)
+        self.latency.forget(replaced)
+        self.capacity.forget(replaced)
+        for address in diff.stale_addresses:
+            self.rpc_advertisements.pop(address, None)
+            if (client := self.rpc_clients.pop(address, None)) is not None:
+                await client.close()
+        logger.info(
+            f"\nMetagraph changed: {len(diff.added)} added, {len(diff.removed)} removed, "
+            f"{len(diff.address_changed)} moved, {len(diff.key_changed)} new keys, {len(diff.stake_changed)} stake changes"
+        )
+
+    def current_metagraph(self) -> Metagraph:
+        """
+        Returns the current metagraph snapshot, reading one from the chain if there is none yet.
+
+        Returns:
+            Metagraph: The current snapshot.
+        """
+        return self.metagraph if self.metagraph is not None else self.sync_metagraph()[0]
+
+    def get_uid(self, metagraph: Metagraph | None = None):
         """
         Retrieves the unique identifier associated with the validator.
 
         Parameters:
-            None
+            metagraph (Metagraph | None): The snapshot to look in. Defaults to the current snapshot.
 
         Returns:
             The unique identifier (uid) of the validator.
@@ -290,16 +588,14 @@ class Validator:
         Raises:
             ValueError: If the unique identifier (uid) is not found.
         """
-        key_map = self.get_querymap_keys()
-        
-        
+        metagraph = metagraph or self.current_metagraph()
         ss58_address = self.keypair.ss58_address
-        for uid, ss58 in key_map.items():
-            if ss58 == ss58_address:
-                return uid
-        raise ValueError(
-            f"\nUID not found, {ss58} please check your validator is registered with\n comx module info {self.key_name}"
-        )
+        uid = metagraph.uid_of(ss58_address)
+        if uid is None:
+            raise ValueError(
+                f"\nUID not found, {ss58_address} please check your validator is registered with\n comx module info {self.key_name}"
+            )
+        return uid
 
     def load_local_key(self):
         """
@@ -311,14 +607,7 @@ class Validator:
         Returns:
             Keypair: A Keypair object with the private key and SS58 address.
         """
-        keypath = Path(f"{Path.home()}/.commune/key/{self.key_name}.json")
-        
-        with open(keypath, "r", encoding="utf-8") as f:
-            key = json.loads(f.read())["data"]
-            private_key = json.loads(key)["private_key"]
-            ss58address = json.loads(key)["ss58_address"]
-
-        return Keypair(private_key=private_key, ss58_address=ss58address)
+        return key_store.keypair(self.key_name)
 
     def make_request(self, message: Message, input_url: str):
         """
@@ -395,40 +684,557 @@ class Validator:
         logger.debug(f"\nSample Result:\n{sample_result}")
         return sample_result
 
-    async def get_miner_responses(self, selfuid, encoding, prompt_message, addresses):
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the validator-lifetime HTTP session, creating it on first use.
+
+        The session owns a single connection pool with per-host limits, keep-alive and a DNS cache,
+        so connections to miners are reused across miners and across rounds.
+
+        Returns:
+            aiohttp.ClientSession: The shared session.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.settings.max_connections,
+                limit_per_host=self.settings.max_connections_per_host,
+                keepalive_timeout=self.settings.keepalive_timeout,
+                ttl_dns_cache=self.settings.dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def close_session(self):
+        """
+        Closes the shared HTTP session and any RPC connections, releasing their pooled connections.
+        """
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        for client in self.rpc_clients.values():
+            await client.close()
+        self.rpc_clients = {}
+
+    async def get_rpc_client(self, address: str) -> RpcClient | None:
+        """
+        Returns the round's open RPC connection to a miner that advertised an RPC channel, opening one if
+        needed. The connection is kept in `rpc_clients` and reused by later rounds.
+
+        Parameters:
+            address (str): The miner address in host:port form.
+
+        Returns:
+            RpcClient | None: The connection, or None if the miner should be reached over HTTP.
+        """
+        client = self.rpc_clients.get(address)
+        if client is not None and not client.closed:
+            return client
+        try:
+            client = await self.connect_rpc(address)
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            logger.debug(f"\nCould not open RPC channel to {address}, falling back to HTTP: {e}")
+            self.rpc_advertisements.pop(address, None)
+            return None
+        if client is not None:
+            self.rpc_clients[address] = client
+        return client
+
+    async def connect_rpc(self, address: str) -> RpcClient | None:
+        """
+        Opens a new RPC connection to a miner that advertised an RPC channel. The caller owns the connection
+        and must close it.
+
+        Unix domain sockets are only used for miners whose host is listed in `rpc_local_hosts` and whose
+        advertised socket path lies inside `rpc_socket_dir`; with no `rpc_socket_dir` they are never used.
+
+        Parameters:
+            address (str): The miner address in host:port form.
+
+        Returns:
+            RpcClient | None: The connection, or None if the miner has no usable RPC channel.
+
+        Raises:
+            OSError, ValueError, asyncio.TimeoutError: If the advertised channel could not be opened.
+        """
+        transports = self.rpc_advertisements.get(address)
+        if not transports:
+            return None
+        endpoint = parse_address(address)
+        host = await self.resolver.resolve(endpoint) if endpoint is not None else None
+        if host is None:
+            return None
+        local = endpoint.host in self.settings.rpc_local_hosts or host in self.settings.rpc_local_hosts
+        if "unix" in transports and local and socket_path_allowed(transports["unix"], self.settings.rpc_socket_dir):
+            return await RpcClient.connect(
+                path=transports["unix"],
+                timeout=self.settings.connect_timeout,
+                max_frame_bytes=self.settings.max_response_bytes,
+            )
+        if "tcp" in transports:
+            return await RpcClient.connect(
+                host=host,
+                port=int(transports["tcp"]),
+                timeout=self.settings.connect_timeout,
+                max_frame_bytes=self.settings.max_response_bytes,
+            )
+        return None
+
+    def forget_rpc_channel(self, address: str, client: RpcClient) -> None:
+        """
+        Drops a miner's RPC advertisement and cached connection after its channel failed, so later rounds reach
+        the miner over HTTP until it advertises a channel again.
+
+        Parameters:
+            address (str): The miner address in host:port form.
+            client (RpcClient): The connection that failed.
+        """
+        self.rpc_advertisements.pop(address, None)
+        if self.rpc_clients.get(address) is client:
+            del self.rpc_clients[address]
+
+    async def make_request_rpc(
+        self,
+        client: RpcClient,
+        address: str,
+        message: Message,
+        max_tokens: int | None = None,
+        digest: bool = False,
+    ):
+        """
+        Makes a request over a miner's RPC channel.
+
+        Parameters:
+            client (RpcClient): The open RPC connection.
+            address (str): The miner address in host:port form.
+            message (Message): A Message object to be used in the request.
+            max_tokens (int | None): The most tokens accepted in the response. Default is no limit.
+            digest (bool): Ask for the token count and digest instead of the tokens. Default is False.
+
+        Returns:
+            np.ndarray | TokenDigest | list | None: The tokens or their digest, an empty list if the miner
+            answered with an invalid payload or an error, or None if the channel failed. A failed channel is
+            closed; whether the miner's advertisement is dropped is left to the caller.
+        """
+        model = ARGS.model or os.getenv("AGENTARTIFICIAL_MODEL") or os.getenv("OPENAI_MODEL")
+        request = {
+            "model": model or "",
+            "messages": [{"role": "user", "content": message.content}],
+        }
+        if digest:
+            request["response_format"] = "digest"
+        payload = json.dumps(request).encode()
+        try:
+            body = await asyncio.wait_for(client.call(payload), timeout=self.settings.read_timeout)
+        except RpcError as e:
+            logger.error(f"\nRPC request to {address} failed: {e}")
+            return []
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.error(f"\nRPC channel to {address} failed, falling back to HTTP: {e}")
+            await client.close()
+            return None
+        try:
+            if digest:
+                return decode_digest(body)
+            tokens = validate_tokens(decode_tokens(body), VOCAB_SIZE)
+        except ValueError as e:
+            logger.error(f"\nInvalid RPC token payload from {address}: {e}")
+            return []
+        if max_tokens is not None and len(tokens) > max_tokens:
+            logger.warning(f"\nResponse from {address} has {len(tokens)} tokens, more than {max_tokens}, discarding")
+            return []
+        logger.success(f"\nRPC request successfull: {len(tokens)} tokens from {address}")
+        return tokens
+
+    async def probe_address(self, address: str, timeout: float | None = None) -> bool:
+        """
+        Cheaply checks whether a miner address accepts TCP connections. Hostnames are resolved through the
+        validator's DNS cache.
+
+        Parameters:
+            address (str): The miner address in host:port form.
+            timeout (float | None): Seconds allowed for the connection. Defaults to the probe timeout setting.
+
+        Returns:
+            bool: True if a connection could be opened within the timeout, False otherwise.
+        """
+        endpoint = parse_address(address)
+        host = await self.resolver.resolve(endpoint) if endpoint is not None else None
+        if host is None:
+            return False
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, endpoint.port),
+                timeout=timeout or self.settings.probe_timeout,
+            )
+        except (OSError, ValueError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def prescan_addresses(self, addresses: dict[int, str], timeout: float | None = None) -> set[int]:
+        """
+        Probes miner addresses concurrently with a short TCP connect timeout, so unreachable miners can be
+        dropped before the full request phase.
+
+        Parameters:
+            addresses (dict[int, str]): A dictionary containing UIDs and corresponding addresses.
+            timeout (float | None): Seconds the whole scan may take. Probes still running then are cancelled
+                and their miners counted as unreachable. Default is no limit beyond the per-probe timeout.
+
+        Returns:
+            set[int]: The UIDs whose address accepted a connection.
+        """
+        semaphore = asyncio.Semaphore(self.settings.prescan_concurrency)
+
+        async def probe(uid, address):
+            async with semaphore:
+                return uid, await self.probe_address(address, timeout=self.settings.prescan_timeout)
+
+        tasks = [asyncio.ensure_future(probe(uid, address)) for uid, address in addresses.items()]
+        reachable = set()
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            reachable = {uid for uid, alive in (task.result() for task in done) if alive}
+        logger.info(f"\nPre-scan: {len(reachable)} of {len(addresses)} miners reachable")
+        return reachable
+
+    async def fan_out(self, selfuid, encoding, prompt_message, addresses, round_timeout=None):
+        """
+        Gets the miner scores for a round, splitting the UIDs across `fanout_processes` worker processes
+        when more than one is configured.
+
+        Parameters:
+            selfuid: The unique identifier of the calling entity.
+            encoding: The encoding type for the validation.
+            prompt_message: The message used for generating the response.
+            addresses: A dictionary containing UIDs and corresponding addresses.
+            round_timeout (float, optional): The seconds the requests may take. Defaults to `round_timeout`.
+
+        Returns:
+            A dictionary mapping UIDs to scores.
+        """
+        if self.settings.fanout_processes <= 1:
+            return await self.get_miner_responses(selfuid, encoding, prompt_message, addresses, round_timeout)
+        if self.sharded_fanout is None:
+            self.sharded_fanout = ShardedFanout(
+                validator_cls=type(self),
+                settings=self.settings,
+                processes=self.settings.fanout_processes,
+                default_score=DEFAULT_SCORE,
+                latency=self.latency,
+            )
+        return await self.sharded_fanout.get_miner_responses(
+            selfuid, encoding, prompt_message, addresses, round_timeout
+        )
+
+    async def probe_miner_capacity(self, session, address: str, prompts: list[str]) -> CapacityRecord:
+        """
+        Sends a miner bursts of 1, 2, 4, ... up to `capacity_max_burst` concurrent requests, cycling through
+        prompts of different lengths, and stops at the first burst whose error rate exceeds
+        `capacity_error_threshold`.
+
+        A miner with an RPC channel is probed over a connection of its own, closed when the probe ends, so the
+        bursts neither queue behind nor break the connection the rounds use. A channel that fails during the
+        probe only moves the rest of the probe to HTTP; the advertisement the rounds use is left alone.
+
+        Parameters:
+            session: The aiohttp ClientSession to use for HTTP requests.
+            address (str): The miner address in host:port form.
+            prompts (list[str]): The prompts to cycle through.
+
+        Returns:
+            CapacityRecord: The sustained tokens per second, the largest clean burst and the error onset.
+        """
+        url = parse_address(address).url("/generate")
+        client = None
+        if self.settings.rpc_enabled:
+            try:
+                client = await self.connect_rpc(address)
+            except (OSError, ValueError, asyncio.TimeoutError) as e:
+                logger.debug(f"\nCould not open RPC channel to {address} for the capacity probe, using HTTP: {e}")
+
+        async def send(prompt):
+            message = Message(role="user", content=prompt)
+            if client is not None and not client.closed:
+                return await self.make_request_rpc(client, address, message)
+            return await self.make_request_async(session, message, url)
+
+        bursts = []
+        try:
+            for level in burst_levels(self.settings.capacity_max_burst):
+                start = time.monotonic()
+                responses = await asyncio.gather(
+                    *(send(prompts[i % len(prompts)]) for i in range(level)), return_exceptions=True
+                )
+                elapsed = time.monotonic() - start
+                answered = [
+                    response for response in responses
+                    if not isinstance(response, BaseException) and response is not None and len(response) > 0
+                ]
+                bursts.append(
+                    BurstResult(level, sum(len(response) for response in answered), level - len(answered), elapsed)
+                )
+                if (level - len(answered)) / level > self.settings.capacity_error_threshold:
+                    break
+        finally:
+            if client is not None:
+                await client.close()
+        return summarize_bursts(bursts, self.settings.capacity_error_threshold)
+
+    async def probe_capacity(self, addresses: dict[int, str], prompt: str) -> dict[int, CapacityRecord]:
+        """
+        Probes the capacity of up to `capacity_sample_size` miners, least recently probed first, and stores
+        the results.
+
+        The probe uses its own connection pool and RPC connections, so its bursts are not capped by the per-host limit of the
+        round's pool and do not count towards the round's concurrency limiter.
+
+        Parameters:
+            addresses (dict[int, str]): The UIDs and addresses that may be probed.
+            prompt (str): The prompt the probe prompts are cut from.
+
+        Returns:
+            dict[int, CapacityRecord]: The probe outcome per probed UID.
+        """
+        uids = self.capacity.select(addresses, self.settings.capacity_sample_size)
+        prompts = prompt_variants(prompt, self.settings.capacity_prompt_lengths)
+        connector = aiohttp.TCPConnector(limit_per_host=self.settings.capacity_max_burst)
+        results = {}
+        async with aiohttp.ClientSession(connector=connector) as session:
+
+            async def probe(uid):
+                try:
+                    results[uid] = await self.probe_miner_capacity(session, addresses[uid], prompts)
+                    self.capacity.record(uid, results[uid])
+                except Exception as e:
+                    logger.debug(f"\nError probing capacity of {uid}: {e}\n{e.args}\n")
+
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(probe(uid) for uid in uids)), timeout=self.settings.capacity_probe_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"\nCapacity probe timed out, {len(results)} of {len(uids)} miners measured")
+        for uid, record in results.items():
+            logger.info(
+                f"\nCapacity of {uid}: {record.tokens_per_second:.0f} tokens/s, "
+                f"{record.max_concurrency} concurrent requests, errors from {record.error_onset}"
+            )
+        return results
+
+    def schedule_capacity_probe(self, selfuid, addresses: dict[int, str], prompt: str) -> None:
+        """
+        Starts a capacity probe in the background on the first round and every `capacity_probe_interval`
+        rounds after it, unless probing is disabled or the previous probe is still running. Miners whose
+        circuit breaker is not closed are left out. With `fanout_processes` above one the breakers trip in the
+        worker processes, so no miner is left out for that reason.
+
+        Parameters:
+            selfuid: The validator's own UID.
+            addresses (dict[int, str]): The UIDs and addresses of the round.
+            prompt (str): The round's prompt.
+        """
+        self.rounds += 1
+        self.capacity.prune(addresses)
+        if not self.settings.capacity_probe_enabled:
+            return
+        if (self.rounds - 1) % self.settings.capacity_probe_interval:
+            return
+        if self.capacity_task is not None and not self.capacity_task.done():
+            return
+        candidates = {}
+        for uid, address in addresses.items():
+            endpoint = parse_address(address)
+            if endpoint is None or uid == selfuid or endpoint.netloc == format_netloc(self.host, self.port):
+                continue
+            address = endpoint.netloc
+            breaker = self.breakers.breakers.get((uid, address))
+            if breaker is None or breaker.state() is CircuitState.CLOSED:
+                candidates[uid] = address
+        self.capacity_task = asyncio.create_task(self.probe_capacity(candidates, prompt))
+
+    def latency_report(self) -> dict[int, dict]:
+        """
+        Returns the latency and throughput quantiles of every miner the validator has timed.
+
+        Returns:
+            dict: The p50, p95 and p99 latency in seconds and the median bytes per second, per UID.
+        """
+        return {uid: self.latency.quantiles(uid) for uid in sorted(self.latency.latency)}
+
+    async def get_miner_responses(self, selfuid, encoding, prompt_message, addresses, round_timeout=None):
         """
         Retrieves similarities from different addresses by making concurrent requests and validating the responses.
+        Requests still in flight when the round deadline expires are cancelled and scored as timeouts. The
+        deadline starts before the reachability pre-scan, so the scan counts against the round budget.
+
+        Responses are handed to a scoring consumer through a bounded queue as soon as they arrive, and only the
+        per-UID score is kept, so scoring overlaps the network phase and at most the in-flight requests plus
+        `scoring_queue_size` payloads are held in memory. The consumer scores in a worker thread, so the CPU work
+        does not hold up the event loop, and it is cancelled with the requests if the round is cancelled.
+
+        Addresses are parsed once per distinct string into IPv4, IPv6 or hostname endpoints; miners whose
+        address cannot be parsed get the default score.
+
+        With `digest_verification` on, miners are asked for the length and digest of their tokens, which is
+        compared with the digest of the locally computed encoding; a matching digest earns the score of an
+        exact answer. A random `spot_check_fraction` of miners is still asked for the full tokens.
 
         Parameters:
             selfuid: The unique identifier of the calling entity.
             encoding: The encoding type for the validation.
             prompt_message: The message used for generating the response.
             addresses: A dictionary containing UIDs and corresponding addresses.
+            round_timeout (float, optional): The seconds the requests may take. Defaults to `round_timeout`.
 
         Returns:
             A dictionary containing the responses from different addresses after validation.
         """
         miner_responses = {}
-        semaphore = Semaphore(50)  # Limit concurrent requests to 50
+        endpoints = {uid: parse_address(address) for uid, address in addresses.items()}
+        for uid, endpoint in endpoints.items():
+            if endpoint is None and uid != selfuid:
+                logger.debug(f"\nUnusable address for {uid}: {addresses[uid]}")
+                miner_responses[uid] = DEFAULT_SCORE
+        # Key all per-miner state on the normalised host:port form.
+        addresses = {uid: endpoint.netloc for uid, endpoint in endpoints.items() if endpoint is not None}
+        session = await self.get_session()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.settings.round_timeout if round_timeout is None else round_timeout)
+        max_tokens = max(int(len(encoding) * self.settings.max_token_ratio), self.settings.min_token_cap)
+        reference = np.asarray(encoding, dtype=np.float64)
+        expected_digest = token_digest(encoding) if self.settings.digest_verification else None
+        matching_score = self.validate_input(reference, reference) if expected_digest else None
+        scoring_queue = asyncio.Queue(maxsize=self.settings.scoring_queue_size)
+        self.limiter.start_round()
+        self.breakers.prune(addresses.items())
+        self.latency.prune(endpoints)
+        reachable = None
+        if self.settings.prescan_enabled:
+            reachable = await self.prescan_addresses({
+                uid: address
+                for uid, address in addresses.items()
+                if uid != selfuid and self.breakers.get(uid, address).state() is not CircuitState.OPEN
+            }, timeout=max(deadline - loop.time(), 0.0))
+
+        async def score_responses():
+            while (item := await scoring_queue.get()) is not None:
+                uid, response = item
+                try:
+                    miner_responses[uid] = await asyncio.to_thread(self.validate_input, reference, response)
+                except Exception as e:
+                    logger.debug(f"\nError getting similarities for {uid}: {e}\n{e.args}\n")
+                    miner_responses[uid] = DEFAULT_SCORE
+                # Drop the payload before waiting for the next one.
+                item = response = None
 
         async def process_address(uid, address):
             if uid == selfuid:
                 return
-            url = f"http://{address}/generate"
-            if f"http://{self.host}:{self.port}/generate" == url:
+            url = endpoints[uid].url("/generate")
+            if address == format_netloc(self.host, self.port):
                 return
-            
-            async with semaphore:
-                try:
-                    async with aiohttp.ClientSession() as session:
-                        response = await self.make_request_async(session, prompt_message, url)
-                    if response:
-                        miner_responses[uid] = self.validate_input(encoding, response)
-                except Exception as e:
-                    logger.debug(f"\nError getting similarities for {uid}: {e}\n{e.args}\n")
 
-        tasks = [process_address(uid, address) for uid, address in addresses.items()]
-        await asyncio.gather(*tasks)
+            breaker = self.breakers.get(uid, address)
+            state = breaker.state()
+            if state is CircuitState.OPEN:
+                miner_responses[uid] = DEFAULT_SCORE
+                return
+            if reachable is not None:
+                alive = uid in reachable
+            else:
+                alive = state is CircuitState.CLOSED or await self.probe_address(address)
+            if not alive:
+                breaker.record_failure()
+                miner_responses[uid] = DEFAULT_SCORE
+                return
+
+            in_flight = False
+            try:
+                async with self.limiter.acquire():
+                    in_flight = True
+                    start = time.monotonic()
+                    # In digest mode only a random spot-check fraction of miners sends the full tokens.
+                    digest = expected_digest is not None and random.random() >= self.settings.spot_check_fraction
+                    try:
+                        client = await self.get_rpc_client(address) if self.settings.rpc_enabled else None
+                        response = None
+                        if client is not None:
+                            response = await self.make_request_rpc(
+                                client, address, prompt_message, max_tokens=max_tokens, digest=digest
+                            )
+                        # A lost RPC channel is forgotten, and the miner is asked again over HTTP.
+                        if client is not None and response is None and client.closed:
+                            self.forget_rpc_channel(address, client)
+                        if client is None or (response is None and client.closed):
+                            response = await self.make_request_async(
+                                session, prompt_message, url, max_tokens=max_tokens, digest=digest
+                            )
+                    except Exception as e:
+                        response = None
+                        logger.debug(f"\nError getting similarities for {uid}: {e}\n{e.args}\n")
+                    in_flight = False
+                    elapsed = time.monotonic() - start
+                    self.limiter.record(elapsed, success=response is not None)
+            except asyncio.CancelledError:
+                # The round deadline passed, score the miner as a timeout.
+                if in_flight:
+                    self.limiter.record(time.monotonic() - start, success=False)
+                    breaker.record_failure()
+                miner_responses[uid] = DEFAULT_SCORE
+                raise
+            if response is None:
+                breaker.record_failure()
+                miner_responses[uid] = DEFAULT_SCORE
+                return
+            breaker.record_success()
+            if isinstance(response, TokenDigest) or len(response) > 0:
+                # Throughput is measured on the token payload, 4 bytes per token, whatever the wire format.
+                size = None if isinstance(response, TokenDigest) else len(response) * 4
+                self.latency.record(uid, elapsed, size)
+            if isinstance(response, TokenDigest):
+                miner_responses[uid] = matching_score if response == expected_digest else DEFAULT_SCORE
+                return
+            if len(response) == 0:
+                miner_responses[uid] = DEFAULT_SCORE
+                return
+            try:
+                await scoring_queue.put((uid, response))
+            except asyncio.CancelledError:
+                miner_responses[uid] = DEFAULT_SCORE
+                raise
+
+        scorer = asyncio.ensure_future(score_responses())
+        tasks = [
+            asyncio.ensure_future(process_address(uid, address))
+            for uid, address in addresses.items()
+        ]
+        try:
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=max(deadline - loop.time(), 0.0))
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                if pending:
+                    logger.warning(f"\nRound deadline reached, cancelled {len(pending)} straggling requests")
+            await scoring_queue.put(None)
+            await scorer
+        finally:
+            # Only has an effect if the round itself was cancelled.
+            for task in tasks:
+                task.cancel()
+            scorer.cancel()
+        logger.info(f"\nConcurrency limiter round summary: {self.limiter.round_summary()}")
+        logger.info(f"\nCircuit breakers: {self.breakers.summary()}")
+        logger.info(f"\nSubnet latency: {self.latency.summary()}")
         
         return miner_responses
     def make_request(self, message: Message, input_url: str = ""):
@@ -450,17 +1256,53 @@ class Validator:
             return
         return response.text
     
-    async def make_request_async(self, session, message: Message, input_url: str = ""):
+    async def read_body(self, response, max_bytes: int) -> bytes | None:
+        """
+        Reads a response body incrementally, giving up as soon as it exceeds a byte cap.
+
+        Parameters:
+            response: The aiohttp ClientResponse to read.
+            max_bytes (int): The largest body that will be accepted.
+
+        Returns:
+            bytes | None: The body, or None if it is larger than max_bytes.
+        """
+        if response.content_length is not None and response.content_length > max_bytes:
+            return None
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            body.extend(chunk)
+            if len(body) > max_bytes:
+                return None
+        return bytes(body)
+
+    async def make_request_async(
+        self,
+        session,
+        message: Message,
+        input_url: str = "",
+        max_tokens: int | None = None,
+        digest: bool = False,
+    ):
         """
         Makes an asynchronous request based on the provided messages and input URL.
 
+        The body is read incrementally and abandoned once it exceeds `max_response_bytes`, then decoded
+        straight into an int32 array. Oversized bodies, malformed payloads, token ids outside the tokenizer's
+        vocabulary and token lists longer than max_tokens are treated as invalid answers.
+
         Parameters:
             session: The aiohttp ClientSession to use for the request.
             message (Message): A Message object to be used in the request.
             input_url (str): The URL to make the request to. Default is an empty string.
+            max_tokens (int | None): The most tokens accepted in the response. Default is no limit.
+            digest (bool): Ask for the token count and digest instead of the tokens. Miners that do not
+                support it answer with the tokens. Default is False.
 
         Returns:
-            str: The content of the response from the request, processed to extract specific content.
+            np.ndarray | TokenDigest | list | None: The tokens from choices[0].message.content or the binary
+            token format as an int32 array, a TokenDigest when the miner answered with the digest, an empty
+            list if it answered with an invalid payload, or None if the request failed.
 
         Raises:
             Exception: If an error occurs during the request process.
@@ -485,23 +1327,59 @@ class Validator:
         })
         headers = {
           'Authorization': f'Bearer {api_key}',
-          'Content-Type': 'application/json'
+          'Content-Type': 'application/json',
+          'Accept': accept_header(digest=digest),
         }
         
         try:
-            async with session.post(url_to_use, headers=headers, data=payload, timeout=30) as response:
+            timeout = aiohttp.ClientTimeout(
+                total=self.settings.connect_timeout + self.settings.read_timeout,
+                sock_connect=self.settings.connect_timeout,
+                sock_read=self.settings.read_timeout,
+            )
+            async with session.post(url_to_use, headers=headers, data=payload, timeout=timeout) as response:
+                if transports := parse_advertisement(response.headers.get(RPC_HEADER)):
+                    self.rpc_advertisements[format_netloc(response.url.host, response.url.port)] = transports
                 if response.status == 200:
+                    body = await self.read_body(response, self.settings.max_response_bytes)
+                    if body is None:
+                        logger.warning(f"\nResponse from {url_to_use} exceeds {self.settings.max_response_bytes} bytes, discarding")
+                        return []
+                    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+                    if content_type == DIGEST_MEDIA_TYPE:
+                        try:
+                            return decode_digest(body)
+                        except ValueError as e:
+                            logger.error(f"\nInvalid token digest from {url_to_use}: {e}")
+                            return []
+                    if content_type in (TOKENS_MEDIA_TYPE, TOKENS_ZSTD_MEDIA_TYPE):
+                        try:
+                            tokens = validate_tokens(
+                                decode_tokens(body, content_type, max_bytes=self.settings.max_response_bytes),
+                                VOCAB_SIZE,
+                            )
+                        except ValueError as e:
+                            logger.error(f"\nInvalid binary token payload from {url_to_use}: {e}")
+                            return []
+                        if max_tokens is not None and len(tokens) > max_tokens:
+                            logger.warning(f"\nResponse from {url_to_use} has {len(tokens)} tokens, more than {max_tokens}, discarding")
+                            return []
+                        logger.success(f"\nRequest successfull: {len(tokens)} binary tokens from {url_to_use}")
+                        return tokens
                     try:
-                        response_json = await response.json()
-                        logger.success(f"\nRequest successfull: {response_json[:150]}...")
-                        return response_json
-                    except json.JSONDecodeError:
-                        logger.error(f"\nFailed to decode JSON from response. Status: {response.status}, Content-Type: {response.headers.get('Content-Type')}")
-                        return None
+                        tokens = decode_json_tokens(body, VOCAB_SIZE)
+                    except ValueError as e:
+                        logger.error(f"\nInvalid token payload from {url_to_use}. Status: {response.status}, Content-Type: {response.headers.get('Content-Type')}: {e}")
+                        return []
+                    if max_tokens is not None and len(tokens) > max_tokens:
+                        logger.warning(f"\nResponse from {url_to_use} has {len(tokens)} tokens, more than {max_tokens}, discarding")
+                        return []
+                    logger.success(f"\nRequest successfull: {len(tokens)} tokens from {url_to_use}")
+                    return tokens
                 else:
                     logger.error(f"\nRequest failed with status {response.status}. URL: {url_to_use}")
-                    response_text = await response.text()
-                    logger.error(f"Response content: {response_text[:200]}...")  # Log first 200 characters of response
+                    response_text = await response.content.read(200)
+                    logger.error(f"Response content: {response_text!r}...")  # Log first 200 bytes of response
                     return None
         except ConnectionError as e:
             logger.error(f"\nNetwork error occurred: {e}\n{e.args}\n")
@@ -524,8 +1402,8 @@ class Validator:
         logger.info("\nCalculating cosine similarity")
 
         # Example vectors
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+        vec1 = np.asarray(embedding1, dtype=np.float64)
+        vec2 = np.asarray(embedding2, dtype=np.float64)
 
         # Normalizing vectors
         vec1_norm = vec1 / np.linalg.norm(vec1)
@@ -551,12 +1429,12 @@ class Validator:
         """
         result = None
         
-        if not embedding1:
+        if embedding1 is None or len(embedding1) == 0:
             logger.error("\nembedding1 is empty, cannot validate")
             return 1
         
         
-        if not embedding2:
+        if embedding2 is None or len(embedding2) == 0:
             logger.warning("\nembedding2 is empty, setting score to 1")
             return 1
         # logger.debug(f"\nembedding1: {embedding1}\nembedding2: {embedding2}")
@@ -571,42 +1449,127 @@ class Validator:
             result = 1
         return result * 100
     
-    async def validate_loop(self):
+    async def prepare_round(self) -> "RoundInputs":
         """
-        Executes a loop to validate weights and scoring based on sample results and similarities.
+        Gathers everything a round needs before the miner fan-out: the chain state and the reference sample.
+
+        The chain state comes from the metagraph snapshot, re-read in a single batched query when a new block
+        has arrived, and per-miner state of UIDs that changed is invalidated. After a warm start from a snapshot on
+        disk, the first round runs from that snapshot while the chain is read in the background. If that read
+        fails, the next round logs the error and forces a sync instead. That query and the sample
+        request are blocking calls, so they run concurrently in worker threads and never hold up the event loop.
 
         Parameters:
             None
 
         Returns:
-            None
+            RoundInputs: The chain snapshot, prompt and prompt encoding for one round.
+        """
+        # Snapshot the chain state in one batched query, and generate a sample result
+        if self.reconcile_task is None and self.metagraph is not None and self.refresher.last_refresh == -math.inf:
+            # Warm start: run this round from the snapshot on disk while the chain is read in the background.
+            self.reconcile_task = asyncio.create_task(self.reconcile_metagraph())
+            metagraph = self.metagraph
+            sample_result = await asyncio.to_thread(self.get_sample_result)
+        else:
+            force = False
+            if self.reconcile_task is not None:
+                await asyncio.wait([self.reconcile_task])
+                if not self.reconcile_task.cancelled() and (error := self.reconcile_task.exception()) is not None:
+                    logger.warning(f"\nCould not reconcile the metagraph snapshot from disk, forcing a sync: {error}")
+                    force = True
+            (metagraph, diff), sample_result = await asyncio.gather(
+                self.chain.call(self.sync_metagraph, force, attempts=1),
+                asyncio.to_thread(self.get_sample_result),
+            )
+            if force:
+                self.reconcile_task = None
+            await self.invalidate_miners(diff)
+        # Convert the sample result into an embedding
+        encoding = await asyncio.to_thread(tokenizer.embedding_function.encode, str(sample_result))
+        return RoundInputs(
+            **self.round_snapshot(metagraph),
+            prompt_message=Message(content=str(sample_result), role="user"),
+            encoding=encoding,
+        )
+
+    def round_snapshot(self, metagraph: Metagraph) -> dict:
         """
-        selfuid = self.get_uid()
+        Returns the chain-derived fields of the round inputs for a metagraph snapshot.
+
+        Parameters:
+            metagraph (Metagraph): The snapshot.
 
-        # Query the chain for the addresses, weights, and keys
-        address_dict = self.get_querymap_addresses()
+        Returns:
+            dict: The selfuid, address_dict, weights_dict, keys_dict, staketo_dict and block_number fields.
+        """
+        selfuid = self.get_uid(metagraph)
+        address_dict = dict(metagraph.addresses)
         # Debugging: Limit the number of addresses to 10
         # address_dict = dict(list(address_dict.items())[:10])
-        weights_dict = self.get_querymaps_weights()
-        weights_dict = self.set_default_weights(selfuid, weights_dict, address_dict)
+        return {
+            "selfuid": selfuid,
+            "address_dict": address_dict,
+            "weights_dict": self.set_default_weights(selfuid, dict(metagraph.weights), address_dict),
+            "keys_dict": dict(metagraph.keys),
+            "staketo_dict": dict(metagraph.stake),
+            "block_number": metagraph.block_number,
+        }
 
-        keys_dict = self.get_querymap_keys()
+    async def refresh_round(self, inputs: "RoundInputs") -> "RoundInputs":
+        """
+        Brings prefetched round inputs up to the current metagraph when the round starts.
 
-        # Generate a sample result and convert it into an embedding
-        sample_result = self.get_sample_result()
-        prompt_message = Message(content=str(sample_result), role="user")
-        encoding = tokenizer.embedding_function.encode(str(sample_result))
-        
-        
+        Inputs are prepared while the previous round runs, so their chain snapshot can be a whole round old. The
+        metagraph is synced again, which only costs a header read unless a new block arrived and
+        `metagraph_refresh_interval` has passed, and the chain-derived fields are rebuilt if it changed. The
+        reference sample is kept. While a warm start is still reconciling, or if the chain cannot be read, the
+        inputs are returned unchanged.
+
+        Parameters:
+            inputs (RoundInputs): The inputs produced by prepare_round.
+
+        Returns:
+            RoundInputs: The inputs for the current metagraph.
+        """
+        if self.reconcile_task is not None and not self.reconcile_task.done():
+            return inputs
+        try:
+            metagraph, diff = await self.chain.call(self.sync_metagraph, attempts=1)
+        except Exception as e:
+            logger.warning(f"\nCould not refresh the metagraph, running the round on block {inputs.block_number}: {e}")
+            return inputs
+        await self.invalidate_miners(diff)
+        if metagraph.block_number == inputs.block_number:
+            return inputs
+        return inputs.model_copy(update=self.round_snapshot(metagraph))
+
+    async def run_round(self, inputs: "RoundInputs", deadline: float | None = None) -> bool:
+        """
+        Runs the miner fan-out and scoring for one round of prepared inputs and submits the vote, which is
+        confirmed in the background.
+
+        Parameters:
+            inputs (RoundInputs): The inputs produced by prepare_round.
+            deadline (float, optional): The event loop time by which the fan-out must end, from a round plan.
+                Defaults to `round_timeout` seconds from now.
+
+        Returns:
+            bool: Whether a vote was submitted.
+        """
+        selfuid = inputs.selfuid
+        loop = asyncio.get_running_loop()
+        round_timeout = None if deadline is None else max(deadline - loop.time(), 1.0)
 
         # Get the responses from the miners
-        responses_dict = await self.get_miner_responses(
-            selfuid, encoding, prompt_message, address_dict
+        responses_dict = await self.fan_out(
+            selfuid, inputs.encoding, inputs.prompt_message, inputs.address_dict, round_timeout
         )
+        self.schedule_capacity_probe(selfuid, inputs.address_dict, inputs.prompt_message.content)
         
         # Score the modules
         score_dict = self.score_modules(
-            weights_dict, address_dict, keys_dict, responses_dict
+            inputs.weights_dict, inputs.staketo_dict, inputs.keys_dict, responses_dict
         )
         logger.debug(f"score_dict: {score_dict}")
         
@@ -627,33 +1590,154 @@ class Validator:
         with open("data/weights.json", "w") as f:
             f.write(json.dumps(subnet_weights, indent=4))
 
-        # Vote on the modules   
+        # Vote on the modules
+        return self.submit_vote(uids, weights)
+
+    def submit_vote(self, uids: list[int], weights: list[float]) -> bool:
+        """
+        Submits a weight vector unless it moved less than `vote_min_change` from the last confirmed vote.
+
+        The vote is quantized to u16 weights and confirmed in a background task, so the round loop does not
+        wait for block inclusion. The scheduler counts the vote from submission, and forgets it again if the
+        vote is not confirmed.
+
+        Parameters:
+            uids (list[int]): The voted UIDs.
+            weights (list[float]): The weight of each UID.
+
+        Returns:
+            bool: Whether a vote was submitted.
+        """
+        previous_vote_block = self.scheduler.last_vote_block
+
+        def on_outcome(outcome: VoteOutcome) -> None:
+            if outcome.status != "confirmed":
+                self.scheduler.last_vote_block = previous_vote_block
+
+        if self.votes.submit(uids, weights, on_outcome=on_outcome) is None:
+            return False
+        if self.scheduler.block is not None:
+            self.scheduler.record_vote(asyncio.get_running_loop().time())
+        return True
+
+    async def plan_round(self) -> RoundPlan | None:
+        """
+        Plans the next round so its vote lands just before the subnet's next epoch and outside the vote rate
+        limit. The chain head is read every round and the tempo and rate limit every `chain_params_ttl` seconds.
+
+        Returns:
+            RoundPlan | None: The plan, on the event loop clock, or None if `tempo_scheduling` is off or the
+            chain parameters could not be read, in which case rounds fall back to `round_interval`.
+        """
+        if not self.settings.tempo_scheduling:
+            return None
+        loop = asyncio.get_running_loop()
         try:
-            result = comx.vote(key=self.keypair, netuid=10, weights=weights, uids=uids)
-            if result.is_success:
-                logger.info("Voted successfully")
-            else:
-                logger.error(f"\n{result}")
+            if self.scheduler.needs_params(loop.time()):
+                tempo, rate_limit = await asyncio.gather(
+                    self.chain.call(self.chain_client.get_tempo, netuid=10),
+                    self.chain.call(self.chain_client.get_tx_rate_limit),
+                )
+                self.scheduler.set_params(tempo, rate_limit, loop.time())
+            block_number, _ = await self.chain.call(current_block, self.chain_client)
+            self.scheduler.observe(block_number, loop.time())
         except Exception as e:
-            logger.exception(f"Error voting: {e}")
-        
-        logger.warning("Voted")
-        time.sleep(60)
+            if self.scheduler.block is None:
+                logger.warning(f"\nCould not read the chain timing, falling back to round_interval: {e}")
+                return None
+            logger.warning(f"\nCould not read the chain head, extrapolating from block {self.scheduler.block}: {e}")
+        plan = self.scheduler.plan(loop.time())
+        logger.info(
+            f"\nNext vote at block {plan.vote_block} (tempo {self.scheduler.tempo}, rate limit "
+            f"{self.scheduler.rate_limit}): round starts in {plan.start_at - loop.time():.1f}s "
+            f"with a {plan.deadline - max(plan.start_at, loop.time()):.1f}s fan-out budget"
+        )
+        return plan
+
+    async def validate_loop(self):
+        """
+        Executes a loop to validate weights and scoring based on sample results and similarities.
+
+        With `tempo_scheduling` the round waits for its planned start and votes just before the next epoch,
+        otherwise it is followed by a `round_interval` sleep.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        plan = await self.plan_round()
+        if plan is not None:
+            await asyncio.sleep(max(0.0, plan.start_at - loop.time()))
+        await self.run_round(await self.prepare_round(), deadline=plan.deadline if plan is not None else None)
+        if plan is None:
+            await asyncio.sleep(self.settings.round_interval)
+        else:
+            self.scheduler.finish_round(plan.vote_block)
+
+    async def voteloop(self):
+        """
+        Runs validation rounds forever on a single event loop, so the pooled HTTP session survives between rounds.
+
+        Rounds are pipelined: the next round's chain snapshot and reference sample are prepared while the
+        current round's fan-out and vote are in flight, and the snapshot is brought up to date by
+        `refresh_round` when the round starts. With `tempo_scheduling` each round starts and ends on the plan
+        from `plan_round`, so its vote lands just before an epoch. Otherwise a new round starts every
+        `round_interval` seconds at most.
+        """
+        loop = asyncio.get_running_loop()
+        if self.metagraph is None:
+            self.load_cached_metagraph()
+        next_inputs = asyncio.create_task(self.prepare_round())
+        try:
+            while True:
+                plan = await self.plan_round()
+                if plan is not None and (wait := plan.start_at - loop.time()) > 0:
+                    await asyncio.sleep(wait)
+                round_start = loop.time()
+                try:
+                    inputs = await self.refresh_round(await next_inputs)
+                except Exception as e:
+                    logger.exception(f"Error preparing round: {e}")
+                    inputs = None
+                next_inputs = asyncio.create_task(self.prepare_round())
+                if inputs is not None:
+                    try:
+                        await self.run_round(inputs, deadline=plan.deadline if plan is not None else None)
+                    except Exception as e:
+                        logger.exception(f"Error running round: {e}")
+                if plan is not None:
+                    self.scheduler.finish_round(plan.vote_block)
+                if plan is None:
+                    await asyncio.sleep(max(0.0, self.settings.round_interval - (loop.time() - round_start)))
+        finally:
+            next_inputs.cancel()
+            await self.votes.wait(self.settings.vote_confirm_timeout)
+            if self.reconcile_task is not None:
+                self.reconcile_task.cancel()
+                await asyncio.gather(self.reconcile_task, return_exceptions=True)
+            if self.capacity_task is not None:
+                self.capacity_task.cancel()
+                await asyncio.gather(self.capacity_task, return_exceptions=True)
+            await self.close_session()
+            if self.sharded_fanout is not None:
+                self.sharded_fanout.close()
 
     def run_voteloop(self):
-        while True:
-            asyncio.run(self.validate_loop())
+        asyncio.run(self.voteloop())
 
     def get_querymap_addresses(self):
         """
-        Parses addresses and returns the result from comx.query_map_address with netuid 10.
+        Returns the module addresses from the current metagraph snapshot.
         """
         logger.info("\nParsing addresses")
-        return comx.query_map_address(netuid=10)
+        return self.current_metagraph().addresses
 
     def get_querymaps_weights(self):
         """
-        Parses existing weights and creates a dictionary mapping UID to weight.
+        Returns the existing weights from the current metagraph snapshot as a dictionary mapping UID to weight.
 
         Parameters:
             None
@@ -662,20 +1746,14 @@ class Validator:
             dict: A dictionary mapping UID to weight based on the existing weights.
         """
         logger.info("\nParsing existing weights")
-        # sourcery skip: dict-comprehension, identity-comprehension, inline-immediately-returned-variable
-        weights = comx.query_map_weights(netuid=10)[1]
-        weight_dict = {}
-        for uid, weight in weights:  # type: ignore
-            if uid not in weight_dict:
-                weight_dict[uid] = weight
-        return weight_dict
+        return dict(self.current_metagraph().weights)
 
     def get_querymap_stake(self):
         """
-        A function that parses stake information and returns the result from comx.query_map_stake with netuid 10.
+        Returns the stake of each module from the current metagraph snapshot.
         """
         logger.info("\nParsing stake")
-        return comx.query_map_stake(netuid=10)
+        return self.get_staketo_values()
 
     def set_default_weights(self, selfuid, weights, addresses):
         """
@@ -699,10 +1777,10 @@ class Validator:
 
     def get_querymap_keys(self):
         """
-        A function that parses keys and returns the result from comx.query_map_key with netuid 10.
+        Returns the module keys from the current metagraph snapshot.
         """
         logger.info("\nParsing keys")
-        return comx.query_map_key(netuid=10)
+        return self.current_metagraph().keys
 
     def scale_numbers(self, numbers):
         """
@@ -754,19 +1832,10 @@ class Validator:
             for key, value in dictionary.items()
         }
     def get_staketo_values(self):
-        staketo_map = comx.query_map_staketo()
-        key_map = comx.query_map_key(netuid=10)
-        staketo_dict = {}
-        for uid, key in key_map.items():
-            staketo_value = 0.00001
-            if key not in staketo_map:
-                continue
-            staketo = staketo_map[key]
-            for stakeitems in staketo:
-                _, value = stakeitems
-                staketo_value += value
-            staketo_dict[uid] = staketo_value
-        return staketo_dict
+        """
+        Returns the stake delegated to each module from the current metagraph snapshot.
+        """
+        return dict(self.current_metagraph().stake)
 
     def score_modules(self, weights_dict, staketos_dict, keys_dict, similairity_dict):
         """
@@ -775,10 +1844,14 @@ class Validator:
         Parameters:
             self: The instance of the class.
             weights_dict (dict): A dictionary containing weights for each module.
-            staketos_dict (dict): A dictionary containing staketos for each module.
+            staketos_dict (dict): A dictionary containing staketos for each module, fetched from the chain when None.
             keys_dict (dict): A dictionary containing keys for each module.
             similarity_dict (dict): A dictionary containing similarity values for each module.
 
+        With a non-zero `latency_weight`, miners also earn a share of the score for answering quickly, measured
+        at the `latency_quantile` of their latency over recent rounds, and with a non-zero `capacity_weight`
+        for the sustained tokens per second measured by the latest capacity probe.
+
         Returns:
             dict: A dictionary containing the calculated scores for each module.
         """
@@ -786,14 +1859,24 @@ class Validator:
         logger.debug(f"\nweights_dict: {weights_dict}\nsimilairity_dict: {similairity_dict}")
         scaled_weight_dict = self.scale_dict_values(weights_dict)
         scaled_similairity_dict = self.scale_dict_values(similairity_dict)
-        staketo_dict = self.get_staketo_values()
+        staketo_dict = staketos_dict if staketos_dict is not None else self.get_staketo_values()
         scaled_staketo_dict = self.scale_dict_values(staketo_dict)
+        scaled_latency_dict = {}
+        if self.settings.latency_weight:
+            scaled_latency_dict = self.scale_dict_values(
+                self.latency.speed_scores(similairity_dict, q=self.settings.latency_quantile)
+            )
+        scaled_capacity_dict = {}
+        if self.settings.capacity_weight:
+            scaled_capacity_dict = self.scale_dict_values(self.capacity.scores(similairity_dict))
         scaled_scores = {}
         for uid in keys_dict.keys():     
             if uid not in scaled_similairity_dict:
                 continue       
             calculated_score = (
-                (scaled_weight_dict[uid] * 0.4) + (scaled_similairity_dict[uid] * 0.2) + (scaled_staketo_dict[uid] * 0.2)
+                (scaled_weight_dict.get(uid, 0) * 0.4) + (scaled_similairity_dict[uid] * 0.2) + (scaled_staketo_dict.get(uid, 0) * 0.2)
+                + (scaled_latency_dict.get(uid, 0) * self.settings.latency_weight)
+                + (scaled_capacity_dict.get(uid, 0) * self.settings.capacity_weight)
             ) 
             if calculated_score <= 0:
                 calculated_score = 0.00001
@@ -806,19 +1889,21 @@ class Validator:
     
 
 class Validator(Validator):
-    @logger.catch()
-    def __init__(self, settings: ValidatorSettings) -> None:
+    @logger.catch(reraise=True)
+    def __init__(self, settings: ValidatorSettings, chain_client: CommuneClient | FakeChain | None = None) -> None:
         """
         Initializes the Validator class with the provided settings.
 
         Args:
             settings (ValidatorSettings): An instance of ValidatorSettings containing key_name, module_path, host, port, and settings.
+            chain_client (CommuneClient | FakeChain, optional): The chain backend. Defaults to the shared client.
 
         Returns:
             None
         """
         super().__init__(
             settings=settings,
+            chain_client=chain_client,
         )
         self.key_name = settings.key_name
         self.module_path = settings.module_path
@@ -835,6 +1920,8 @@ def main():
         host=ARGS.host or os.getenv("HOST"),
         port=ARGS.port or os.getenv("PORT"),
     )
+    if ARGS.chain:
+        set_chain_client(make_chain_client(ARGS.chain, CHAIN_CONNECTIONS, ARGS.chain_latency))
     # Serve the validator
     logger.info("\nLaunching validator")
     validator = Validator(settings=validator_settings)
@@ -0,0 +1,233 @@
+"""
+Vote suppression and background vote submission.
+
+The chain stores weights as u16 values, so two score vectors that differ only below that resolution, or by a
+few units of it, set practically the same weights. Each vote is a transaction that costs a fee, counts against
+the rate limit and loads the node, and `CommuneClient.vote` blocks until the extrinsic is included in a block.
+`VoteSubmitter` quantizes each new weight vector the way the chain stores it, skips the vote when the vector
+moved less than a configured distance from the last confirmed one, and otherwise submits it in a background
+task that waits for inclusion and records the outcome, so the round loop never waits on the chain.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Sequence
+
+from loguru import logger
+
+U16_MAX = 65535
+
+
+class VoteOutcome(NamedTuple):
+    """The outcome of one submitted vote."""
+
+    status: str
+    uids: int
+    distance: float
+    submitted_at: float
+    finished_at: float
+    block: Optional[Any] = None
+    error: Optional[str] = None
+
+
+def quantize_weights(uids: Sequence[int], weights: Sequence[float]) -> Dict[int, int]:
+    """
+    Scales a weight vector so its largest weight is U16_MAX and rounds every weight to an integer.
+
+    Args:
+        uids (Sequence[int]): The voted UIDs.
+        weights (Sequence[float]): The weight of each UID, of any non-negative scale.
+
+    Returns:
+        Dict[int, int]: The u16 weight per UID.
+
+    Raises:
+        ValueError: If the lengths differ or a weight is negative.
+    """
+    if len(uids) != len(weights):
+        raise ValueError(f"{len(uids)} uids but {len(weights)} weights")
+    if any(weight < 0 for weight in weights):
+        raise ValueError("Weights must not be negative")
+    top = max(weights, default=0) or 1
+    return {int(uid): round(weight / top * U16_MAX) for uid, weight in zip(uids, weights)}
+
+
+def weight_distance(old: Dict[int, int], new: Dict[int, int]) -> float:
+    """
+    Returns the total variation distance between two weight vectors, each normalised to sum to one.
+
+    0.0 means the vectors split emissions identically and 1.0 that they share no weight at all.
+
+    Args:
+        old (Dict[int, int]): The weight per UID of one vector.
+        new (Dict[int, int]): The weight per UID of the other.
+
+    Returns:
+        float: The distance, between 0.0 and 1.0.
+    """
+    old_total = sum(old.values())
+    new_total = sum(new.values())
+    if not old_total or not new_total:
+        return 0.0 if old_total == new_total else 1.0
+    return 0.5 * sum(
+        abs(old.get(uid, 0) / old_total - new.get(uid, 0) / new_total) for uid in old.keys() | new.keys()
+    )
+
+
+def _read_receipt(receipt: Any) -> tuple[bool, Any, Optional[str]]:
+    success = bool(getattr(receipt, "is_success", False))
+    block = getattr(receipt, "block_number", None) or getattr(receipt, "block_hash", None)
+    error = None if success else str(getattr(receipt, "error_message", None) or receipt)
+    return success, block, error
+
+
+class VoteSubmitter:
+    """
+    Decides whether a weight vector is worth a vote and submits it off the round loop.
+
+    Explanation:
+    `submit` quantizes the vector and compares it with the last confirmed vote. The vote is skipped when the
+    distance is below `min_change`, unless the last confirmed vote is older than `max_age` seconds, and when a
+    previous vote is still waiting for inclusion. Otherwise the vote runs in a background task. Only a
+    confirmed vote becomes the new reference, so a failed or rejected vote is sent again on the next round.
+    The latest outcomes are kept in `outcomes` and, with a `log_path`, appended to that file as JSON lines.
+    """
+
+    def __init__(
+        self,
+        vote: Callable[[List[int], List[int]], Awaitable[Any]],
+        min_change: float = 0.01,
+        max_age: float = 3600.0,
+        log_path: str | Path | None = None,
+        history: int = 100,
+    ) -> None:
+        """
+        Initializes a submitter that has not voted yet.
+
+        Args:
+            vote (Callable): Submits `(uids, weights)` and returns the extrinsic receipt.
+            min_change (float): The smallest weight distance worth a vote.
+            max_age (float): The seconds after which an unchanged vector is voted again.
+            log_path (str | Path, optional): The file outcomes are appended to.
+            history (int): The number of outcomes kept in memory.
+        """
+        self.vote = vote
+        self.min_change = min_change
+        self.max_age = max_age
+        self.log_path = Path(log_path) if log_path is not None else None
+        self.last_weights: Optional[Dict[int, int]] = None
+        self.last_vote_at = -float("inf")
+        self.pending: Optional[asyncio.Task] = None
+        self.outcomes: Deque[VoteOutcome] = deque(maxlen=history)
+        self.suppressed = 0
+
+    def distance(self, weights: Dict[int, int]) -> float:
+        """
+        Returns the distance of a quantized vector from the last confirmed vote, 1.0 before the first one.
+        """
+        if self.last_weights is None:
+            return 1.0
+        return weight_distance(self.last_weights, weights)
+
+    def submit(
+        self,
+        uids: Sequence[int],
+        weights: Sequence[float],
+        on_outcome: Optional[Callable[[VoteOutcome], None]] = None,
+    ) -> Optional[asyncio.Task]:
+        """
+        Starts a background vote for a weight vector unless it is not worth one.
+
+        Must be called from a running event loop.
+
+        Args:
+            uids (Sequence[int]): The voted UIDs.
+            weights (Sequence[float]): The weight of each UID.
+            on_outcome (Callable, optional): Called with the outcome once the vote finished.
+
+        Returns:
+            asyncio.Task | None: The task confirming the vote, or None if the vote was skipped.
+        """
+        if self.pending is not None and not self.pending.done():
+            logger.warning("\nPrevious vote is still waiting for inclusion, skipping this one")
+            return None
+        quantized = quantize_weights(uids, weights)
+        distance = self.distance(quantized)
+        age = time.monotonic() - self.last_vote_at
+        if distance < self.min_change and age < self.max_age:
+            self.suppressed += 1
+            logger.info(
+                f"\nWeights moved {distance:.4f} since the last vote {age:.0f}s ago "
+                f"(threshold {self.min_change}), skipping the vote"
+            )
+            return None
+        self.pending = asyncio.create_task(self._confirm(quantized, distance, on_outcome))
+        return self.pending
+
+    async def _confirm(
+        self,
+        quantized: Dict[int, int],
+        distance: float,
+        on_outcome: Optional[Callable[[VoteOutcome], None]],
+    ) -> VoteOutcome:
+        submitted_at = time.time()
+        started = time.monotonic()
+        try:
+            receipt = await self.vote(list(quantized), list(quantized.values()))
+            # The receipt reads its events from the node on first access, so it is read in a thread.
+            success, block, error = await asyncio.to_thread(_read_receipt, receipt)
+        except Exception as e:
+            logger.exception(f"Error voting: {e}")
+            outcome = VoteOutcome("failed", len(quantized), distance, submitted_at, time.time(), error=repr(e))
+        else:
+            if success:
+                self.last_weights = quantized
+                self.last_vote_at = started
+                outcome = VoteOutcome("confirmed", len(quantized), distance, submitted_at, time.time(), block)
+                logger.info(f"\nVote for {len(quantized)} UIDs confirmed in {outcome.finished_at - submitted_at:.1f}s")
+            else:
+                outcome = VoteOutcome("rejected", len(quantized), distance, submitted_at, time.time(), block, error)
+                logger.error(f"\nVote rejected: {error}")
+        self.outcomes.append(outcome)
+        if self.log_path is not None:
+            try:
+                await asyncio.to_thread(self._append_log, outcome)
+            except OSError as e:
+                logger.warning(f"\nCould not record the vote outcome in {self.log_path}: {e}")
+        if on_outcome is not None:
+            try:
+                on_outcome(outcome)
+            except Exception as e:
+                logger.exception(f"Error handling the vote outcome: {e}")
+        return outcome
+
+    def _append_log(self, outcome: VoteOutcome) -> None:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "a") as f:
+            f.write(json.dumps(outcome._asdict(), default=str) + "\n")
+
+    async def wait(self, timeout: float | None = None) -> Optional[VoteOutcome]:
+        """
+        Waits for the vote in flight, if any.
+
+        Args:
+            timeout (float, optional): The seconds to wait before cancelling it.
+
+        Returns:
+            VoteOutcome | None: Its outcome, or None if no vote was in flight, it was cancelled or it raised.
+        """
+        if self.pending is None or self.pending.cancelled():
+            return None
+        try:
+            return await asyncio.wait_for(self.pending, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"\nVote still unconfirmed after {timeout}s, giving up on it")
+        except asyncio.CancelledError:
+            if not self.pending.cancelled():
+                raise
+        except Exception as e:
+            logger.exception(f"Error confirming the vote: {e}")
+        return None
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from eden_subnet.base.address import Endpoint, Resolver, parse_address
+from eden_subnet import get_ip_port
+
+
+# Tests for parse_address
+@pytest.mark.parametrize(
+    "address, expected, test_id",
+    [
+        ("192.168.1.1:8080", Endpoint("192.168.1.1", 8080, "ipv4"), "ipv4"),
+        ("[2001:db8::1]:8080", Endpoint("2001:db8::1", 8080, "ipv6"), "ipv6"),
+        ("Miner.Example.com:80", Endpoint("miner.example.com", 80, "hostname"), "hostname"),
+        ("http://10.0.0.1:9090/generate", Endpoint("10.0.0.1", 9090, "ipv4"), "url"),
+        ("192.168.1.1:8080 extra text", Endpoint("192.168.1.1", 8080, "ipv4"), "embedded"),
+        ("256.256.256.256:9999", None, "bad_octet"),
+        ("192.168.1.1:65536", None, "bad_port"),
+        ("192.168.1.1", None, "missing_port"),
+        ("2001:db8::1:8080", None, "unbracketed_ipv6"),
+        ("0.0.0.0:8080", None, "unspecified"),
+        ("None:None", None, "garbage"),
+    ],
+)
+def test_parse_address(address, expected, test_id):
+    # Act / Assert
+    assert parse_address(address) == expected
+
+
+def test_endpoint_url_brackets_ipv6():
+    # Act / Assert
+    assert parse_address("[::1]:8080").url("/generate") == "http://[::1]:8080/generate"
+    assert parse_address("1.2.3.4:80").netloc == "1.2.3.4:80"
+
+
+def test_get_ip_port_keeps_ipv6_and_hostnames():
+    # Act
+    ip_port = get_ip_port({1: "192.168.0.1:8080", 2: "[::1]:9090", 3: "localhost:80", 4: "nope"})
+
+    # Assert
+    assert ip_port == {1: ["192.168.0.1", "8080"], 2: ["::1", "9090"], 3: ["localhost", "80"]}
+
+
+def test_resolver_caches_lookups():
+    # Arrange
+    resolver = Resolver(ttl=60.0)
+    endpoint = parse_address("localhost:8080")
+
+    # Act
+    async def resolve_twice():
+        first = await resolver.resolve(endpoint)
+        resolver.cache["localhost"] = (["192.0.2.1"], resolver.cache["localhost"][1])
+        return first, await resolver.resolve(endpoint)
+
+    first, second = asyncio.run(resolve_twice())
+
+    # Assert
+    assert first in ("127.0.0.1", "::1")
+    assert second == "192.0.2.1"
+    assert asyncio.run(resolver.resolve(parse_address("10.0.0.1:80"))) == "10.0.0.1"
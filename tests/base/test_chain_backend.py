@@ -0,0 +1,87 @@
+import types
+import pytest
+from eden_subnet.base import chain as chain_module
+from eden_subnet.base.chain import FakeChain, get_chain_client, make_chain_client, set_chain_client
+from eden_subnet.validator.metagraph import MetagraphRefresher, fetch_metagraph
+
+
+@pytest.mark.parametrize("size, test_id", [(10, "small"), (10_000, "production_scale")])
+def test_synthetic_chain_serves_query_maps(size, test_id):
+    # Arrange
+    chain = FakeChain.synthetic(size=size, port=9000, port_span=4)
+
+    # Act
+    keys = chain.query_map_key(netuid=10)
+    addresses = chain.query_map_address(netuid=10)
+    weights = chain.query_map_weights(netuid=10)
+    staketo = chain.query_map_staketo()
+
+    # Assert
+    assert len(keys) == len(set(keys.values())) == size
+    assert set(addresses) == set(range(1, size))
+    assert addresses[5] == "127.0.0.1:9001"
+    assert {uid for uid, _ in weights[1]} == set(range(2, size))
+    assert set(staketo) == set(keys.values())
+
+
+def test_fake_chain_feeds_the_metagraph_refresher():
+    # Arrange
+    chain = FakeChain.synthetic(size=50)
+    refresher = MetagraphRefresher(chain, netuid=10, min_interval=0)
+
+    # Act
+    first, _ = refresher.refresh(now=0.0)
+    same, diff = refresher.refresh(now=1.0)
+    chain.addresses[3] = "127.0.0.1:1"
+    chain.advance()
+    moved, moved_diff = refresher.refresh(now=2.0)
+
+    # Assert
+    assert first.keys == chain.keys and len(first.stake) == 50
+    assert same is first and not diff
+    assert moved.block_number == 2 and moved_diff.address_changed == {3}
+    assert chain.calls["query_batch_map"] == 2
+
+
+def test_fake_chain_records_votes_and_latency():
+    # Arrange
+    chain = FakeChain.synthetic(size=10, latency=0.01)
+
+    # Act
+    receipt = chain.vote(key=types.SimpleNamespace(ss58_address="me"), uids=[1, 2], weights=[3, 4], netuid=10)
+    rejected = chain.vote(key="me", uids=[1], weights=[], netuid=10)
+
+    # Assert
+    assert receipt.is_success and not rejected.is_success
+    assert [(vote.key, vote.uids, vote.weights) for vote in chain.votes] == [("me", [1, 2], [3, 4])]
+    with pytest.raises(ValueError):
+        chain.query_map_key(netuid=11)
+
+
+def test_recording_round_trip(tmp_path):
+    # Arrange
+    chain = FakeChain.synthetic(size=20, seed=3)
+    path = tmp_path / "subnet.json"
+
+    # Act
+    chain.save(path)
+    loaded = make_chain_client(f"fake:{path}")
+
+    # Assert
+    assert fetch_metagraph(loaded) == fetch_metagraph(chain)
+
+
+def test_get_chain_client_reads_backend_from_environment(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("EDEN_CHAIN", "fake:12")
+    monkeypatch.setattr(chain_module, "_client", None)
+
+    # Act
+    client = get_chain_client()
+
+    # Assert
+    assert isinstance(client, FakeChain) and len(client.keys) == 12
+    assert get_chain_client() is client
+    set_chain_client(None)
+    with pytest.raises(ValueError):
+        make_chain_client("ledger")
@@ -0,0 +1,75 @@
+import json
+import os
+import pytest
+from communex.compat.key import Keypair
+from eden_subnet.base import keystore as keystore_module
+from eden_subnet.base.data_models import ModuleSettings
+from eden_subnet.base.keystore import KeyStore
+
+
+def write_key(directory, name, uri, encrypted=False, mtime_ns=None):
+    keypair = Keypair.create_from_uri(uri)
+    data = json.dumps({
+        "ss58_address": keypair.ss58_address,
+        "private_key": "0x" + keypair.private_key.hex(),
+        "public_key": "0x" + keypair.public_key.hex(),
+    })
+    path = directory / f"{name}.json"
+    path.write_text(json.dumps({"data": data, "encrypted": encrypted, "timestamp": 0}))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return keypair.ss58_address
+
+
+def test_keystore_parses_each_file_once(tmp_path, monkeypatch):
+    # Arrange
+    alice = write_key(tmp_path, "alice", "//Alice")
+    bob = write_key(tmp_path, "bob", "//Bob")
+    write_key(tmp_path, "locked", "//Charlie", encrypted=True)
+    (tmp_path / "broken.json").write_text("{")
+    store = KeyStore(tmp_path)
+    parses = []
+    parse = store._parse
+    monkeypatch.setattr(store, "_parse", lambda name, path: parses.append(name) or parse(name, path))
+
+    # Act
+    first = store.addresses()
+    second = store.addresses()
+    lookups = [store.address("alice") for _ in range(10)]
+
+    # Assert
+    assert first == second == {"alice": alice, "bob": bob}
+    assert lookups == [alice] * 10
+    assert sorted(parses) == ["alice", "bob", "broken", "locked"]
+
+
+def test_keystore_rereads_changed_and_deleted_files(tmp_path):
+    # Arrange
+    write_key(tmp_path, "miner", "//Alice", mtime_ns=1_000_000_000)
+    store = KeyStore(tmp_path)
+    keypair = store.keypair("miner")
+    assert store.keypair("miner") is keypair
+
+    # Act
+    bob = write_key(tmp_path, "miner", "//Bob", mtime_ns=2_000_000_000)
+    replaced = store.keypair("miner")
+    (tmp_path / "miner.json").unlink()
+
+    # Assert
+    assert replaced.ss58_address == bob and replaced is not keypair
+    assert store.address("miner") is None
+    assert store.addresses() == {}
+    with pytest.raises(ValueError):
+        store.keypair("miner")
+
+
+def test_module_settings_use_the_shared_store(tmp_path, monkeypatch):
+    # Arrange
+    alice = write_key(tmp_path, "admin", "//Alice")
+    monkeypatch.setattr(keystore_module.key_store, "key_dir", tmp_path)
+    settings = ModuleSettings(module_path="miner", key_name="admin", host="127.0.0.1", port=8080)
+
+    # Act / Assert
+    assert settings.get_ss58_address("admin") == alice
+    with pytest.raises(ValueError):
+        settings.get_ss58_address("unknown")
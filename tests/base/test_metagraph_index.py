@@ -0,0 +1,53 @@
+import pytest
+from eden_subnet.base.address import Endpoint
+from eden_subnet.base.base import BaseValidator
+from eden_subnet.base.chain import FakeChain, set_chain_client
+from eden_subnet.base.data_models import ModuleSettings
+from eden_subnet.base.metagraph_index import MetagraphIndex
+
+
+@pytest.fixture
+def index():
+    return MetagraphIndex(
+        keys={0: "master", 1: "me", 2: "a", 3: "b", 4: "a", 5: "c"},
+        addresses={1: "1.1.1.1:80", 2: "2.2.2.2:80", 3: "http://2.2.2.2:80/", 4: "[::1]:90", 5: "garbage"},
+    )
+
+
+def test_index_lookups(index):
+    # Act / Assert
+    assert index.key_of(3) == "b" and index.key_of(9) is None
+    assert index.uid_of("a") == 2 and index.uid_of("nobody") is None
+    assert index.endpoint_of(4) == Endpoint("::1", 90, "ipv6")
+    assert index.endpoint_of(5) is None
+    assert index.uids_at("2.2.2.2:80") == [2, 3]
+    assert index.uids_at("nope") == []
+
+
+def test_index_queryable_skips_master_self_and_unusable(index):
+    # Act
+    queryable = index.queryable(exclude_keys=["me"])
+
+    # Assert
+    assert sorted(queryable) == [2, 3, 4]
+
+
+def test_get_queryable_miners_uses_one_query_per_table(monkeypatch):
+    # Arrange
+    chain = FakeChain.synthetic(size=20, port=9000)
+    chain.addresses[7] = "not an address"
+    set_chain_client(chain)
+    monkeypatch.setattr(ModuleSettings, "get_ss58_address", lambda self, key_name: chain.keys[1])
+    settings = ModuleSettings(module_path="validator", key_name="validator", host="127.0.0.1", port=8080)
+    validator = BaseValidator.model_construct(settings=settings, key_name="validator")
+
+    # Act
+    try:
+        miners = validator.get_queryable_miners()
+    finally:
+        set_chain_client(None)
+
+    # Assert
+    assert sorted(miners) == [uid for uid in range(2, 20) if uid != 7]
+    assert miners[2] == {"netuid": 2, "address": ["127.0.0.1", "9000"], "host": "127.0.0.1", "port": 9000}
+    assert chain.calls == {"query_map_key": 1, "query_map_address": 1}
@@ -0,0 +1,112 @@
+import asyncio
+import time
+import pytest
+import os
+from eden_subnet.base.rpc import RpcClient, RpcError, RpcServer, parse_advertisement, socket_path_allowed
+
+
+def echo_handler(payload):
+    if payload == b"fail":
+        raise ValueError("bad request")
+    if payload.startswith(b"sleep"):
+        time.sleep(0.05)
+    return payload[::-1]
+
+
+# Tests for parse_advertisement
+@pytest.mark.parametrize(
+    "value, expected, test_id",
+    [
+        ("tcp:10101", {"tcp": "10101"}, "tcp_only"),
+        (
+            "tcp:10101, unix:/tmp/miner.sock",
+            {"tcp": "10101", "unix": "/tmp/miner.sock"},
+            "tcp_and_unix",
+        ),
+        ("quic:1, tcp:", {}, "unknown_or_empty"),
+        (None, {}, "missing_header"),
+    ],
+)
+def test_parse_advertisement(value, expected, test_id):
+    # Act / Assert
+    assert parse_advertisement(value) == expected
+
+
+# Tests for socket_path_allowed
+@pytest.mark.parametrize(
+    "path, directory, expected, test_id",
+    [
+        ("sockets/miner.sock", "sockets", True, "inside"),
+        ("sockets/nested/miner.sock", "sockets", True, "nested"),
+        ("other/miner.sock", "sockets", False, "outside"),
+        ("sockets/../other/miner.sock", "sockets", False, "dot_dot"),
+        ("sockets/escape/miner.sock", "sockets", False, "symlink_escape"),
+        ("sockets-evil/miner.sock", "sockets", False, "sibling_prefix"),
+        ("sockets", "sockets", False, "directory_itself"),
+        ("sockets/miner.sock", None, False, "no_directory"),
+    ],
+)
+def test_socket_path_allowed(tmp_path, path, directory, expected, test_id):
+    # Arrange
+    (tmp_path / "sockets" / "nested").mkdir(parents=True)
+    (tmp_path / "other").mkdir()
+    os.symlink(tmp_path / "other", tmp_path / "sockets" / "escape")
+    directory = str(tmp_path / directory) if directory is not None else None
+
+    # Act / Assert
+    assert socket_path_allowed(str(tmp_path / path), directory) is expected
+
+
+def test_relative_socket_paths_are_refused(tmp_path):
+    # Act / Assert
+    assert not socket_path_allowed("miner.sock", str(tmp_path))
+
+
+@pytest.mark.parametrize("transport", ["tcp", "unix"])
+def test_multiplexed_calls(transport, tmp_path):
+    # Arrange
+    async def run():
+        server = RpcServer(handler=echo_handler)
+        if transport == "tcp":
+            await server.start(host="127.0.0.1", port=0)
+            client = await RpcClient.connect(host="127.0.0.1", port=server.port)
+        else:
+            path = str(tmp_path / "miner.sock")
+            await server.start(path=path)
+            client = await RpcClient.connect(path=path)
+
+        # Act
+        results = await asyncio.gather(
+            client.call(b"sleep-slow"), client.call(b"abc"), client.call(b"xyz")
+        )
+        with pytest.raises(RpcError):
+            await client.call(b"fail")
+        await client.close()
+        await server.close()
+        return results, server.advertisement()
+
+    results, advertisement = asyncio.run(run())
+
+    # Assert
+    assert results == [b"wols-peels", b"cba", b"zyx"]
+    assert advertisement.startswith(transport)
+
+
+def test_lost_connection_fails_pending_calls():
+    # Arrange
+    async def run():
+        server = RpcServer(handler=lambda payload: time.sleep(0.2) or payload)
+        await server.start(host="127.0.0.1", port=0)
+        client = await RpcClient.connect(host="127.0.0.1", port=server.port)
+        call = asyncio.create_task(client.call(b"hello"))
+        await asyncio.sleep(0.05)
+
+        # Act
+        client.writer.transport.abort()
+        with pytest.raises(ConnectionError):
+            await call
+        await server.close()
+        return client.closed
+
+    # Assert
+    assert asyncio.run(run()) is True
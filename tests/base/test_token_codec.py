@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+from eden_subnet.base.token_codec import (
+    DIGEST_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    TOKENS_MEDIA_TYPE,
+    TOKENS_ZSTD_MEDIA_TYPE,
+    accept_header,
+    decode_digest,
+    decode_json_tokens,
+    decode_tokens,
+    encode_digest,
+    encode_tokens,
+    negotiate,
+    token_digest,
+    validate_tokens,
+)
+
+
+# Tests for negotiate
+@pytest.mark.parametrize(
+    "accept, expected_media_type, test_id",
+    [
+        (None, JSON_MEDIA_TYPE, "missing_header_gets_json"),
+        ("*/*", JSON_MEDIA_TYPE, "wildcard_gets_json"),
+        ("application/json", JSON_MEDIA_TYPE, "json_only"),
+        (TOKENS_MEDIA_TYPE, TOKENS_MEDIA_TYPE, "binary_requested"),
+        (
+            f"{TOKENS_MEDIA_TYPE};q=0.9, application/json;q=1.0",
+            TOKENS_MEDIA_TYPE,
+            "binary_preferred_over_json_fallback",
+        ),
+        (f"{TOKENS_MEDIA_TYPE};q=0", JSON_MEDIA_TYPE, "binary_refused"),
+    ],
+)
+def test_negotiate(accept, expected_media_type, test_id):
+    # Act
+    media_type = negotiate(accept)
+
+    # Assert
+    assert media_type == expected_media_type
+
+
+def test_round_trip_uint32():
+    # Arrange
+    tokens = [9906, 11, 1917, 0]
+
+    # Act
+    body = encode_tokens(tokens)
+    decoded = decode_tokens(body)
+
+    # Assert
+    assert len(body) == 16
+    assert decoded.tolist() == tokens
+
+
+def test_decode_rejects_partial_values():
+    # Act / Assert
+    with pytest.raises(ValueError):
+        decode_tokens(b"\x01\x02\x03")
+
+
+def test_round_trip_zstd():
+    # Arrange
+    pytest.importorskip("zstandard")
+    tokens = list(range(1000))
+
+    # Act
+    body = encode_tokens(tokens, TOKENS_ZSTD_MEDIA_TYPE)
+
+    # Assert
+    assert negotiate(accept_header()) == TOKENS_ZSTD_MEDIA_TYPE
+    assert decode_tokens(body, TOKENS_ZSTD_MEDIA_TYPE).tolist() == tokens
+    with pytest.raises(ValueError):
+        decode_tokens(body, TOKENS_ZSTD_MEDIA_TYPE, max_bytes=100)
+
+
+def test_digest_round_trip():
+    # Arrange
+    tokens = [9906, 11, 1917]
+
+    # Act
+    decoded = decode_digest(encode_digest(tokens))
+
+    # Assert
+    assert negotiate(accept_header(digest=True)) == DIGEST_MEDIA_TYPE
+    assert decoded == token_digest(tokens)
+    assert decoded.length == 3
+    assert decoded != token_digest([9906, 11, 1918])
+    with pytest.raises(ValueError):
+        decode_digest(b"\x00" * 8)
+
+
+# Tests for decode_json_tokens
+@pytest.mark.parametrize(
+    "body, expected, test_id",
+    [
+        (b'{"choices": [{"message": {"content": [9906, 11, 1917]}}]}', [9906, 11, 1917], "openai_shape"),
+        (b"[1, 2, 3]", [1, 2, 3], "bare_list"),
+        (b"[]", [], "empty"),
+    ],
+)
+def test_decode_json_tokens(body, expected, test_id):
+    # Act
+    tokens = decode_json_tokens(body, vocab_size=100277)
+
+    # Assert
+    assert tokens.dtype == np.int32
+    assert tokens.flags["C_CONTIGUOUS"]
+    assert tokens.tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "body, test_id",
+    [
+        (b"not json", "not_json"),
+        (b'{"choices": []}', "not_a_list"),
+        (b"[[1, 2], [3, 4]]", "nested"),
+        (b"[[1, 2], [3]]", "ragged"),
+        (b"[1.5, 2]", "floats"),
+        (b'["a", "b"]', "strings"),
+        (b"[1, -2]", "negative"),
+        (b"[1, 100277]", "out_of_vocabulary"),
+    ],
+)
+def test_decode_json_tokens_rejects_garbage(body, test_id):
+    # Act / Assert
+    with pytest.raises(ValueError):
+        decode_json_tokens(body, vocab_size=100277)
+
+
+def test_validate_tokens_checks_binary_payloads():
+    # Arrange
+    tokens = decode_tokens(encode_tokens([1, 2, 4000000000]))
+
+    # Act / Assert
+    assert validate_tokens(tokens[:2]).tolist() == [1, 2]
+    with pytest.raises(ValueError):
+        validate_tokens(tokens)
@@ -0,0 +1,68 @@
+import pytest
+from eden_subnet.validator.capacity import (
+    BurstResult,
+    CapacityRecord,
+    CapacityStore,
+    burst_levels,
+    prompt_variants,
+    summarize_bursts,
+)
+
+
+# Tests for burst_levels
+@pytest.mark.parametrize(
+    "max_burst, expected, test_id",
+    [
+        (1, [1], "single"),
+        (16, [1, 2, 4, 8, 16], "power_of_two"),
+        (10, [1, 2, 4, 8, 10], "capped"),
+    ],
+)
+def test_burst_levels(max_burst, expected, test_id):
+    # Act / Assert
+    assert burst_levels(max_burst) == expected
+
+
+def test_prompt_variants_cut_and_repeat():
+    # Act
+    prompts = prompt_variants("abc", [2, 7])
+
+    # Assert
+    assert prompts == ["ab", "abcabca"]
+
+
+# Tests for summarize_bursts
+@pytest.mark.parametrize(
+    "bursts, expected, test_id",
+    [
+        (
+            [BurstResult(1, 100, 0, 1.0), BurstResult(2, 400, 0, 1.0)],
+            CapacityRecord(400.0, 2, None, 0.0),
+            "no_errors",
+        ),
+        (
+            [BurstResult(1, 100, 0, 1.0), BurstResult(2, 300, 0, 1.0), BurstResult(4, 100, 3, 1.0)],
+            CapacityRecord(300.0, 2, 4, 0.0),
+            "error_onset",
+        ),
+        ([BurstResult(1, 0, 1, 1.0)], CapacityRecord(0.0, 0, 1, 0.0), "dead_miner"),
+    ],
+)
+def test_summarize_bursts(bursts, expected, test_id):
+    # Act / Assert
+    assert summarize_bursts(bursts, error_threshold=0.1, now=0.0) == expected
+
+
+def test_store_selects_least_recently_probed():
+    # Arrange
+    store = CapacityStore()
+    store.record(1, CapacityRecord(10.0, 1, None, 200.0))
+    store.record(2, CapacityRecord(20.0, 1, None, 100.0))
+
+    # Act
+    selected = store.select([1, 2, 3], 2)
+    store.prune([1, 3])
+
+    # Assert
+    assert selected == [3, 2]
+    assert store.scores([1, 2, 3]) == {1: 10.0, 2: 0.0, 3: 0.0}
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from communex.client import CommuneClient
+from eden_subnet.validator.chain import AsyncChain
+
+
+def make_chain(**kwargs):
+    client = MagicMock(spec=CommuneClient)
+    return client, AsyncChain(client, backoff=0.01, max_backoff=0.01, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "failures, attempts, expected, test_id",
+    [
+        (0, 3, {1: "a"}, "first_try"),
+        (2, 3, {1: "a"}, "recovers"),
+        (3, 3, ConnectionError, "gives_up"),
+    ],
+)
+def test_call_retries_failures(failures, attempts, expected, test_id):
+    # Arrange
+    client, chain = make_chain(attempts=attempts)
+    client.query_map_key.side_effect = [ConnectionError("node went away")] * failures + [{1: "a"}]
+
+    # Act / Assert
+    if isinstance(expected, type):
+        with pytest.raises(expected):
+            asyncio.run(chain.query_map_key())
+    else:
+        assert asyncio.run(chain.query_map_key()) == expected
+    assert client.query_map_key.call_count == min(failures + 1, attempts)
+
+
+def test_call_times_out_slow_queries():
+    # Arrange
+    client, chain = make_chain(timeout=0.05, attempts=2)
+    client.query_map_address.side_effect = lambda netuid: time.sleep(0.2)
+
+    # Act / Assert
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(chain.query_map_address())
+    assert client.query_map_address.call_count == 2
+
+
+def test_vote_is_not_retried_after_a_timeout():
+    # Arrange
+    client, chain = make_chain(timeout=0.05, attempts=3)
+    client.vote.side_effect = lambda **kwargs: time.sleep(0.2)
+
+    # Act / Assert
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(chain.vote(key="key", uids=[1], weights=[1]))
+    assert client.vote.call_count == 1
+
+
+def test_query_maps_run_concurrently_off_the_loop():
+    # Arrange
+    client, chain = make_chain(max_workers=4)
+    threads = set()
+
+    def slow(result):
+        def query(*args, **kwargs):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.1)
+            return result
+
+        return query
+
+    client.query_map_key.side_effect = slow({0: "k"})
+    client.query_map_address.side_effect = slow({0: "1.2.3.4:80"})
+    client.query_map_weights.side_effect = slow({})
+    client.query_map_staketo.side_effect = slow({})
+
+    # Act
+    start = time.perf_counter()
+    result = asyncio.run(chain.query_maps())
+    elapsed = time.perf_counter() - start
+
+    # Assert
+    assert result == {"keys": {0: "k"}, "addresses": {0: "1.2.3.4:80"}, "weights": {}, "staketo": {}}
+    assert elapsed < 0.3
+    assert all(name.startswith("chain") for name in threads)
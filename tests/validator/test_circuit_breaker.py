@@ -0,0 +1,82 @@
+import pytest
+from eden_subnet.validator.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitState,
+)
+
+
+# Tests for CircuitBreaker state transitions
+@pytest.mark.parametrize(
+    "failures, now, expected_state, test_id",
+    [
+        (2, 0.0, CircuitState.CLOSED, "below_threshold_stays_closed"),
+        (3, 0.0, CircuitState.OPEN, "threshold_opens"),
+        (3, 9.9, CircuitState.OPEN, "open_during_backoff"),
+        (3, 10.0, CircuitState.HALF_OPEN, "half_open_after_backoff"),
+    ],
+)
+def test_breaker_state(failures, now, expected_state, test_id):
+    # Arrange
+    breaker = CircuitBreaker(failure_threshold=3, base_backoff=10.0, max_backoff=100.0)
+
+    # Act
+    for _ in range(failures):
+        breaker.record_failure(now=0.0)
+
+    # Assert
+    assert breaker.state(now=now) is expected_state
+
+
+def test_failed_probe_doubles_backoff():
+    # Arrange
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=10.0, max_backoff=15.0)
+    breaker.record_failure(now=0.0)
+
+    # Act
+    breaker.record_failure(now=10.0)
+
+    # Assert
+    assert breaker.state(now=24.9) is CircuitState.OPEN
+    assert breaker.state(now=25.0) is CircuitState.HALF_OPEN
+
+
+def test_success_closes_breaker():
+    # Arrange
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=10.0)
+    breaker.record_failure(now=0.0)
+
+    # Act
+    breaker.record_success()
+
+    # Assert
+    assert breaker.state(now=0.0) is CircuitState.CLOSED
+    assert breaker.failures == 0
+
+
+def test_registry_keys_on_uid_and_address():
+    # Arrange
+    registry = CircuitBreakerRegistry(failure_threshold=1)
+    registry.get(1, "10.0.0.1:8080").record_failure()
+
+    # Act
+    moved = registry.get(1, "10.0.0.2:8080")
+    registry.prune([(1, "10.0.0.2:8080")])
+
+    # Assert
+    assert moved.state() is CircuitState.CLOSED
+    assert list(registry.breakers) == [(1, "10.0.0.2:8080")]
+    assert registry.summary()["closed"] == 1
+
+
+def test_registry_forgets_replaced_uids():
+    # Arrange
+    registry = CircuitBreakerRegistry(failure_threshold=1)
+    registry.get(1, "10.0.0.1:8080").record_failure()
+    registry.get(2, "10.0.0.2:8080").record_failure()
+
+    # Act
+    registry.forget({1})
+
+    # Assert
+    assert list(registry.breakers) == [(2, "10.0.0.2:8080")]
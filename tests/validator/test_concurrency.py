@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from eden_subnet.validator.concurrency import AdaptiveLimiter
+
+
+# Tests for AdaptiveLimiter.record
+@pytest.mark.parametrize(
+    "outcomes, expected_limit, test_id",
+    [
+        ([(0.1, True)] * 5, 15, "slow_start_grows_per_success"),
+        ([(0.1, True)] * 100, 20, "growth_capped_at_max"),
+        ([(0.1, False)], 7, "failure_cuts_limit"),
+        ([(9.0, True)], 7, "slow_response_cuts_limit"),
+        ([(0.1, False)] * 3, 7, "one_decrease_per_window"),
+    ],
+)
+def test_record(outcomes, expected_limit, test_id):
+    # Arrange
+    limiter = AdaptiveLimiter(
+        initial_limit=10, min_limit=2, max_limit=20, latency_target=5.0
+    )
+
+    # Act
+    for latency, success in outcomes:
+        limiter.record(latency, success)
+
+    # Assert
+    assert limiter.current_limit == expected_limit
+
+
+def test_additive_increase_after_decrease():
+    # Arrange
+    limiter = AdaptiveLimiter(initial_limit=10, min_limit=2, max_limit=20)
+    limiter.record(0.1, False)
+
+    # Act
+    for _ in range(7):
+        limiter.record(0.1, True)
+
+    # Assert
+    assert limiter.current_limit == 7
+    assert limiter.round_summary()["decreases"] == 1
+
+
+def test_limit_never_below_min():
+    # Arrange
+    limiter = AdaptiveLimiter(
+        initial_limit=4, min_limit=3, max_limit=20, latency_target=0.0
+    )
+
+    # Act
+    for _ in range(10):
+        limiter.record(1.0, False)
+
+    # Assert
+    assert limiter.current_limit == 3
+
+
+def test_acquire_bounds_in_flight():
+    # Arrange
+    limiter = AdaptiveLimiter(initial_limit=3, min_limit=1, max_limit=3)
+    peak = 0
+
+    async def worker():
+        nonlocal peak
+        async with limiter.acquire():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(worker() for _ in range(10)))
+
+    # Act
+    asyncio.run(run())
+
+    # Assert
+    assert peak == 3
+    assert limiter.in_flight == 0
+    assert limiter.round_summary()["peak_in_flight"] == 3
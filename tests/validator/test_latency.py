@@ -0,0 +1,70 @@
+import pytest
+from eden_subnet.validator.latency import LatencyTracker, QuantileSketch
+
+
+# Tests for QuantileSketch.quantile
+@pytest.mark.parametrize(
+    "q, expected, test_id",
+    [
+        (0.5, 0.5, "median"),
+        (0.95, 0.95, "p95"),
+        (0.99, 0.99, "p99"),
+    ],
+)
+def test_sketch_quantile_within_precision(q, expected, test_id):
+    # Arrange
+    sketch = QuantileSketch(precision=0.01)
+    for i in range(1, 1001):
+        sketch.add(i / 1000)
+
+    # Act
+    value = sketch.quantile(q)
+
+    # Assert
+    assert value == pytest.approx(expected, rel=0.02)
+
+
+def test_sketch_stays_bounded():
+    # Arrange
+    sketch = QuantileSketch(max_samples=100)
+
+    # Act
+    for _ in range(1000):
+        sketch.add(1.0)
+
+    # Assert
+    assert sketch.count <= 100
+    assert sketch.quantile(0.5) == pytest.approx(1.0, rel=0.02)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_tracker_scores_faster_miners_higher():
+    # Arrange
+    tracker = LatencyTracker()
+    for _ in range(20):
+        tracker.record(1, 0.1, size=400)
+        tracker.record(2, 1.0, size=400)
+
+    # Act
+    scores = tracker.speed_scores([1, 2, 3])
+    tracker.prune([1, 3])
+
+    # Assert
+    assert scores[1] > scores[2] > scores[3] == 0.0
+    assert tracker.quantiles(1)["bytes_per_second_p50"] == pytest.approx(4000, rel=0.02)
+    assert tracker.quantiles(2)["latency_p50"] is None
+    assert tracker.summary()["uids"] == 1
+
+
+def test_tracker_update_replaces_exported_sketches():
+    # Arrange
+    worker, parent = LatencyTracker(), LatencyTracker()
+    worker.record(1, 0.2)
+    parent.record(2, 0.5)
+
+    # Act
+    parent.update(worker.export([1, 2]))
+
+    # Assert
+    assert parent.quantiles(1)["latency_p99"] == pytest.approx(0.2, rel=0.02)
+    assert 2 not in parent.latency
@@ -0,0 +1,211 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+from communex.client import CommuneClient
+from eden_subnet.validator.metagraph import (
+    BASE_STAKE,
+    Metagraph,
+    MetagraphRefresher,
+    diff_metagraphs,
+    fetch_metagraph,
+    load_metagraph,
+    save_metagraph,
+    stake_of,
+    weights_of,
+)
+
+
+def make_client(block_number=100, tables=None):
+    client = MagicMock(spec=CommuneClient)
+    substrate = client.get_conn.return_value.__enter__.return_value
+    substrate.get_block_header.return_value = {"header": {"number": block_number, "hash": "0xabc"}}
+    client.query_batch_map.return_value = tables or {}
+    return client
+
+
+# Tests for weights_of
+@pytest.mark.parametrize(
+    "weights_map, expected, test_id",
+    [
+        ({1: [(2, 10), (3, 20), (2, 99)]}, {2: 10, 3: 20}, "first_entry_wins"),
+        ({4: [(2, 10)]}, {}, "voter_missing"),
+        (None, {}, "no_weights"),
+    ],
+)
+def test_weights_of(weights_map, expected, test_id):
+    # Act / Assert
+    assert weights_of(weights_map, 1) == expected
+
+
+def test_stake_of_sums_delegations():
+    # Arrange
+    keys = {1: "key1", 2: "key2"}
+    staketo = {"key1": [("a", 5), ("b", 7)]}
+
+    # Act
+    stake = stake_of(keys, staketo)
+
+    # Assert
+    assert stake == {1: pytest.approx(12 + BASE_STAKE)}
+
+
+def test_fetch_metagraph_uses_one_batched_query():
+    # Arrange
+    client = make_client(tables={
+        "Keys": {0: "key0", 1: "key1"},
+        "Address": {0: "1.2.3.4:80", 1: "5.6.7.8:80"},
+        "StakeTo": {("key1", "key0"): 3},
+        "Weights": {1: [(0, 50)]},
+    })
+
+    # Act
+    metagraph = fetch_metagraph(client, netuid=10)
+
+    # Assert
+    client.query_batch_map.assert_called_once()
+    assert client.query_batch_map.call_args.args[1] == "0xabc"
+    assert metagraph.block_hash == "0xabc"
+    assert metagraph.block_number == 100
+    assert metagraph.uid_of("key1") == 1
+    assert metagraph.uid_of("nobody") is None
+    assert metagraph.addresses[1] == "5.6.7.8:80"
+    assert metagraph.weights == {0: 50}
+    assert metagraph.stake == {1: pytest.approx(3 + BASE_STAKE)}
+
+
+def test_copied_metagraph_rebuilds_its_index():
+    # Arrange
+    metagraph = Metagraph(netuid=10, keys={1: "a", 2: "b"}, addresses={1: "1.1.1.1:80", 2: "2.2.2.2:80"})
+    assert metagraph.index.uids_at("1.1.1.1:80") == [1]
+
+    # Act
+    moved = metagraph.model_copy(update={"addresses": {1: "9.9.9.9:80", 2: "2.2.2.2:80"}})
+
+    # Assert
+    assert moved.index is not metagraph.index
+    assert moved.index.uids_at("1.1.1.1:80") == [] and moved.index.uids_at("9.9.9.9:80") == [1]
+    assert metagraph.index.uids_at("1.1.1.1:80") == [1]
+
+
+def test_diff_metagraphs():
+    # Arrange
+    old = Metagraph(
+        netuid=10,
+        keys={1: "a", 2: "b", 3: "c", 4: "d"},
+        addresses={1: "1.1.1.1:80", 2: "2.2.2.2:80", 3: "3.3.3.3:80", 4: "4.4.4.4:80"},
+        stake={1: 1.0, 2: 1.0},
+    )
+    new = Metagraph(
+        netuid=10,
+        keys={1: "a", 2: "b", 3: "x", 5: "e"},
+        addresses={1: "1.1.1.1:80", 2: "9.9.9.9:80", 3: "3.3.3.3:80", 5: "5.5.5.5:80"},
+        stake={1: 2.0, 2: 1.0},
+    )
+
+    # Act
+    diff = diff_metagraphs(old, new)
+
+    # Assert
+    assert diff.added == {5}
+    assert diff.removed == {4}
+    assert diff.address_changed == {2}
+    assert diff.key_changed == {3}
+    assert diff.stake_changed == {1}
+    assert diff.replaced == {2, 3, 4}
+    assert diff.stale_addresses == {"2.2.2.2:80", "4.4.4.4:80"}
+    assert not diff_metagraphs(new, new)
+
+
+# Tests for MetagraphRefresher.refresh
+@pytest.mark.parametrize(
+    "block_number, now, force, expected_fetches, test_id",
+    [
+        (100, 100.0, False, 1, "same_block"),
+        (101, 30.0, False, 1, "interval_not_passed"),
+        (101, 100.0, False, 2, "new_block_after_interval"),
+        (100, 30.0, True, 2, "forced"),
+    ],
+)
+def test_refresher_only_refetches_on_new_blocks(block_number, now, force, expected_fetches, test_id):
+    # Arrange
+    client = make_client(block_number=100, tables={"Keys": {1: "a"}})
+    refresher = MetagraphRefresher(client, min_interval=60.0)
+    first, first_diff = refresher.refresh(now=0.0)
+    client.get_conn.return_value.__enter__.return_value.get_block_header.return_value = {
+        "header": {"number": block_number, "hash": "0xdef"}
+    }
+
+    # Act
+    second, diff = refresher.refresh(force=force, now=now)
+
+    # Assert
+    assert first_diff.added == {1}
+    assert client.query_batch_map.call_count == expected_fetches
+    assert not diff
+
+
+def test_refresher_retries_each_chain_read():
+    # Arrange
+    client = make_client(block_number=100, tables={"Keys": {1: "a"}})
+    client.query_batch_map.side_effect = [ConnectionError("node went away"), {"Keys": {1: "a"}}]
+    refresher = MetagraphRefresher(client, attempts=2, backoff=0.0, max_backoff=0.0)
+
+    # Act
+    metagraph, diff = refresher.refresh(now=0.0)
+
+    # Assert
+    assert metagraph.keys == {1: "a"} and diff.added == {1}
+    assert client.get_conn.call_count == 1
+    assert client.query_batch_map.call_count == 2
+
+
+def test_save_and_load_metagraph(tmp_path):
+    # Arrange
+    metagraph = Metagraph(
+        netuid=10,
+        block_number=7,
+        block_hash="0xabc",
+        keys={0: "self", 1: "a", 2: "b"},
+        addresses={1: "1.2.3.4:80", 2: "[::1]:8080"},
+        weights={1: 3, 2: 5},
+        stake={0: 1.5, 2: BASE_STAKE},
+    )
+
+    # Act
+    first = save_metagraph(metagraph, tmp_path)
+    second = save_metagraph(metagraph, tmp_path)
+
+    # Assert
+    assert load_metagraph(tmp_path) == metagraph
+    assert not first.exists() and second.exists()
+
+
+def drop_block_hash(directory):
+    meta = directory / (directory / "CURRENT").read_text() / "meta.json"
+    body = json.loads(meta.read_text())
+    del body["block_hash"]
+    meta.write_text(json.dumps(body))
+
+
+@pytest.mark.parametrize(
+    "corrupt, test_id",
+    [
+        (lambda directory: None, "missing"),
+        (drop_block_hash, "missing_field"),
+        (lambda directory: (directory / "CURRENT").write_text("gone"), "dangling_pointer"),
+        (
+            lambda directory: (directory / (directory / "CURRENT").read_text() / "meta.json").write_text(
+                json.dumps({"version": -1})
+            ),
+            "version_mismatch",
+        ),
+    ],
+)
+def test_load_metagraph_without_usable_snapshot(tmp_path, corrupt, test_id):
+    # Arrange
+    if test_id != "missing":
+        save_metagraph(Metagraph(netuid=10, keys={0: "self"}), tmp_path)
+    corrupt(tmp_path)
+
+    # Act / Assert
+    assert load_metagraph(tmp_path) is None
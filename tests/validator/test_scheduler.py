@@ -0,0 +1,76 @@
+import pytest
+from eden_subnet.validator.scheduler import RoundPlan, VoteScheduler
+
+
+def make_scheduler(block, tempo=100, rate_limit=1, last_vote_block=None):
+    scheduler = VoteScheduler(netuid=10, block_time=8.0, vote_margin=2, scoring_reserve=10.0, min_budget=15.0)
+    scheduler.set_params(tempo, rate_limit, now=0.0)
+    scheduler.observe(block, now=0.0)
+    scheduler.last_vote_block = last_vote_block
+    return scheduler
+
+
+# Tests for VoteScheduler.next_epoch_block
+@pytest.mark.parametrize(
+    "block, expected, test_id",
+    [
+        (1000, 1090, "before_epoch"),
+        (1089, 1090, "just_before_epoch"),
+        (1090, 1190, "on_epoch"),
+    ],
+)
+def test_next_epoch_block(block, expected, test_id):
+    # Act / Assert
+    assert make_scheduler(block).next_epoch_block(block) == expected
+
+
+# Tests for VoteScheduler.plan
+@pytest.mark.parametrize(
+    "block, tempo, rate_limit, last_vote_block, expected, test_id",
+    [
+        (1000, 100, 1, None, RoundPlan(1088, 394.0, 694.0), "waits_for_epoch"),
+        (1085, 100, 1, None, RoundPlan(1188, 514.0, 814.0), "too_close_skips_epoch"),
+        (1089, 100, 1, 1088, RoundPlan(1188, 482.0, 782.0), "already_voted_this_epoch"),
+        (1001, 0, 10, 1000, RoundPlan(1010, 0.0, 62.0), "rate_limit_without_tempo"),
+        (1001, 0, 1, 1000, RoundPlan(1005, 0.0, 22.0), "stretches_to_min_budget"),
+    ],
+)
+def test_plan(block, tempo, rate_limit, last_vote_block, expected, test_id):
+    # Arrange
+    scheduler = make_scheduler(block, tempo, rate_limit, last_vote_block)
+
+    # Act
+    plan = scheduler.plan(now=0.0)
+
+    # Assert
+    assert plan == expected
+
+
+def test_plan_extrapolates_the_head_and_records_votes():
+    # Arrange
+    scheduler = make_scheduler(1000)
+
+    # Act
+    later = scheduler.plan(now=80.0)
+    voted_at = scheduler.record_vote(now=700.0)
+    after_vote = scheduler.plan(now=700.0)
+
+    # Assert
+    assert later == RoundPlan(1088, 394.0, 694.0)
+    assert voted_at == 1088
+    assert after_vote.vote_block == 1188
+    assert not scheduler.needs_params(now=599.0) and scheduler.needs_params(now=600.0)
+
+
+def test_plan_moves_on_after_a_round_without_vote():
+    # Arrange
+    scheduler = make_scheduler(1000)
+    first = scheduler.plan(now=0.0)
+
+    # Act
+    scheduler.finish_round(first.vote_block)
+    second = scheduler.plan(now=first.deadline)
+
+    # Assert
+    assert first.vote_block == 1088
+    assert second.vote_block == 1188
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import types
+import pytest
+from unittest.mock import patch
+from aiohttp import web
+from eden_subnet.validator.metagraph import MetagraphDiff
+from eden_subnet.validator.sharding import ShardedFanout, WorkerStartError, shard_addresses
+
+
+class FakeValidator:
+    def __init__(self, settings, chain_client=None):
+        if settings.get("fail_init"):
+            raise ValueError("no key")
+        self.settings = settings
+        self.chain_client = chain_client
+        self.forgotten = set()
+
+    async def invalidate_miners(self, diff):
+        self.forgotten |= diff.replaced
+
+    async def get_miner_responses(self, selfuid, encoding, prompt_message, addresses, round_timeout=None):
+        if self.settings.get("fail_uid") in addresses:
+            os._exit(1)
+        return {uid: (os.getpid(), len(encoding), uid in self.forgotten) for uid in addresses if uid != selfuid}
+
+
+def keyless_validator(settings, chain_client=None):
+    from eden_subnet.validator.validator import Validator
+
+    with patch.object(Validator, "load_local_key", return_value=types.SimpleNamespace(ss58_address=None)):
+        return Validator(settings=settings, chain_client=chain_client)
+
+
+# Tests for shard_addresses
+@pytest.mark.parametrize(
+    "addresses, shards, expected, test_id",
+    [
+        ({1: "a", 2: "b", 3: "c"}, 1, [{1: "a", 2: "b", 3: "c"}], "single_shard"),
+        ({1: "a", 2: "b", 3: "c"}, 2, [{2: "b"}, {1: "a", 3: "c"}], "two_shards"),
+        ({}, 3, [{}, {}, {}], "empty"),
+    ],
+)
+def test_shard_addresses(addresses, shards, expected, test_id):
+    # Act / Assert
+    assert shard_addresses(addresses, shards) == expected
+
+
+def test_sharded_fanout_is_sticky_per_uid():
+    # Arrange
+    fanout = ShardedFanout(FakeValidator, {}, processes=2, default_score=1)
+    addresses = {uid: f"10.0.0.{uid}:8080" for uid in range(6)}
+
+    # Act
+    first = asyncio.run(fanout.get_miner_responses(0, [1, 2, 3], None, addresses))
+    second = asyncio.run(fanout.get_miner_responses(0, [1, 2, 3], None, addresses))
+    fanout.close()
+
+    # Assert
+    assert set(first) == {1, 2, 3, 4, 5}
+    assert first == second
+    assert first[2][0] == first[4][0] != first[1][0]
+    assert first[1][1] == 3
+
+
+def test_failed_worker_scores_shard_with_default():
+    # Arrange
+    fanout = ShardedFanout(FakeValidator, {"fail_uid": 3}, processes=2, default_score=1)
+    addresses = {uid: f"10.0.0.{uid}:8080" for uid in range(1, 5)}
+
+    # Act
+    scores = asyncio.run(fanout.get_miner_responses(0, [1], None, addresses))
+    fanout.close()
+
+    # Assert
+    assert scores[1] == 1 and scores[3] == 1
+    assert scores[2][1] == 1
+
+
+def test_invalidate_reaches_every_worker():
+    # Arrange
+    fanout = ShardedFanout(FakeValidator, {}, processes=2, default_score=1)
+    addresses = {uid: f"10.0.0.{uid}:8080" for uid in range(1, 5)}
+    diff = MetagraphDiff.empty()._replace(removed={1}, address_changed={2})
+
+    # Act
+    async def run():
+        await fanout.invalidate(diff)
+        return await fanout.get_miner_responses(0, [1], None, addresses)
+
+    scores = asyncio.run(run())
+    fanout.close()
+
+    # Assert
+    assert {uid: score[2] for uid, score in scores.items()} == {1: True, 2: True, 3: False, 4: False}
+
+
+def test_worker_that_cannot_build_its_validator_fails_the_round():
+    # Arrange
+    fanout = ShardedFanout(FakeValidator, {"fail_init": True}, processes=1, default_score=1)
+
+    # Act
+    with pytest.raises(WorkerStartError, match="no key"):
+        asyncio.run(fanout.get_miner_responses(0, [1], None, {1: "10.0.0.1:8080"}))
+    fanout.close()
+
+
+def test_workers_build_the_real_validator_without_a_node():
+    # Arrange
+    from eden_subnet.validator.validator import DEFAULT_SCORE, Message, ValidatorSettings
+
+    settings = ValidatorSettings(
+        key_name="validator",
+        module_path="validator",
+        host="127.0.0.1",
+        port=1,
+        metagraph_cache_dir=None,
+        vote_log_path=None,
+        prescan_enabled=False,
+    )
+    fanout = ShardedFanout(keyless_validator, settings, processes=2, default_score=DEFAULT_SCORE)
+
+    async def run():
+        async def miner(request):
+            return web.json_response({"choices": [{"message": {"content": [1, 2, 3]}}]})
+
+        app = web.Application()
+        app.router.add_post("/generate", miner)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        address = f"127.0.0.1:{runner.addresses[0][1]}"
+        try:
+            return await fanout.get_miner_responses(
+                0, [1, 2, 3], Message(content="hi", role="user"), {1: address, 2: address}, 10.0
+            )
+        finally:
+            await runner.cleanup()
+
+    # Act
+    scores = asyncio.run(run())
+    fanout.close()
+
+    # Assert
+    assert set(scores) == {1, 2}
+    assert all(score > DEFAULT_SCORE for score in scores.values())
@@ -1,8 +1,19 @@
+import asyncio
+import json
+import threading
+import time
+import types
+import aiohttp
 import pytest
 from unittest.mock import patch, MagicMock
+from aiohttp import web
 from pydantic import BaseModel
 from eden_subnet.base.base import BaseValidator, Message
-from eden_subnet.validator.validator import Validator, ValidatorSettings
+from eden_subnet.base.chain import FakeChain
+from eden_subnet.base.rpc import RpcServer
+from eden_subnet.base.token_codec import encode_tokens
+from eden_subnet.validator.validator import DEFAULT_SCORE, RoundInputs, Validator, ValidatorSettings
+from eden_subnet.validator.validator import Message as PromptMessage
 from communex.compat.key import Ss58Address
 from communex.client import CommuneClient
 
@@ -114,3 +125,513 @@ def test_make_validation_request(
 
         # Assert
         assert result == expected_output
+
+
+def make_validator(**overrides):
+    chain = FakeChain.synthetic(size=5)
+    settings = ValidatorSettings(
+        key_name="validator",
+        module_path="validator",
+        host="127.0.0.1",
+        port=1,
+        metagraph_cache_dir=None,
+        vote_log_path=None,
+        tempo_scheduling=False,
+        **overrides,
+    )
+    keypair = types.SimpleNamespace(ss58_address=chain.keys[1])
+    with patch.object(Validator, "load_local_key", return_value=keypair):
+        return Validator(settings, chain_client=chain)
+
+
+async def serve_miner(handler):
+    app = web.Application()
+    app.router.add_post("/generate", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner, f"127.0.0.1:{runner.addresses[0][1]}"
+
+
+def tokens_response(tokens):
+    return web.json_response({"choices": [{"message": {"content": tokens}}]})
+
+
+def test_get_miner_responses_scores_off_the_loop_and_cleans_up_on_cancel():
+    # Arrange
+    validator = make_validator(prescan_enabled=False)
+    threads = set()
+    validate_input = validator.validate_input
+
+    def recording_validate_input(reference, response):
+        threads.add(threading.current_thread().name)
+        return validate_input(reference, response)
+
+    validator.validate_input = recording_validate_input
+
+    async def run():
+        stall = asyncio.Event()
+
+        async def fast(request):
+            return tokens_response([1, 2, 3])
+
+        async def slow(request):
+            await stall.wait()
+            return tokens_response([1, 2, 3])
+
+        fast_runner, fast_address = await serve_miner(fast)
+        slow_runner, slow_address = await serve_miner(slow)
+        scores = await validator.get_miner_responses(0, [1, 2, 3], Message(content="hi", role="user"), {1: fast_address})
+        round_task = asyncio.ensure_future(
+            validator.get_miner_responses(0, [1, 2, 3], Message(content="hi", role="user"), {1: slow_address})
+        )
+        await asyncio.sleep(0.3)
+        round_task.cancel()
+        await asyncio.gather(round_task, return_exceptions=True)
+        await asyncio.sleep(0)
+        leaked = [
+            task for task in asyncio.all_tasks()
+            if task.get_coro().__qualname__.startswith("Validator.get_miner_responses")
+        ]
+        stall.set()
+        await validator.close_session()
+        await fast_runner.cleanup()
+        await slow_runner.cleanup()
+        return scores, round_task, leaked
+
+    # Act
+    scores, round_task, leaked = asyncio.run(run())
+
+    # Assert
+    assert scores[1] > DEFAULT_SCORE
+    assert threading.main_thread().name not in threads and threads
+    assert round_task.cancelled()
+    assert leaked == []
+
+
+def test_prescan_skips_unreachable_miners_within_the_round_deadline():
+    # Arrange
+    validator = make_validator()
+    requested = []
+    delay = {"127.0.0.1:9": 0.05}
+    probe_address = validator.probe_address
+
+    async def probe(address, timeout=None):
+        if address in delay:
+            await asyncio.sleep(delay[address])
+            return False
+        return await probe_address(address, timeout)
+
+    validator.probe_address = probe
+
+    async def run():
+        async def miner(request):
+            requested.append(request.url.port)
+            return tokens_response([1, 2, 3])
+
+        runner, address = await serve_miner(miner)
+        prompt = Message(content="hi", role="user")
+        addresses = {1: address, 2: "127.0.0.1:9"}
+        scores = await validator.get_miner_responses(0, [1, 2, 3], prompt, addresses, 5.0)
+        first_round_requests = len(requested)
+        delay["127.0.0.1:9"] = 5.0
+        scan_start = time.monotonic()
+        reachable = await validator.prescan_addresses(addresses, timeout=0.2)
+        scan_elapsed = time.monotonic() - scan_start
+        round_start = time.monotonic()
+        late_scores = await validator.get_miner_responses(0, [1, 2, 3], prompt, addresses, 0.3)
+        round_elapsed = time.monotonic() - round_start
+        await validator.close_session()
+        await runner.cleanup()
+        return scores, first_round_requests, reachable, scan_elapsed, late_scores, round_elapsed
+
+    # Act
+    scores, first_round_requests, reachable, scan_elapsed, late_scores, round_elapsed = asyncio.run(run())
+
+    # Assert
+    assert scores[1] > DEFAULT_SCORE and scores[2] == DEFAULT_SCORE
+    assert first_round_requests == 1
+    assert reachable == {1} and scan_elapsed < 1.0
+    assert late_scores == {1: DEFAULT_SCORE, 2: DEFAULT_SCORE}
+    assert round_elapsed < 1.0
+
+
+def test_round_deadline_cancels_and_scores_slow_miners():
+    # Arrange
+    validator = make_validator(prescan_enabled=False)
+    started = []
+
+    async def run():
+        stall = asyncio.Event()
+
+        async def fast(request):
+            return tokens_response([1, 2, 3])
+
+        async def slow(request):
+            started.append(True)
+            await stall.wait()
+            return tokens_response([1, 2, 3])
+
+        fast_runner, fast_address = await serve_miner(fast)
+        slow_runner, slow_address = await serve_miner(slow)
+        start = time.monotonic()
+        scores = await validator.get_miner_responses(
+            0, [1, 2, 3], Message(content="hi", role="user"), {1: fast_address, 2: slow_address}, 0.5
+        )
+        elapsed = time.monotonic() - start
+        stall.set()
+        await validator.close_session()
+        await fast_runner.cleanup()
+        await slow_runner.cleanup()
+        return scores, elapsed, slow_address
+
+    # Act
+    scores, elapsed, slow_address = asyncio.run(run())
+
+    # Assert
+    assert started and elapsed < 1.5
+    assert scores[1] > DEFAULT_SCORE and scores[2] == DEFAULT_SCORE
+    assert validator.breakers.get(2, slow_address).failures == 1
+
+
+def test_make_request_async_splits_connect_and_read_timeouts():
+    # Arrange
+    validator = make_validator(connect_timeout=2.0, read_timeout=7.0)
+    session = MagicMock()
+    seen = {}
+
+    def post(url, **kwargs):
+        seen.update(kwargs)
+        raise ConnectionError("refused")
+
+    session.post.side_effect = post
+
+    # Act
+    result = asyncio.run(
+        validator.make_request_async(session, Message(content="hi", role="user"), "http://127.0.0.1:9/generate")
+    )
+
+    # Assert
+    assert result is None
+    assert seen["timeout"].sock_connect == 2.0
+    assert seen["timeout"].sock_read == 7.0
+    assert seen["timeout"].total == 9.0
+
+
+@pytest.mark.parametrize(
+    "streamed, test_id",
+    [
+        (False, "content_length"),
+        (True, "chunked"),
+    ],
+)
+def test_oversized_bodies_are_cut_off(streamed, test_id):
+    # Arrange
+    validator = make_validator(max_response_bytes=1024)
+    body = json.dumps({"choices": [{"message": {"content": list(range(1000))}}]}).encode()
+    sent = []
+
+    async def run():
+        async def miner(request):
+            if not streamed:
+                return web.Response(body=body, content_type="application/json")
+            response = web.StreamResponse(headers={"Content-Type": "application/json"})
+            await response.prepare(request)
+            for offset in range(0, len(body), 256):
+                await response.write(body[offset:offset + 256])
+                sent.append(offset)
+                await asyncio.sleep(0.01)
+            await response.write_eof()
+            return response
+
+        runner, address = await serve_miner(miner)
+        session = await validator.get_session()
+        result = await validator.make_request_async(session, Message(content="hi", role="user"), f"http://{address}/generate")
+        await validator.close_session()
+        await runner.cleanup()
+        return result
+
+    # Act
+    result = asyncio.run(run())
+
+    # Assert
+    assert result == []
+    assert len(sent) < len(body) // 256
+
+
+@pytest.mark.parametrize(
+    "token_count, expected_default, test_id",
+    [
+        (6, False, "at_cap"),
+        (7, True, "over_cap"),
+    ],
+)
+def test_token_cap_scales_with_the_reference(token_count, expected_default, test_id):
+    # Arrange
+    validator = make_validator(prescan_enabled=False, max_token_ratio=2.0, min_token_cap=4)
+    encoding = [1, 2, 3]
+
+    async def run():
+        async def miner(request):
+            return tokens_response(list(range(1, token_count + 1)))
+
+        runner, address = await serve_miner(miner)
+        session = await validator.get_session()
+        direct = await validator.make_request_async(
+            session, Message(content="hi", role="user"), f"http://{address}/generate", max_tokens=6
+        )
+        scores = await validator.get_miner_responses(0, encoding, Message(content="hi", role="user"), {1: address})
+        await validator.close_session()
+        await runner.cleanup()
+        return direct, scores
+
+    # Act
+    direct, scores = asyncio.run(run())
+
+    # Assert
+    assert (len(direct) == 0) is expected_default
+    assert (scores[1] == DEFAULT_SCORE) is expected_default
+
+
+def test_session_is_pooled_across_rounds_and_closed_on_shutdown():
+    # Arrange
+    validator = make_validator(prescan_enabled=False, round_interval=0.0)
+    peers = []
+    sessions = []
+
+    async def run():
+        async def miner(request):
+            peers.append(request.transport.get_extra_info("peername"))
+            return tokens_response([1, 2, 3])
+
+        runner, address = await serve_miner(miner)
+
+        async def prepare_round():
+            return RoundInputs(
+                **validator.round_snapshot(validator.current_metagraph()),
+                prompt_message=PromptMessage(content="hi", role="user"),
+                encoding=[1, 2, 3],
+            )
+
+        async def run_round(inputs, deadline=None):
+            sessions.append(await validator.get_session())
+            await validator.get_miner_responses(0, [1, 2, 3], Message(content="hi", role="user"), {1: address})
+            if len(sessions) == 3:
+                raise asyncio.CancelledError
+
+        validator.prepare_round = prepare_round
+        validator.run_round = run_round
+        try:
+            await validator.voteloop()
+        except asyncio.CancelledError:
+            pass
+        await runner.cleanup()
+
+    # Act
+    asyncio.run(run())
+
+    # Assert
+    assert len(sessions) == 3 and sessions[0] is sessions[1] is sessions[2]
+    assert len(set(peers)) == 1
+    assert sessions[0].closed and validator.session is None
+
+
+def test_next_round_is_prepared_while_the_current_one_runs():
+    # Arrange
+    validator = make_validator(round_interval=0.0)
+    events = []
+
+    async def prepare_round():
+        events.append("prepare")
+        return RoundInputs(
+            **validator.round_snapshot(validator.current_metagraph()),
+            prompt_message=PromptMessage(content="hi", role="user"),
+            encoding=[1, 2, 3],
+        )
+
+    async def run_round(inputs, deadline=None):
+        events.append("run")
+        await asyncio.sleep(0.01)
+        events.append("done")
+        if events.count("done") == 2:
+            raise asyncio.CancelledError
+
+    validator.prepare_round = prepare_round
+    validator.run_round = run_round
+
+    async def run():
+        try:
+            await validator.voteloop()
+        except asyncio.CancelledError:
+            pass
+
+    # Act
+    asyncio.run(run())
+
+    # Assert
+    assert events[:4] == ["prepare", "run", "prepare", "done"]
+    assert events.count("run") == 2 and validator.session is None
+
+
+def test_lost_rpc_channel_falls_back_to_http():
+    # Arrange
+    validator = make_validator(prescan_enabled=False)
+    http_requests = []
+
+    async def run():
+        async def miner(request):
+            http_requests.append(True)
+            return tokens_response([1, 2, 3])
+
+        runner, address = await serve_miner(miner)
+        server = RpcServer(handler=lambda payload: time.sleep(0.5) or encode_tokens([1, 2, 3]))
+        await server.start(host="127.0.0.1", port=0)
+        validator.rpc_advertisements[address] = {"tcp": str(server.port)}
+        client = await validator.get_rpc_client(address)
+        # Drop the connection while the request is in flight.
+        closing = asyncio.get_running_loop().call_later(0.1, lambda: asyncio.ensure_future(server.close()))
+        scores = await validator.get_miner_responses(0, [1, 2, 3], Message(content="hi", role="user"), {1: address})
+        closing.cancel()
+        await validator.close_session()
+        await runner.cleanup()
+        return client, scores, address
+
+    # Act
+    client, scores, address = asyncio.run(run())
+
+    # Assert
+    assert scores[1] > DEFAULT_SCORE and http_requests
+    assert client.closed and address not in validator.rpc_advertisements and address not in validator.rpc_clients
+    assert validator.breakers.get(1, address).failures == 0
+
+
+def test_capacity_probe_failures_leave_the_round_channel_alone():
+    # Arrange
+    validator = make_validator(capacity_max_burst=2, read_timeout=0.2)
+
+    async def run():
+        async def miner(request):
+            return tokens_response([1, 2, 3])
+
+        runner, address = await serve_miner(miner)
+        server = RpcServer(handler=lambda payload: time.sleep(0.5) or encode_tokens([1, 2, 3]))
+        await server.start(host="127.0.0.1", port=0)
+        validator.rpc_advertisements[address] = {"tcp": str(server.port)}
+        round_client = await validator.get_rpc_client(address)
+        async with aiohttp.ClientSession() as session:
+            record = await validator.probe_miner_capacity(session, address, ["hi"])
+        result = record, round_client.closed, dict(validator.rpc_advertisements), dict(validator.rpc_clients)
+        await validator.close_session()
+        await server.close()
+        await runner.cleanup()
+        return address, round_client, result
+
+    # Act
+    address, round_client, (record, round_closed, advertisements, clients) = asyncio.run(run())
+
+    # Assert
+    assert record.error_onset == 1
+    assert not round_closed and clients[address] is round_client
+    assert address in advertisements
+
+
+def test_failed_warm_start_reconcile_forces_a_sync():
+    # Arrange
+    validator = make_validator()
+    validator.metagraph = validator.refresher.refresh(force=True)[0].model_copy(update={"block_number": 0})
+    validator.refresher.last_refresh = float("-inf")
+    validator.get_sample_result = lambda: "hi"
+    syncs = []
+    invalidated = []
+    sync_metagraph = validator.sync_metagraph
+
+    def flaky_sync(force=False):
+        syncs.append(force)
+        if len(syncs) == 1:
+            raise ConnectionError("node went away")
+        return sync_metagraph(force)
+
+    async def invalidate_miners(diff):
+        invalidated.append(diff)
+
+    validator.sync_metagraph = flaky_sync
+    validator.invalidate_miners = invalidate_miners
+
+    async def run():
+        await validator.prepare_round()
+        await asyncio.wait([validator.reconcile_task])
+        return await validator.prepare_round()
+
+    # Act
+    inputs = asyncio.run(run())
+
+    # Assert
+    assert syncs == [True, True]
+    assert validator.reconcile_task is None and len(invalidated) == 1
+    assert inputs.block_number == validator.metagraph.block_number != 0
+
+
+def test_capacity_probe_uses_its_own_rpc_connection():
+    # Arrange
+    validator = make_validator(capacity_max_burst=4)
+    open_connections = []
+
+    async def run():
+        def handler(payload):
+            open_connections.append(len(server.connections))
+            return encode_tokens([1, 2, 3])
+
+        server = RpcServer(handler=handler)
+        await server.start(host="127.0.0.1", port=0)
+        address = "127.0.0.1:1"
+        validator.rpc_advertisements[address] = {"tcp": str(server.port)}
+        round_client = await validator.get_rpc_client(address)
+        record = await validator.probe_miner_capacity(None, address, ["hi"])
+        result = round_client, record, round_client.closed, validator.rpc_clients[address]
+        await validator.close_session()
+        await server.close()
+        return result
+
+    # Act
+    round_client, record, round_closed, cached = asyncio.run(run())
+
+    # Assert
+    assert record.max_concurrency == 4 and record.error_onset is None
+    assert open_connections and set(open_connections) == {2}
+    assert not round_closed and cached is round_client
+
+
+def test_prefetched_round_is_refreshed_then_scored_and_voted(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    validator = make_validator(metagraph_refresh_interval=0.0)
+    chain = validator.chain_client
+    validator.get_sample_result = lambda: "hello"
+    fanned_out = {}
+
+    async def fan_out(selfuid, encoding, prompt_message, addresses, round_timeout=None):
+        fanned_out.update(addresses)
+        return {uid: 50.0 + uid for uid in addresses if uid != selfuid}
+
+    validator.fan_out = fan_out
+
+    async def run():
+        prefetched = await validator.prepare_round()
+        chain.addresses[3] = "10.9.9.9:8000"
+        chain.advance()
+        inputs = await validator.refresh_round(prefetched)
+        voted = await validator.run_round(inputs)
+        outcome = await validator.votes.wait(timeout=5.0)
+        return prefetched, inputs, voted, outcome
+
+    # Act
+    prefetched, inputs, voted, outcome = asyncio.run(run())
+
+    # Assert
+    assert inputs.block_number == prefetched.block_number + 1
+    assert inputs.prompt_message == prefetched.prompt_message and inputs.encoding == prefetched.encoding
+    assert fanned_out[3] == "10.9.9.9:8000" != prefetched.address_dict[3]
+    assert voted and outcome.status == "confirmed"
+    assert chain.votes[0].uids == [2, 3, 4]
+    assert json.loads((tmp_path / "data" / "weights.json").read_text())["uids"] == [2, 3, 4]
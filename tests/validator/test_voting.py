@@ -0,0 +1,159 @@
+import asyncio
+import json
+import pytest
+from eden_subnet.base.chain import FakeReceipt
+from eden_subnet.validator.voting import VoteSubmitter, quantize_weights, weight_distance
+
+
+# Tests for quantize_weights
+@pytest.mark.parametrize(
+    "uids, weights, expected, test_id",
+    [
+        ([1, 2, 3], [1.0, 0.5, 0.0], {1: 65535, 2: 32768, 3: 0}, "scaled_to_u16"),
+        ([4, 5], [2.0, 2.0], {4: 65535, 5: 65535}, "equal"),
+        ([6], [0.0], {6: 0}, "all_zero"),
+        ([], [], {}, "empty"),
+    ],
+)
+def test_quantize_weights(uids, weights, expected, test_id):
+    # Act / Assert
+    assert quantize_weights(uids, weights) == expected
+
+
+@pytest.mark.parametrize(
+    "uids, weights, test_id",
+    [
+        ([1, 2], [1.0], "length_mismatch"),
+        ([1], [-1.0], "negative"),
+    ],
+)
+def test_quantize_weights_rejects_bad_vectors(uids, weights, test_id):
+    # Act / Assert
+    with pytest.raises(ValueError):
+        quantize_weights(uids, weights)
+
+
+# Tests for weight_distance
+@pytest.mark.parametrize(
+    "old, new, expected, test_id",
+    [
+        ({1: 10, 2: 30}, {1: 10, 2: 30}, 0.0, "identical"),
+        ({1: 10, 2: 30}, {1: 20, 2: 60}, 0.0, "same_proportions"),
+        ({1: 10}, {2: 10}, 1.0, "disjoint"),
+        ({1: 1, 2: 1}, {1: 1, 2: 3}, 0.25, "shifted"),
+        ({}, {}, 0.0, "both_empty"),
+        ({1: 0}, {1: 5}, 1.0, "from_zero"),
+    ],
+)
+def test_weight_distance(old, new, expected, test_id):
+    # Act / Assert
+    assert weight_distance(old, new) == pytest.approx(expected)
+
+
+class FakeVotes:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    async def __call__(self, uids, weights):
+        self.calls.append((uids, weights))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_submitter_suppresses_small_changes_and_retries_failures(tmp_path):
+    # Arrange
+    votes = FakeVotes([
+        FakeReceipt(True, 10),
+        FakeReceipt(True, 20),
+        ConnectionError("node went away"),
+        FakeReceipt(False, 30, "rate limited"),
+        FakeReceipt(True, 40),
+    ])
+    submitter = VoteSubmitter(votes, min_change=0.05, log_path=tmp_path / "votes.jsonl")
+    outcomes = []
+
+    async def run():
+        for weights in (
+            [1.0, 1.0],   # first vote
+            [1.0, 0.99],  # suppressed
+            [1.0, 0.5],   # confirmed
+            [0.5, 1.0],   # fails
+            [0.5, 1.0],   # rejected
+            [0.5, 1.0],   # confirmed
+            [0.5, 1.0],   # suppressed
+        ):
+            task = submitter.submit([1, 2], weights, on_outcome=outcomes.append)
+            if task is not None:
+                await task
+
+    # Act
+    asyncio.run(run())
+
+    # Assert
+    assert [outcome.status for outcome in outcomes] == ["confirmed", "confirmed", "failed", "rejected", "confirmed"]
+    assert votes.calls[0] == ([1, 2], [65535, 65535])
+    assert outcomes[3].error == "rate limited" and outcomes[4].block == 40
+    assert submitter.suppressed == 2
+    assert submitter.last_weights == {1: 32768, 2: 65535}
+    logged = [json.loads(line) for line in (tmp_path / "votes.jsonl").read_text().splitlines()]
+    assert [entry["status"] for entry in logged] == [outcome.status for outcome in outcomes]
+
+
+def test_submitter_votes_in_the_background():
+    # Arrange
+    release = None
+    calls = []
+
+    async def slow_vote(uids, weights):
+        calls.append(uids)
+        await release.wait()
+        return FakeReceipt(True, 1)
+
+    submitter = VoteSubmitter(slow_vote, max_age=0.0)
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        first = submitter.submit([1], [1.0])
+        await asyncio.sleep(0)
+        busy = submitter.submit([1], [1.0])
+        release.set()
+        outcome = await submitter.wait(timeout=1.0)
+        again = submitter.submit([1], [1.0])
+        await submitter.wait(timeout=1.0)
+        return first, busy, outcome, again
+
+    # Act
+    first, busy, outcome, again = asyncio.run(run())
+
+    # Assert
+    assert first is not None and busy is None
+    assert outcome.status == "confirmed"
+    assert again is not None and len(calls) == 2
+
+
+def test_submitter_records_receipts_that_fail_to_read():
+    # Arrange
+    class BrokenReceipt:
+        @property
+        def is_success(self):
+            raise ConnectionError("node went away")
+
+    votes = FakeVotes([BrokenReceipt()])
+    submitter = VoteSubmitter(votes)
+    outcomes = []
+
+    async def run():
+        submitter.submit([1], [1.0], on_outcome=outcomes.append)
+        return await submitter.wait(timeout=1.0)
+
+    # Act
+    outcome = asyncio.run(run())
+
+    # Assert
+    assert outcome.status == "failed" and "node went away" in outcome.error
+    assert outcomes == [outcome] and list(submitter.outcomes) == [outcome]
+    assert submitter.last_weights is None